@@ -1,26 +1,64 @@
 """Flask web application for Azure Pricing Assistant."""
 
 import asyncio
+import atexit
 import os
-from flask import Flask, render_template, request, jsonify, session
+import time
+from typing import Optional
+
+from flask import Flask, Response, g, render_template, request, jsonify, session
 from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
-from agent_framework_azure_ai import AzureAIAgentClient
-from agent_framework import SequentialBuilder
-# from agent_framework.observability import setup_observability
-
-from src.agents import (
-    create_question_agent,
-    create_bom_agent,
-    create_pricing_agent,
-    create_proposal_agent,
+from agent_framework.observability import setup_observability
+
+from src.agents.bom_agent import validate_bom_json
+from src.agents.registry import QUESTION_AGENT
+from src.clients import AgentClientPool
+from src.jobs import JOB_FAILED, JOB_SUCCEEDED, JobQueueFull, create_job_queue
+from src.pipeline import (
+    STAGE_COMPLETED,
+    STAGE_OUTPUT_KEYS,
+    STAGE_STARTED,
+    STAGE_TEXT,
+    generate_proposal_outputs,
+    run_proposal_pipeline,
+    run_region_comparison,
+)
+from src.sessions import (
+    DEFAULT_SWEEP_INTERVAL_SECONDS,
+    SESSION_SWEEP_INTERVAL_ENV,
+    create_session_store,
+)
+from src.pipeline_cache import get_bom_cache, get_pipeline_cache
+from src.pricing import (
+    DEFAULT_CURRENCY,
+    PricingOptions,
+    get_pricing_cache,
+    get_pricing_single_flight,
+)
+from src.prompts import DONE_MARKER, requirements_from_history
+from src.runtime import BackgroundEventLoop
+from src.telemetry import (
+    PROMETHEUS_CONTENT_TYPE,
+    Gauge,
+    RunTelemetry,
+    format_prometheus,
+    get_metrics,
+)
+from src.sse import (
+    DELTA_EVENT,
+    DONE_EVENT,
+    ERROR_EVENT,
+    SSE_HEADERS,
+    format_sse,
+    pipeline_event_payload,
 )
 
 # Load environment variables
 load_dotenv()
 
-# Setup observability
-# setup_observability()
+# Export agent, stage and MCP call spans when a collector is configured
+if os.getenv("OTLP_ENDPOINT") or os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING"):
+    setup_observability()
 
 app = Flask(__name__)
 flask_secret_key = os.getenv("FLASK_SECRET_KEY")
@@ -32,130 +70,203 @@ if not flask_secret_key:
     )
 app.secret_key = flask_secret_key
 
-# Store active chat threads in memory (in production, use Redis or similar)
-chat_threads = {}
+# Chat sessions (serialized agent thread + history), shared across workers
+# when SESSION_STORE_URL points at SQLite or Redis
+session_store = create_session_store()
+session_store.start_sweeper(
+    float(os.getenv(SESSION_SWEEP_INTERVAL_ENV, DEFAULT_SWEEP_INTERVAL_SECONDS))
+)
 
+# Per-worker event loop, shared AzureAIAgentClient and prebuilt agents, created
+# at startup so chat turns reuse cached tokens, connections and MCP sessions
+runtime = BackgroundEventLoop()
+client_pool = AgentClientPool()
+runtime.submit(client_pool.get_registry())
 
-async def chat_message(session_id: str, user_message: str):
-    """Process a single chat message and return agent response."""
+# Background proposal jobs, bounded per worker; job status is shared across
+# workers when JOB_STORE_URL points at SQLite
+job_queue = create_job_queue(runtime)
+
+# Request threads block on the worker event loop for at most these many seconds
+# (App Service closes idle front-end connections after 230 seconds)
+CHAT_TIMEOUT_SECONDS = float(os.getenv("CHAT_TIMEOUT_SECONDS", "90"))
+PROPOSAL_TIMEOUT_SECONDS = float(os.getenv("PROPOSAL_TIMEOUT_SECONDS", "220"))
+
+
+@atexit.register
+def shutdown():
+    """Close the shared client and stop the worker event loop."""
+    if not runtime.is_running:
+        return
+    session_store.stop_sweeper()
+    job_queue.fail_active()
     try:
-        credential = DefaultAzureCredential()
-        endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT")
-        async with AzureAIAgentClient(
-            project_endpoint=endpoint,
-            async_credential=credential
-        ) as client:
-            # Always create a fresh agent with the current client
-            question_agent = create_question_agent(client)
-
-            # Get or create thread
-            if session_id not in chat_threads:
-                thread = question_agent.get_new_thread()
-                chat_threads[session_id] = {
-                    'thread': thread,
-                    'history': []
-                }
-            
-            session_data = chat_threads[session_id]
-            thread = session_data['thread']
-            
-            # Stream agent response
-            response_text = ""
-            async for update in question_agent.run_stream(user_message, thread=thread):
-                if update.text:
-                    response_text += update.text
-            
-            # Store in history
-            session_data['history'].append({
-                'role': 'user',
-                'content': user_message
-            })
-            session_data['history'].append({
-                'role': 'assistant',
-                'content': response_text
-            })
-            
-            # Check if done
-            is_done = "We are DONE!" in response_text
+        runtime.run(client_pool.aclose(), timeout=10)
+    except Exception:
+        pass  # Suppress shutdown errors
+    runtime.stop()
+
+
+async def stream_chat_message(session_id: str, user_message: str):
+    """
+    Process a single chat message, yielding (event, data) pairs as the agent responds.
+
+    Yields:
+        ("delta", {"text"}) for each streamed chunk, then ("done", {"response",
+        "is_done", "history"}), or ("error", {"error"}) on failure
+    """
+    telemetry = RunTelemetry("chat_turn")
+    error = None
+    try:
+        registry = await client_pool.get_registry()
+
+        # Shared agent; the conversation lives in the per-session thread
+        question_agent = await registry.get(QUESTION_AGENT)
+
+        # Get or restore thread; store calls run off the event loop, since
+        # SQLite and Redis block and the loop serves every request on the worker
+        session_data = await asyncio.to_thread(session_store.get, session_id)
+        if session_data is None:
+            thread = question_agent.get_new_thread()
+            history = []
+        else:
+            thread = await question_agent.deserialize_thread(session_data['thread'])
+            history = session_data['history']
+        
+        # Stream agent response
+        response_text = ""
+        telemetry.stage_started(QUESTION_AGENT)
+        async for update in question_agent.run_stream(user_message, thread=thread):
+            telemetry.agent_update(QUESTION_AGENT, update)
+            if update.text:
+                response_text += update.text
+                yield DELTA_EVENT, {'text': update.text}
+        telemetry.stage_completed(QUESTION_AGENT)
+        
+        # Store in history
+        history.append({
+            'role': 'user',
+            'content': user_message
+        })
+        history.append({
+            'role': 'assistant',
+            'content': response_text
+        })
+        await asyncio.to_thread(session_store.save, session_id, {
+            'thread': await thread.serialize(),
+            'history': history
+        })
+        
+        # Check if done
+        is_done = DONE_MARKER in response_text
+        
+        yield DONE_EVENT, {
+            'response': response_text,
+            'is_done': is_done,
+            'history': history
+        }
             
+    except Exception as e:
+        error = e
+        yield ERROR_EVENT, {'error': str(e)}
+    finally:
+        telemetry.finish(error)
+
+
+async def chat_message(session_id: str, user_message: str):
+    """Process a single chat message and return agent response."""
+    async for event, data in stream_chat_message(session_id, user_message):
+        if event == DONE_EVENT:
+            return data
+        if event == ERROR_EVENT:
             return {
-                'response': response_text,
-                'is_done': is_done,
-                'history': session_data['history']
+                'error': data['error'],
+                'response': f"Error: {data['error']}",
+                'is_done': False
             }
-                
+
+
+def get_requirements(session_id: str):
+    """Build the requirements hand-off from a session's chat history, or None."""
+    session_data = session_store.get(session_id)
+    if session_data is None:
+        return None
+    return requirements_from_history(session_data['history'])
+
+
+def use_pipeline_cache() -> bool:
+    """False when the request body asks to bypass cached proposals with {"refresh": true}."""
+    data = request.get_json(silent=True) or {}
+    return not data.get('refresh', False)
+
+
+def pricing_options() -> PricingOptions:
+    """
+    Read what-if pricing options from the request body.
+
+    A re-quote with only a different currency, region, discount or list of
+    regions to compare reuses the memoized BOM, so it skips the BOM Agent.
+
+    Raises:
+        ValueError: If currency, region, discount_percent or compare_regions is invalid
+    """
+    data = request.get_json(silent=True) or {}
+    return PricingOptions(
+        currency=data.get('currency') or DEFAULT_CURRENCY,
+        region=data.get('region') or None,
+        discount_percent=data.get('discount_percent') or 0.0,
+        compare_regions=data.get('compare_regions') or (),
+    )
+
+
+async def stream_proposal(session_id: str, use_cache: bool = True,
+                          options: Optional[PricingOptions] = None):
+    """
+    Generate BOM, pricing, and proposal, yielding (event, data) pairs per pipeline event.
+
+    Yields:
+        Pipeline stage_started / text / stage_completed events, then ("done",
+        {"bom", "pricing", "proposal"}), or ("error", {"error"}) on failure
+    """
+    try:
+        requirements = await asyncio.to_thread(get_requirements, session_id)
+        if requirements is None:
+            yield ERROR_EVENT, {'error': 'No active session found'}
+            return
+
+        registry = await client_pool.get_registry()
+
+        # Run BOM → Pricing → Proposal pipeline, forwarding every event
+        outputs = {key: "" for key in STAGE_OUTPUT_KEYS.values()}
+        async for event in run_proposal_pipeline(
+            registry.client, requirements, registry=registry,
+            use_cache=use_cache, options=options
+        ):
+            if event.type == STAGE_TEXT:
+                outputs[STAGE_OUTPUT_KEYS[event.stage]] += event.text
+            yield event.type, pipeline_event_payload(event)
+
+        yield DONE_EVENT, outputs
+
     except Exception as e:
-        return {
-            'error': str(e),
-            'response': f"Error: {str(e)}",
-            'is_done': False
-        }
+        yield ERROR_EVENT, {'error': str(e)}
 
 
-async def generate_proposal(session_id: str):
+async def generate_proposal(session_id: str, use_cache: bool = True,
+                            options: Optional[PricingOptions] = None):
     """Generate BOM, pricing, and proposal from requirements."""
     try:
-        if session_id not in chat_threads:
+        requirements = await asyncio.to_thread(get_requirements, session_id)
+        if requirements is None:
             return {'error': 'No active session found'}
         
-        session_data = chat_threads[session_id]
-        
-        # Extract requirements from history
-        requirements = "\n".join([
-            f"{msg['role']}: {msg['content']}" 
-            for msg in session_data['history']
-        ])
-        
-        credential = DefaultAzureCredential()
-        endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT")
-        async with AzureAIAgentClient(
-            project_endpoint=endpoint,
-            async_credential=credential
-        ) as client:
-            # Create agents
-            bom_agent = create_bom_agent(client)
-            pricing_agent = create_pricing_agent(client)
-            proposal_agent = create_proposal_agent(client)
-            
-            # Build sequential workflow
-            workflow = SequentialBuilder().participants([
-                bom_agent,
-                pricing_agent,
-                proposal_agent
-            ]).build()
-            
-            # Run workflow and collect outputs
-            bom_output = ""
-            pricing_output = ""
-            proposal_output = ""
-            current_agent = ""
-            
-            async for event in workflow.run_stream(requirements):
-                # Track agent changes
-                if hasattr(event, 'executor_id') and event.executor_id:
-                    current_agent = event.executor_id
-                
-                # Collect outputs
-                if hasattr(event, 'data') and event.data:
-                    text = None
-                    if isinstance(event.data, str):
-                        text = event.data
-                    elif hasattr(event.data, 'text'):
-                        text = event.data.text
-                    
-                    if text:
-                        if current_agent == "bom_agent":
-                            bom_output += text
-                        elif current_agent == "pricing_agent":
-                            pricing_output += text
-                        elif current_agent == "proposal_agent":
-                            proposal_output += text
-            
-            return {
-                'bom': bom_output,
-                'pricing': pricing_output,
-                'proposal': proposal_output
-            }
+        registry = await client_pool.get_registry()
+
+        # Run BOM → Pricing → Proposal pipeline and collect outputs
+        return await generate_proposal_outputs(
+            registry.client, requirements, registry=registry,
+            use_cache=use_cache, options=options
+        )
                 
     except Exception as e:
         return {
@@ -163,6 +274,92 @@ async def generate_proposal(session_id: str):
         }
 
 
+def proposal_job(requirements: str, use_cache: bool = True,
+                 options: Optional[PricingOptions] = None):
+    """Create a job runner generating a proposal and reporting progress per stage."""
+    async def run(report):
+        registry = await client_pool.get_registry()
+
+        outputs = {key: "" for key in STAGE_OUTPUT_KEYS.values()}
+        async for event in run_proposal_pipeline(
+            registry.client, requirements, registry=registry,
+            use_cache=use_cache, options=options
+        ):
+            if event.type == STAGE_STARTED:
+                await report(stage=event.stage)
+            elif event.type == STAGE_TEXT:
+                outputs[STAGE_OUTPUT_KEYS[event.stage]] += event.text
+            elif event.type == STAGE_COMPLETED:
+                await report(outputs=dict(outputs))
+        return outputs
+
+    return run
+
+
+def stream_events(events, timeout: float):
+    """Stream (event, data) pairs from the worker event loop as an SSE response."""
+    def frames():
+        try:
+            for event, data in runtime.iterate(events, timeout=timeout):
+                yield format_sse(event, data)
+        except TimeoutError as e:
+            yield format_sse(ERROR_EVENT, {'error': str(e)})
+
+    return Response(frames(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+
+@app.before_request
+def start_request_timer():
+    """Note when the request started, for the request duration metric."""
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_duration(response):
+    """Time routed requests until the response, including a streamed body, is fully sent."""
+    started = g.get('request_started')
+    if request.url_rule is None or request.url_rule.rule == '/metrics' or started is None:
+        return response
+
+    labels = {
+        'endpoint': request.url_rule.rule,
+        'method': request.method,
+        'status': str(response.status_code),
+    }
+    response.call_on_close(
+        lambda: get_metrics().http_request_duration.observe(time.perf_counter() - started, **labels)
+    )
+    return response
+
+
+def worker_gauges():
+    """Gauges read at scrape time from this worker's session store, job queue and caches."""
+    sessions = session_store.stats()
+    session_count = Gauge('sessions', 'Chat sessions held by the session store')
+    session_count.set(sessions['sessions'])
+    session_bytes = Gauge('session_store_bytes', 'Bytes of session data held by the session store')
+    session_bytes.set(sessions['bytes'])
+
+    jobs_pending = Gauge('jobs_pending', 'Background proposal jobs queued or running on this worker')
+    jobs_pending.set(job_queue.stats()['pending'])
+
+    cache_entries = Gauge('cache_entries', 'Entries held by each cache', ('cache',))
+    cache_hit_ratio = Gauge('cache_hit_ratio', 'Cache hits over lookups since the worker started', ('cache',))
+    for name, cache in (
+        ('pipeline', get_pipeline_cache()),
+        ('bom', get_bom_cache()),
+        ('pricing_mcp', get_pricing_cache()),
+    ):
+        stats = cache.stats()
+        cache_entries.set(stats['entries'], cache=name)
+        cache_hit_ratio.set(stats['hit_ratio'], cache=name)
+
+    mcp_in_flight = Gauge('mcp_calls_in_flight', 'Distinct upstream pricing MCP calls in flight')
+    mcp_in_flight.set(get_pricing_single_flight().stats()['in_flight'])
+
+    return [session_count, session_bytes, jobs_pending, cache_entries, cache_hit_ratio, mcp_in_flight]
+
+
 @app.route('/')
 def index():
     """Render main page."""
@@ -178,14 +375,34 @@ def chat():
     
     user_message = data.get('message', '')
     
-    # Run async chat_message in event loop
+    # Run async chat_message on the worker event loop
     try:
-        result = asyncio.run(chat_message(session_id, user_message))
+        result = runtime.run(
+            chat_message(session_id, user_message),
+            timeout=CHAT_TIMEOUT_SECONDS
+        )
         return jsonify(result)
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Handle chat messages, streaming the reply as Server-Sent Events."""
+    data = request.json
+    session_id = session.get('session_id', os.urandom(16).hex())
+    session['session_id'] = session_id
+
+    user_message = data.get('message', '')
+
+    return stream_events(
+        stream_chat_message(session_id, user_message),
+        timeout=CHAT_TIMEOUT_SECONDS
+    )
+
+
 @app.route('/api/generate-proposal', methods=['POST'])
 def generate():
     """Generate full proposal."""
@@ -194,20 +411,157 @@ def generate():
     if not session_id:
         return jsonify({'error': 'No active session'}), 400
     
-    # Run async generate_proposal in event loop
     try:
-        result = asyncio.run(generate_proposal(session_id))
+        options = pricing_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Run async generate_proposal on the worker event loop
+    try:
+        result = runtime.run(
+            generate_proposal(session_id, use_cache=use_pipeline_cache(), options=options),
+            timeout=PROPOSAL_TIMEOUT_SECONDS
+        )
         return jsonify(result)
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/generate-proposal/stream', methods=['POST'])
+def generate_stream():
+    """Generate full proposal, streaming stage events and text as Server-Sent Events."""
+    session_id = session.get('session_id')
+
+    if not session_id:
+        return jsonify({'error': 'No active session'}), 400
+
+    try:
+        options = pricing_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return stream_events(
+        stream_proposal(session_id, use_cache=use_pipeline_cache(), options=options),
+        timeout=PROPOSAL_TIMEOUT_SECONDS
+    )
+
+
+@app.route('/api/compare-regions', methods=['POST'])
+def compare_regions_route():
+    """Price a validated BOM across regions and rank them, without running any agent."""
+    data = request.get_json(silent=True) or {}
+    bom_items = data.get('bom')
+
+    try:
+        validate_bom_json(bom_items)
+        options = PricingOptions(
+            currency=data.get('currency') or DEFAULT_CURRENCY,
+            compare_regions=data.get('regions') or (),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not options.compare_regions:
+        return jsonify({'error': 'regions must list at least one ARM region code'}), 400
+
+    async def compare():
+        registry = await client_pool.get_registry()
+        return await run_region_comparison(
+            bom_items, list(options.compare_regions),
+            registry=registry, currency=options.currency
+        )
+
+    try:
+        result = runtime.run(compare(), timeout=PROPOSAL_TIMEOUT_SECONDS)
+        return jsonify(result)
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Submit proposal generation as a background job and return its ID."""
+    session_id = session.get('session_id')
+
+    if not session_id:
+        return jsonify({'error': 'No active session'}), 400
+
+    requirements = get_requirements(session_id)
+    if requirements is None:
+        return jsonify({'error': 'No active session found'}), 404
+
+    try:
+        options = pricing_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        job = job_queue.submit(
+            proposal_job(requirements, use_cache=use_pipeline_cache(), options=options),
+            session_id=session_id
+        )
+    except JobQueueFull as e:
+        return jsonify({'error': f'Too many proposals in progress: {e}'}), 503, {'Retry-After': '30'}
+
+    job_id = job['job_id']
+    return jsonify({
+        'job_id': job_id,
+        'status': job['status'],
+        'status_url': f'/api/jobs/{job_id}',
+        'result_url': f'/api/jobs/{job_id}/result'
+    }), 202
+
+
+def get_session_job(job_id: str):
+    """Return a job owned by the current session, or None."""
+    job = job_queue.store.get(job_id)
+    if job is None or job.get('session_id') != session.get('session_id'):
+        return None
+    return job
+
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Report a job's status, current stage and stage outputs so far."""
+    job = get_session_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify({
+        'job_id': job_id,
+        'status': job['status'],
+        'stage': job['stage'],
+        'outputs': job['outputs'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    })
+
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    """Return a finished job's BOM, pricing and proposal."""
+    job = get_session_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    if job['status'] == JOB_SUCCEEDED:
+        return jsonify(job['result'])
+    if job['status'] == JOB_FAILED:
+        return jsonify({'error': job['error']}), 500
+    return jsonify({'job_id': job_id, 'status': job['status']}), 202
+
+
 @app.route('/api/reset', methods=['POST'])
 def reset():
     """Reset chat session."""
     session_id = session.get('session_id')
-    if session_id and session_id in chat_threads:
-        del chat_threads[session_id]
+    if session_id:
+        session_store.delete(session_id)
     session.clear()
     return jsonify({'status': 'reset'})
 
@@ -215,7 +569,27 @@ def reset():
 @app.route('/health')
 def health():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy'})
+    return jsonify({
+        'status': 'healthy',
+        'sessions': session_store.stats(),
+        'jobs': job_queue.stats(),
+        'pipeline_cache': get_pipeline_cache().stats(),
+        'bom_cache': get_bom_cache().stats(),
+        'pricing_cache': get_pricing_cache().stats(),
+        'pricing_single_flight': get_pricing_single_flight().stats()
+    })
+
+
+@app.route('/metrics')
+def metrics():
+    """Expose this worker's metrics in the Prometheus text format."""
+    return Response(
+        format_prometheus(
+            get_metrics().instruments() + worker_gauges(),
+            const_labels={'worker': str(os.getpid())},
+        ),
+        content_type=PROMETHEUS_CONTENT_TYPE,
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,196 @@
+"""Fake Chat Client - Deterministic offline stand-in for the Azure AI chat model.
+
+Recognizes which agent is calling from its instructions and streams a canned
+response for it: a schema-valid BOM for the BOM Agent, a fixed narrative for
+the Pricing Agent, a fixed proposal section for the Proposal Agent and a
+finished requirements summary for the Question Agent. Responses are streamed
+in fixed-size chunks with a configurable time to first token and delay per
+chunk, so runs are repeatable and the latency profile resembles a real model.
+Tools are never called.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterable, Dict, List, MutableSequence
+
+from agent_framework import (
+    BaseChatClient,
+    ChatMessage,
+    ChatOptions,
+    ChatResponse,
+    ChatResponseUpdate,
+    Role,
+    TextContent,
+)
+
+from src.agents.bom_agent import BOM_INSTRUCTIONS
+from src.agents.pricing_agent import PRICING_INSTRUCTIONS
+from src.agents.proposal_agent import PROPOSAL_INSTRUCTIONS
+from src.pipeline import BOM_STAGE, PRICING_STAGE, PROPOSAL_STAGE
+from src.prompts import DONE_MARKER
+
+QUESTION_STAGE = "question_agent"
+
+# Defaults shaping the simulated model
+DEFAULT_FIRST_TOKEN_MS = 300.0
+DEFAULT_CHUNK_MS = 15.0
+DEFAULT_CHUNK_CHARS = 16
+DEFAULT_BOM_ITEMS = 8
+
+# Services the fake BOM cycles through: (serviceName, sku, hours_per_month)
+BOM_SERVICES = [
+    ("Virtual Machines", "Standard_D4s_v5", 730),
+    ("Azure App Service", "P1v3", 730),
+    ("SQL Database", "GP_Gen5_4", 730),
+    ("Storage", "Standard_LRS", 730),
+    ("Azure Kubernetes Service", "Standard_D8s_v5", 730),
+    ("Azure Cache for Redis", "C2", 730),
+    ("Application Gateway", "WAF_v2", 730),
+    ("Azure Functions", "EP1", 400),
+]
+
+# Regions the fake BOM cycles through: (region, armRegionName)
+BOM_REGIONS = [("East US", "eastus"), ("West Europe", "westeurope")]
+
+REQUIREMENTS_SUMMARY = (
+    "A customer-facing web application with an API tier, a relational database, "
+    "a cache and blob storage, deployed in East US with a disaster recovery copy "
+    "in West Europe, sized for 50,000 daily users."
+)
+
+QUESTION_RESPONSE = (
+    "Thanks, I have everything I need.\n\n"
+    f"Requirements summary: {REQUIREMENTS_SUMMARY}\n\n"
+    f"{DONE_MARKER}"
+)
+
+PRICING_NARRATIVE = (
+    "## Cost Analysis\n\n"
+    "Compute dominates the estimate: the Kubernetes node pool and the virtual "
+    "machines account for most of the monthly total. The database is the next "
+    "largest line. A 3-year savings plan on the compute lines lowers the "
+    "monthly cost substantially for a steady workload, and every line was "
+    "priced, so no manual follow-up is needed.\n"
+)
+
+
+
+def fake_bom_response(item_count: int = DEFAULT_BOM_ITEMS) -> str:
+    """Return a BOMResponse JSON document with item_count items."""
+    items = []
+    for index in range(item_count):
+        service_name, sku, hours = BOM_SERVICES[index % len(BOM_SERVICES)]
+        region, arm_region = BOM_REGIONS[(index // len(BOM_SERVICES)) % len(BOM_REGIONS)]
+        items.append({
+            "serviceName": service_name,
+            "sku": sku,
+            "quantity": index % 3 + 1,
+            "region": region,
+            "armRegionName": arm_region,
+            "hours_per_month": hours,
+        })
+    return json.dumps({"requirements_summary": REQUIREMENTS_SUMMARY, "items": items})
+
+
+def fake_proposal_section() -> str:
+    """Return the body of one narrative proposal section, of realistic length."""
+    paragraph = (
+        "The recommended architecture follows the Azure Well-Architected Framework, "
+        "balancing reliability, security and cost for the expected load. "
+    ) * 4
+    return "\n\n".join([paragraph.strip()] * 3)
+
+
+class FakeChatClient(BaseChatClient):
+    """
+    Chat client returning canned, paced responses per agent without any network calls.
+
+    Args:
+        first_token_ms: Delay before the first streamed chunk
+        chunk_ms: Delay between streamed chunks
+        chunk_chars: Characters per streamed chunk
+        bom_items: Number of items in the fake BOM
+    """
+
+    OTEL_PROVIDER_NAME = "fake"
+
+    def __init__(
+        self,
+        *,
+        first_token_ms: float = DEFAULT_FIRST_TOKEN_MS,
+        chunk_ms: float = DEFAULT_CHUNK_MS,
+        chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        bom_items: int = DEFAULT_BOM_ITEMS,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.first_token_seconds = first_token_ms / 1000
+        self.chunk_seconds = chunk_ms / 1000
+        self.chunk_chars = max(1, chunk_chars)
+        self.responses: Dict[str, str] = {
+            QUESTION_STAGE: QUESTION_RESPONSE,
+            BOM_STAGE: fake_bom_response(bom_items),
+            PRICING_STAGE: PRICING_NARRATIVE,
+            PROPOSAL_STAGE: fake_proposal_section(),
+        }
+
+    def agent_for(self, messages: MutableSequence[ChatMessage], chat_options: ChatOptions) -> str:
+        """
+        Return which agent a request comes from, by its instructions.
+
+        Raises:
+            ValueError: If the instructions match no known agent
+        """
+        instructions = [getattr(chat_options, "instructions", None) or ""]
+        instructions += [
+            message.text or "" for message in messages
+            if getattr(message.role, "value", message.role) == "system"
+        ]
+        text = "\n".join(instructions)
+
+        markers = {
+            BOM_STAGE: BOM_INSTRUCTIONS.splitlines()[0],
+            PRICING_STAGE: PRICING_INSTRUCTIONS.splitlines()[0],
+            PROPOSAL_STAGE: PROPOSAL_INSTRUCTIONS.splitlines()[0],
+            QUESTION_STAGE: "specializing in requirement gathering",
+        }
+        for stage, marker in markers.items():
+            if marker in text:
+                return stage
+        raise ValueError(f"Fake chat client cannot tell which agent sent: {text[:120]!r}")
+
+    def _chunks(self, text: str) -> List[str]:
+        return [text[start:start + self.chunk_chars] for start in range(0, len(text), self.chunk_chars)]
+
+    async def _inner_get_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        stage = self.agent_for(messages, chat_options)
+        text = self.responses[stage]
+        await asyncio.sleep(self.first_token_seconds + self.chunk_seconds * (len(self._chunks(text)) - 1))
+        return ChatResponse(
+            messages=[ChatMessage(role=Role.ASSISTANT, contents=[TextContent(text=text)])],
+            model_id="fake",
+        )
+
+    async def _inner_get_streaming_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> AsyncIterable[ChatResponseUpdate]:
+        stage = self.agent_for(messages, chat_options)
+        await asyncio.sleep(self.first_token_seconds)
+        for index, chunk in enumerate(self._chunks(self.responses[stage])):
+            if index:
+                await asyncio.sleep(self.chunk_seconds)
+            yield ChatResponseUpdate(
+                role=Role.ASSISTANT,
+                contents=[TextContent(text=chunk)],
+                model_id="fake",
+            )
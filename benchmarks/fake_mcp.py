@@ -0,0 +1,121 @@
+"""Fake MCP Server - Local stand-in for the Azure Pricing and Microsoft Learn MCP servers.
+
+Serves azure_cost_estimate and microsoft_docs_search over streamable HTTP with
+a fixed latency per call. Prices are derived from a stable hash of the
+service, SKU and region, so every run sees the same numbers.
+
+    python -m benchmarks.fake_mcp --port 8765 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import zlib
+
+from mcp.server.fastmcp import FastMCP
+
+# Path the streamable HTTP endpoint is served on
+MCP_PATH = "/mcp"
+
+# Defaults if not given on the command line
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_LATENCY_MS = 50.0
+
+# Savings plan discounts off the on-demand rate
+SAVINGS_PLAN_DISCOUNTS = {"1 Year": 0.20, "3 Years": 0.35}
+
+
+def fake_hourly_rate(service_name: str, sku_name: str, region: str) -> float:
+    """Return a deterministic hourly rate between $0.01 and $2.00."""
+    digest = zlib.crc32(f"{service_name}|{sku_name}|{region}".lower().encode("utf-8"))
+    return round(0.01 + (digest % 19900) / 10000, 4)
+
+
+def fake_cost_estimate(
+    service_name: str,
+    sku_name: str,
+    region: str,
+    hours_per_month: float,
+    currency_code: str,
+) -> dict:
+    """Build an azure_cost_estimate payload shaped like the real server's."""
+    hourly = fake_hourly_rate(service_name, sku_name, region)
+    return {
+        "service_name": service_name,
+        "sku_name": sku_name,
+        "region": region,
+        "currency": currency_code,
+        "on_demand_pricing": {
+            "hourly_rate": hourly,
+            "monthly_cost": round(hourly * hours_per_month, 2),
+        },
+        "savings_plans": [
+            {
+                "term": term,
+                "hourly_rate": round(hourly * (1 - discount), 4),
+                "monthly_cost": round(hourly * (1 - discount) * hours_per_month, 2),
+            }
+            for term, discount in SAVINGS_PLAN_DISCOUNTS.items()
+        ],
+    }
+
+
+def create_fake_mcp_server(
+    latency_seconds: float = DEFAULT_LATENCY_MS / 1000,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+) -> FastMCP:
+    """
+    Create the fake MCP server.
+
+    Args:
+        latency_seconds: Delay added to every tool call
+        host: Interface to listen on
+        port: Port to listen on
+
+    Returns:
+        FastMCP server; serve it with run(transport="streamable-http")
+    """
+    server = FastMCP(
+        "Fake Azure Pricing",
+        host=host,
+        port=port,
+        streamable_http_path=MCP_PATH,
+        log_level="WARNING",
+    )
+
+    @server.tool()
+    async def azure_cost_estimate(
+        service_name: str,
+        sku_name: str,
+        region: str,
+        hours_per_month: float = 730,
+        currency_code: str = "USD",
+    ) -> str:
+        """Estimate the cost of an Azure SKU in a region."""
+        await asyncio.sleep(latency_seconds)
+        return json.dumps(fake_cost_estimate(service_name, sku_name, region, hours_per_month, currency_code))
+
+    @server.tool()
+    async def microsoft_docs_search(query: str) -> str:
+        """Search Microsoft Learn documentation."""
+        await asyncio.sleep(latency_seconds)
+        return json.dumps([{"title": f"About {query}", "content": f"Documentation for {query}."}])
+
+    return server
+
+
+def main() -> None:
+    """Command-line entry point serving the fake MCP server until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve a local fake Azure Pricing / Microsoft Learn MCP server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="Delay added to every tool call")
+    args = parser.parse_args()
+
+    create_fake_mcp_server(args.latency_ms / 1000, args.host, args.port).run(transport="streamable-http")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Prompt Token Report - Input tokens per agent request, and what trimming saves.
+
+Counts, for each agent, the static prefix sent on every request (instructions
+and response schema), the optional worked examples, and the per-request input
+built from a sample conversation and the stage hand-off for the fake BOM used
+by the benchmarks. It also compares handing the pipeline the whole chat
+transcript with handing it the Question Agent's final summary.
+
+Tokens are counted with tiktoken when installed, otherwise estimated at four
+characters per token. Tool definitions fetched from the MCP servers are part of
+the cached prefix too but are not counted, since they need a live server.
+
+    python -m benchmarks.prompt_tokens
+    python -m benchmarks.prompt_tokens --json
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_llm import DEFAULT_BOM_ITEMS, PRICING_NARRATIVE, QUESTION_RESPONSE, fake_bom_response
+from benchmarks.fake_mcp import fake_cost_estimate
+from src.agents.bom_agent import (
+    BOM_EXAMPLES,
+    BOM_INSTRUCTIONS,
+    SNAPSHOT_INSTRUCTIONS,
+    BOMResponse,
+    parse_structured_bom,
+)
+from src.agents.pricing_agent import PRICING_INSTRUCTIONS
+from src.agents.proposal_agent import PROPOSAL_EXAMPLES, PROPOSAL_INSTRUCTIONS
+from src.agents.question_agent import QUESTION_EXAMPLES, QUESTION_INSTRUCTIONS
+from src.handoff import StageHandoff, render_pricing_input
+from src.pricing import DEFAULT_CURRENCY, normalize_cost_estimate, price_bom
+from src.prompts import count_tokens, prompt_token_report, requirements_from_history
+from src.proposal import EXECUTIVE_SUMMARY, NARRATIVE_SECTIONS, render_section_request
+
+# Sample conversation gathering the fake BOM's requirements
+SAMPLE_HISTORY = [
+    ("user", "Hi, I need an Azure estimate."),
+    ("assistant", "Happy to help. What kind of workload are you planning to run?"),
+    ("user", "A customer-facing web application with an API tier."),
+    ("assistant", "How many daily users do you expect, and what data does the application store?"),
+    ("user", "About 50,000 daily users. It needs a relational database, a cache and blob storage."),
+    ("assistant", "Which Azure region should it run in, and do you need disaster recovery?"),
+    ("user", "East US, with a disaster recovery copy in West Europe."),
+    ("assistant", QUESTION_RESPONSE),
+]
+
+
+def sample_history() -> List[Dict[str, str]]:
+    """Return the sample conversation as session history messages."""
+    return [{"role": role, "content": content} for role, content in SAMPLE_HISTORY]
+
+
+async def sample_handoff(bom_items: int) -> StageHandoff:
+    """Build the stage hand-off for the fake BOM with fake prices and the fake narrative."""
+    summary, items = parse_structured_bom(fake_bom_response(bom_items))
+
+    async def lookup(item: Dict[str, Any], currency: str) -> Optional[Dict[str, Any]]:
+        estimate = fake_cost_estimate(
+            item["serviceName"], item["sku"], item["armRegionName"], item["hours_per_month"], currency
+        )
+        return normalize_cost_estimate(estimate, item["hours_per_month"])
+
+    pricing = await price_bom(items, lookup, currency=DEFAULT_CURRENCY)
+    return StageHandoff(summary, items, pricing=pricing, pricing_narrative=PRICING_NARRATIVE)
+
+
+def build_report(bom_items: int = DEFAULT_BOM_ITEMS) -> Dict[str, Any]:
+    """
+    Account for the input tokens of each agent's request in one proposal.
+
+    Returns:
+        Dict with a prompt_token_report per agent under "agents" and the
+        token counts of the full and summarized transcript under "handoff"
+    """
+    history = sample_history()
+    full_transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in history)
+    requirements = requirements_from_history(history)
+    handoff = asyncio.run(sample_handoff(bom_items))
+    bom_schema = json.dumps(BOMResponse.model_json_schema())
+
+    agents = {
+        "question_agent": prompt_token_report(QUESTION_INSTRUCTIONS, QUESTION_EXAMPLES),
+        "bom_agent": prompt_token_report(BOM_INSTRUCTIONS + bom_schema, BOM_EXAMPLES, requirements),
+        "bom_agent (snapshot)": prompt_token_report(
+            BOM_INSTRUCTIONS + SNAPSHOT_INSTRUCTIONS + bom_schema, BOM_EXAMPLES, requirements
+        ),
+        "pricing_agent": prompt_token_report(PRICING_INSTRUCTIONS, "", render_pricing_input(handoff)),
+        f"proposal_agent (x{len(NARRATIVE_SECTIONS)})": prompt_token_report(
+            PROPOSAL_INSTRUCTIONS, PROPOSAL_EXAMPLES, render_section_request(handoff, EXECUTIVE_SUMMARY)
+        ),
+    }
+    return {
+        "agents": agents,
+        "handoff": {
+            "transcript_tokens": count_tokens(full_transcript),
+            "summary_tokens": count_tokens(requirements),
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render the report as a table per agent, then the requirements hand-off."""
+    lines = [
+        f"{'agent':<22}{'static':>8}{'cached':>8}{'request':>9}{'total':>8}{'examples':>10}",
+    ]
+    for name, tokens in report["agents"].items():
+        lines.append(
+            f"{name:<22}{tokens['static_tokens']:>8}{tokens['cacheable_tokens']:>8}"
+            f"{tokens['request_tokens']:>9}{tokens['total_tokens']:>8}{tokens['optional_tokens']:>10}"
+        )
+    handoff = report["handoff"]
+    saved = handoff["transcript_tokens"] - handoff["summary_tokens"]
+    lines.append("")
+    lines.append(
+        f"Requirements hand-off: {handoff['summary_tokens']} tokens as a summary, "
+        f"{handoff['transcript_tokens']} as the full transcript ({saved} saved per agent that reads it)"
+    )
+    lines.append(
+        "static: instructions and response schema, sent on every request; cached: static tokens "
+        "servable from the endpoint's prompt cache; examples: tokens AGENT_PROMPT_EXAMPLES would add"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the prompt token report."""
+    parser = argparse.ArgumentParser(description="Report input tokens per agent request.")
+    parser.add_argument("--bom-items", type=int, default=DEFAULT_BOM_ITEMS, help="Items in the sample BOM")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.bom_items)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
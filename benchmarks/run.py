@@ -0,0 +1,456 @@
+"""Benchmark Runner - End-to-end latency, throughput and memory with local stand-ins.
+
+Runs the proposal pipeline and the web endpoints against FakeChatClient (a
+deterministic offline chat model) and a local fake MCP server started in a
+subprocess, so results are repeatable on an offline machine and comparable
+between commits.
+
+Scenarios:
+    pipeline           run_proposal_pipeline on a shared, connected registry
+                       (per-stage latency and memory)
+    workflow           main.run_sequential_workflow, building agents and MCP
+                       connections per run as the CLI does
+    generate_proposal  app.generate_proposal on the web worker's event loop
+    flask_chat         POST /api/chat for a new session
+    flask_proposal     POST /api/generate-proposal
+    flask_stream       POST /api/generate-proposal/stream, read to the end
+
+Every run bypasses the proposal and BOM caches; pricing MCP results are not
+cached either unless --warm-pricing-cache is given.
+
+    python -m benchmarks.run --iterations 30 --output bench.json
+    python -m benchmarks.run --baseline bench.json --max-regression 0.10
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.stats import DEFAULT_MAX_REGRESSION, compare_to_baseline, format_report, summarize_latency
+
+SCENARIOS = ("pipeline", "workflow", "generate_proposal", "flask_chat", "flask_proposal", "flask_stream")
+
+# Defaults if not given on the command line
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP = 2
+DEFAULT_CONCURRENCY = 1
+
+# Seconds allowed for the fake MCP server to start and for one web request
+SERVER_START_TIMEOUT_SECONDS = 15.0
+REQUEST_TIMEOUT_SECONDS = 300.0
+
+# Settings that must match for two runs to be comparable
+SIMULATION_SETTINGS = (
+    "bom_items",
+    "llm_first_token_ms",
+    "llm_chunk_ms",
+    "llm_chunk_chars",
+    "mcp_latency_ms",
+    "concurrency",
+    "warm_pricing_cache",
+    "snapshot",
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class MemoryTracker:
+    """Peak memory traced during one run, overall and per pipeline stage, in bytes."""
+
+    def __init__(self):
+        self.peak = 0
+        self.stages: Dict[str, int] = {}
+        self._stage_start: Dict[str, int] = {}
+
+    def _fold(self) -> tuple:
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        tracemalloc.reset_peak()
+        return current, peak
+
+    def stage_started(self, stage: str) -> None:
+        self._stage_start[stage] = self._fold()[0]
+
+    def stage_completed(self, stage: str) -> None:
+        self.stages[stage] = self._fold()[1] - self._stage_start.get(stage, 0)
+
+    def finish(self) -> int:
+        self._fold()
+        return self.peak
+
+
+# One run of a scenario; returns per-stage durations in seconds (possibly empty)
+AsyncRun = Callable[[Optional[MemoryTracker]], Awaitable[Dict[str, float]]]
+SyncRun = Callable[[Optional[MemoryTracker]], Dict[str, float]]
+
+
+async def measure_async(run_once: AsyncRun, iterations: int, warmup: int, concurrency: int) -> Dict[str, Any]:
+    """Run a coroutine scenario: warm up, time concurrent runs, then trace memory of one run."""
+    for _ in range(warmup):
+        await run_once(None)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def timed() -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                stages = await run_once(None)
+            except Exception as e:
+                return {"error": f"{type(e).__name__}: {e}"}
+            return {"seconds": time.perf_counter() - started, "stages": stages}
+
+    wall_started = time.perf_counter()
+    runs = await asyncio.gather(*(timed() for _ in range(iterations)))
+    wall_seconds = time.perf_counter() - wall_started
+
+    tracker = MemoryTracker()
+    tracemalloc.start()
+    try:
+        await run_once(tracker)
+        tracker.finish()
+    finally:
+        tracemalloc.stop()
+    return summarize_runs(runs, wall_seconds, tracker)
+
+
+def measure_threaded(run_once: SyncRun, iterations: int, warmup: int, concurrency: int) -> Dict[str, Any]:
+    """Run a blocking scenario (web requests) from a pool of threads, like concurrent clients."""
+    for _ in range(warmup):
+        run_once(None)
+
+    def timed(_: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            stages = run_once(None)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        return {"seconds": time.perf_counter() - started, "stages": stages}
+
+    wall_started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        runs = list(executor.map(timed, range(iterations)))
+    wall_seconds = time.perf_counter() - wall_started
+
+    tracker = MemoryTracker()
+    tracemalloc.start()
+    try:
+        run_once(tracker)
+        tracker.finish()
+    finally:
+        tracemalloc.stop()
+    return summarize_runs(runs, wall_seconds, tracker)
+
+
+def summarize_runs(runs: List[Dict[str, Any]], wall_seconds: float, tracker: MemoryTracker) -> Dict[str, Any]:
+    """Build a scenario result from timed runs and the memory-traced run."""
+    succeeded = [run for run in runs if "seconds" in run]
+    failed = [run for run in runs if "error" in run]
+
+    stage_samples: Dict[str, List[float]] = {}
+    for run in succeeded:
+        for stage, seconds in run["stages"].items():
+            stage_samples.setdefault(stage, []).append(seconds)
+
+    result: Dict[str, Any] = {
+        "latency": summarize_latency([run["seconds"] for run in succeeded]),
+        "throughput_per_second": round(len(succeeded) / wall_seconds, 3) if wall_seconds > 0 else None,
+        "peak_memory_kib": round(tracker.peak / 1024, 1),
+        "stages": {
+            stage: {
+                "latency": summarize_latency(samples),
+                "peak_memory_kib": (
+                    round(tracker.stages[stage] / 1024, 1) if stage in tracker.stages else None
+                ),
+            }
+            for stage, samples in stage_samples.items()
+        },
+        "errors": len(failed),
+    }
+    if failed:
+        result["first_error"] = failed[0]["error"]
+    return result
+
+
+async def run_pipeline_scenario(client: Any, requirements: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark run_proposal_pipeline on one registry shared by every run, as a web worker does."""
+    from src.agents import AgentRegistry
+    from src.pipeline import STAGE_COMPLETED, STAGE_STARTED, run_proposal_pipeline
+    from src.pricing import get_price_catalog
+
+    registry = AgentRegistry(client, price_catalog=get_price_catalog())
+    await registry.start()
+
+    async def run_once(memory: Optional[MemoryTracker]) -> Dict[str, float]:
+        started: Dict[str, float] = {}
+        stages: Dict[str, float] = {}
+        async for event in run_proposal_pipeline(client, requirements, registry=registry, use_cache=False):
+            if event.type == STAGE_STARTED:
+                started[event.stage] = time.perf_counter()
+                if memory is not None:
+                    memory.stage_started(event.stage)
+            elif event.type == STAGE_COMPLETED:
+                stages[event.stage] = time.perf_counter() - started[event.stage]
+                if memory is not None:
+                    memory.stage_completed(event.stage)
+        return stages
+
+    try:
+        return await measure_async(run_once, args.iterations, args.warmup, args.concurrency)
+    finally:
+        await registry.aclose()
+
+
+async def run_workflow_scenario(client: Any, requirements: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark the CLI's run_sequential_workflow, which builds agents and MCP connections per run."""
+    from main import run_sequential_workflow
+
+    async def run_once(memory: Optional[MemoryTracker]) -> Dict[str, float]:
+        # The workflow prints the whole proposal; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            proposal = await run_sequential_workflow(client, requirements)
+        if not proposal.strip():
+            raise RuntimeError("Workflow returned an empty proposal")
+        return {}
+
+    return await measure_async(run_once, args.iterations, args.warmup, args.concurrency)
+
+
+def run_web_scenario(name: str, client: Any, requirements: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark the web app in-process: its worker event loop, session store and Flask routes."""
+    import app as web_app
+    from src.clients import AgentClientPool
+
+    # Serve every request with the fake model instead of Azure AI
+    web_app.client_pool = AgentClientPool(client=client)
+    web_app.app.testing = True
+
+    def new_session() -> str:
+        session_id = uuid.uuid4().hex
+        web_app.session_store.save(session_id, {
+            "thread": None,
+            "history": [{"role": "user", "content": requirements}],
+        })
+        return session_id
+
+    def session_client():
+        test_client = web_app.app.test_client()
+        with test_client.session_transaction() as flask_session:
+            flask_session["session_id"] = new_session()
+        return test_client
+
+    def check(response) -> None:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    def generate_proposal(memory: Optional[MemoryTracker]) -> Dict[str, float]:
+        outputs = web_app.runtime.run(
+            web_app.generate_proposal(new_session(), use_cache=False),
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+        if "error" in outputs:
+            raise RuntimeError(outputs["error"])
+        return {}
+
+    def flask_chat(memory: Optional[MemoryTracker]) -> Dict[str, float]:
+        response = web_app.app.test_client().post("/api/chat", json={"message": "I need a web app in East US."})
+        check(response)
+        if response.get_json().get("error"):
+            raise RuntimeError(response.get_json()["error"])
+        return {}
+
+    def flask_proposal(memory: Optional[MemoryTracker]) -> Dict[str, float]:
+        response = session_client().post("/api/generate-proposal", json={"refresh": True})
+        check(response)
+        if response.get_json().get("error"):
+            raise RuntimeError(response.get_json()["error"])
+        return {}
+
+    def flask_stream(memory: Optional[MemoryTracker]) -> Dict[str, float]:
+        response = session_client().post("/api/generate-proposal/stream", json={"refresh": True})
+        check(response)
+        body = response.get_data(as_text=True)
+        if "event: error" in body:
+            raise RuntimeError(body[body.index("event: error"):][:200])
+        return {}
+
+    run_once = {
+        "generate_proposal": generate_proposal,
+        "flask_chat": flask_chat,
+        "flask_proposal": flask_proposal,
+        "flask_stream": flask_stream,
+    }[name]
+    return measure_threaded(run_once, args.iterations, args.warmup, args.concurrency)
+
+
+def free_port() -> int:
+    """Return a TCP port that is free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def fake_mcp_server(latency_ms: float):
+    """Run benchmarks.fake_mcp in a subprocess, yielding its URL once it accepts connections."""
+    from benchmarks.fake_mcp import MCP_PATH
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_mcp", "--port", str(port), "--latency-ms", str(latency_ms)],
+        cwd=REPO_ROOT,
+    )
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Fake MCP server exited with code {process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Fake MCP server did not start in time")
+                time.sleep(0.1)
+        yield f"http://127.0.0.1:{port}{MCP_PATH}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def configure_environment(args: argparse.Namespace, mcp_url: str) -> None:
+    """Point the app at the local stand-ins, overriding any .env values before they are read."""
+    os.environ["AZURE_PRICING_MCP_URL"] = mcp_url
+    os.environ["MICROSOFT_LEARN_MCP_URL"] = mcp_url
+    os.environ["AZURE_PRICES_SNAPSHOT_PATH"] = args.snapshot or ""
+    # No real client is ever created; the web app's startup attempt fails fast
+    os.environ["AZURE_AI_PROJECT_ENDPOINT"] = ""
+    os.environ["SESSION_STORE_URL"] = "memory://"
+    os.environ["JOB_STORE_URL"] = "memory://"
+    os.environ.setdefault("FLASK_SECRET_KEY", "benchmark")
+    if not args.warm_pricing_cache:
+        os.environ["PRICING_CACHE_TTL_SECONDS"] = "0"
+
+
+def run_benchmarks(args: argparse.Namespace, mcp_url: str) -> Dict[str, Any]:
+    """Run the selected scenarios and return the results document."""
+    configure_environment(args, mcp_url)
+
+    from benchmarks.fake_llm import REQUIREMENTS_SUMMARY, FakeChatClient
+    from src.runtime import suppress_async_generator_errors
+
+    def new_client() -> FakeChatClient:
+        return FakeChatClient(
+            first_token_ms=args.llm_first_token_ms,
+            chunk_ms=args.llm_chunk_ms,
+            chunk_chars=args.llm_chunk_chars,
+            bom_items=args.bom_items,
+        )
+
+    def run_async(scenario: Callable[..., Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        async def main() -> Dict[str, Any]:
+            asyncio.get_running_loop().set_exception_handler(suppress_async_generator_errors)
+            return await scenario(new_client(), REQUIREMENTS_SUMMARY, args)
+
+        return asyncio.run(main())
+
+    results: Dict[str, Any] = {
+        "config": {
+            **{setting: getattr(args, setting) for setting in SIMULATION_SETTINGS},
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        print(f"Running {name}...", file=sys.stderr)
+        if name == "pipeline":
+            results["scenarios"][name] = run_async(run_pipeline_scenario)
+        elif name == "workflow":
+            results["scenarios"][name] = run_async(run_workflow_scenario)
+        else:
+            results["scenarios"][name] = run_web_scenario(name, new_client(), REQUIREMENTS_SUMMARY, args)
+    return results
+
+
+def parse_scenarios(value: str) -> List[str]:
+    """Parse a comma-separated scenario list."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown scenarios {unknown}; choose from {', '.join(SCENARIOS)}")
+    return names
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns 1 if any run failed or a metric regressed."""
+    from benchmarks.fake_llm import DEFAULT_BOM_ITEMS, DEFAULT_CHUNK_CHARS, DEFAULT_CHUNK_MS, DEFAULT_FIRST_TOKEN_MS
+    from benchmarks.fake_mcp import DEFAULT_LATENCY_MS
+
+    parser = argparse.ArgumentParser(description="Benchmark the proposal pipeline offline with fake LLM and MCP servers.")
+    parser.add_argument("--scenarios", type=parse_scenarios, default=list(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Timed runs per scenario")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Untimed runs before timing")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Runs in flight at once")
+    parser.add_argument("--bom-items", type=int, default=DEFAULT_BOM_ITEMS, help="Items in the fake BOM")
+    parser.add_argument("--llm-first-token-ms", type=float, default=DEFAULT_FIRST_TOKEN_MS, help="Fake model time to first token")
+    parser.add_argument("--llm-chunk-ms", type=float, default=DEFAULT_CHUNK_MS, help="Fake model delay between streamed chunks")
+    parser.add_argument("--llm-chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS, help="Characters per streamed chunk")
+    parser.add_argument("--mcp-latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="Fake MCP server delay per tool call")
+    parser.add_argument("--mcp-url", help="Use an already running MCP server instead of starting the fake one")
+    parser.add_argument("--snapshot", help="Price from this local snapshot instead of the MCP server")
+    parser.add_argument("--warm-pricing-cache", action="store_true", help="Keep pricing MCP results cached between runs")
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Allowed relative slowdown against the baseline (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.mcp_url:
+        results = run_benchmarks(args, args.mcp_url)
+    else:
+        with fake_mcp_server(args.mcp_latency_ms) as mcp_url:
+            results = run_benchmarks(args, mcp_url)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        mismatched = [
+            setting for setting in SIMULATION_SETTINGS
+            if baseline.get("config", {}).get(setting) != results["config"][setting]
+        ]
+        if mismatched:
+            print(f"Warning: baseline was run with different {', '.join(mismatched)}", file=sys.stderr)
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        results["regressions"] = regressions
+
+    print(format_report(results, regressions))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = any(scenario["errors"] for scenario in results["scenarios"].values())
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
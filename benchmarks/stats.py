@@ -0,0 +1,181 @@
+"""Benchmark Statistics - Latency percentiles, throughput and baseline comparison.
+
+Pure standard library, so results can be summarized and compared without the
+agent framework installed.
+"""
+
+import math
+from typing import Any, Dict, List, Sequence
+
+# Latency percentiles reported for every scenario and stage
+PERCENTILES = (50, 95, 99)
+
+# Default allowed slowdown against a baseline before a metric is a regression
+DEFAULT_MAX_REGRESSION = 0.10
+
+# Differences smaller than this are noise even when the relative change is large
+MIN_REGRESSION_MS = 1.0
+MIN_REGRESSION_KIB = 64.0
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """
+    Return the pct-th percentile of samples, interpolating between ranks.
+
+    Raises:
+        ValueError: If samples is empty or pct is outside 0-100
+    """
+    if not samples:
+        raise ValueError("percentile of an empty sample")
+    if not 0 <= pct <= 100:
+        raise ValueError(f"percentile must be between 0 and 100, got {pct}")
+
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize_latency(samples_seconds: Sequence[float]) -> Dict[str, Any]:
+    """
+    Summarize latencies in milliseconds.
+
+    Args:
+        samples_seconds: One duration per completed run, in seconds
+
+    Returns:
+        Dict with count, mean_ms, max_ms and p50_ms / p95_ms / p99_ms
+    """
+    samples_ms = [sample * 1000 for sample in samples_seconds]
+    summary: Dict[str, Any] = {"count": len(samples_ms)}
+    if not samples_ms:
+        return summary
+
+    summary["mean_ms"] = round(sum(samples_ms) / len(samples_ms), 3)
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(samples_ms, pct), 3)
+    summary["max_ms"] = round(max(samples_ms), 3)
+    return summary
+
+
+def compare_to_baseline(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_regression: float = DEFAULT_MAX_REGRESSION,
+) -> List[Dict[str, Any]]:
+    """
+    Find metrics that got worse than a previous run by more than max_regression.
+
+    Latency percentiles and peak memory regress when they grow, throughput
+    when it shrinks. Scenarios or stages missing from either run are skipped,
+    as are changes below MIN_REGRESSION_MS / MIN_REGRESSION_KIB.
+
+    Args:
+        results: Current run, as produced by benchmarks.run
+        baseline: Earlier run to compare against
+        max_regression: Allowed relative change, e.g. 0.10 for 10%
+
+    Returns:
+        One dict per regression with metric, baseline, current and change
+        (relative, positive meaning worse)
+    """
+    regressions = []
+    baseline_scenarios = baseline.get("scenarios", {})
+
+    for name, scenario in results.get("scenarios", {}).items():
+        previous = baseline_scenarios.get(name)
+        if previous is None:
+            continue
+
+        targets = [(name, scenario, previous)]
+        for stage, stage_result in scenario.get("stages", {}).items():
+            previous_stage = previous.get("stages", {}).get(stage)
+            if previous_stage is not None:
+                targets.append((f"{name}.{stage}", stage_result, previous_stage))
+
+        for label, current, earlier in targets:
+            for pct in PERCENTILES:
+                metric = f"p{pct}_ms"
+                regressions += _check(
+                    f"{label}.{metric}",
+                    earlier.get("latency", {}).get(metric),
+                    current.get("latency", {}).get(metric),
+                    max_regression,
+                    MIN_REGRESSION_MS,
+                )
+            regressions += _check(
+                f"{label}.peak_memory_kib",
+                earlier.get("peak_memory_kib"),
+                current.get("peak_memory_kib"),
+                max_regression,
+                MIN_REGRESSION_KIB,
+            )
+            regressions += _check(
+                f"{label}.throughput_per_second",
+                earlier.get("throughput_per_second"),
+                current.get("throughput_per_second"),
+                max_regression,
+                0.0,
+                higher_is_better=True,
+            )
+
+    return regressions
+
+
+def _check(
+    metric: str,
+    baseline: Any,
+    current: Any,
+    max_regression: float,
+    min_difference: float,
+    higher_is_better: bool = False,
+) -> List[Dict[str, Any]]:
+    """Return [regression] if current is worse than baseline beyond both thresholds, else []."""
+    if not isinstance(baseline, (int, float)) or not isinstance(current, (int, float)) or baseline <= 0:
+        return []
+
+    worse_by = (baseline - current) if higher_is_better else (current - baseline)
+    change = worse_by / baseline
+    if change <= max_regression or worse_by <= min_difference:
+        return []
+    return [{
+        "metric": metric,
+        "baseline": baseline,
+        "current": current,
+        "change": round(change, 4),
+    }]
+
+
+def format_report(results: Dict[str, Any], regressions: Sequence[Dict[str, Any]] = ()) -> str:
+    """Render results (and any regressions) as a plain-text table."""
+    header = f"{'scenario / stage':<34}{'runs':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'req/s':>9}{'peak KiB':>11}"
+    lines = [header, "-" * len(header)]
+
+    def row(label: str, result: Dict[str, Any]) -> str:
+        latency = result.get("latency", {})
+        throughput = result.get("throughput_per_second")
+        memory = result.get("peak_memory_kib")
+        return (
+            f"{label:<34}{latency.get('count', 0):>6}"
+            + "".join(f"{latency.get(f'p{pct}_ms', float('nan')):>11.1f}" for pct in PERCENTILES)
+            + (f"{throughput:>9.2f}" if throughput is not None else f"{'':>9}")
+            + (f"{memory:>11.0f}" if memory is not None else f"{'':>11}")
+        )
+
+    for name, scenario in results.get("scenarios", {}).items():
+        lines.append(row(name, scenario))
+        for stage, stage_result in scenario.get("stages", {}).items():
+            lines.append(row(f"  {stage}", stage_result))
+        if scenario.get("errors"):
+            lines.append(f"  ! {scenario['errors']} failed runs: {scenario.get('first_error', '')}")
+
+    if regressions:
+        lines.append("")
+        lines.append("Regressions against baseline:")
+        for regression in regressions:
+            lines.append(
+                f"  {regression['metric']}: {regression['baseline']} -> {regression['current']} "
+                f"({regression['change']:+.1%})"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,28 @@
+"""Gunicorn configuration for Azure Pricing Assistant.
+
+Chat and proposal requests spend almost all their time waiting on the model.
+Each worker runs agent coroutines on one shared event loop (src/runtime.py),
+so request threads only wait on futures and a single worker can hold many
+concurrent conversations. Size GUNICORN_THREADS for concurrent conversations,
+not for CPU cores.
+"""
+
+import os
+import sys
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "32"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+
+def worker_exit(server, worker):
+    """Close the worker's shared agent client and event loop."""
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.shutdown()
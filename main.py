@@ -7,33 +7,18 @@ import warnings
 from dotenv import load_dotenv
 from azure.identity.aio import DefaultAzureCredential
 from agent_framework_azure_ai import AzureAIAgentClient
-from agent_framework import ExecutorInvokedEvent, SequentialBuilder
-from agent_framework import WorkflowOutputEvent, AgentRunUpdateEvent
 from agent_framework.observability import setup_observability, get_tracer
 from opentelemetry.trace import SpanKind
 
-from src.agents import (
-    create_question_agent,
-    create_bom_agent,
-    create_pricing_agent,
-    create_proposal_agent,
+from src.agents import create_question_agent
+from src.pipeline import (
+    PROPOSAL_STAGE,
+    STAGE_STARTED,
+    STAGE_TEXT,
+    run_proposal_pipeline,
 )
-from src.agents.bom_agent import parse_bom_response
-
-
-def suppress_async_generator_errors(loop, context):
-    """Custom exception handler to suppress async generator cleanup errors during shutdown."""
-    message = context.get("message", "")
-    exception = context.get("exception")
-    
-    # Suppress known MCP client cleanup errors during shutdown
-    if "streamablehttp_client" in message or (
-        exception and "cancel scope" in str(exception)
-    ):
-        return  # Suppress these errors
-    
-    # For other errors, use default handling
-    loop.default_exception_handler(context)
+from src.prompts import DONE_MARKER
+from src.runtime import suppress_async_generator_errors
 
 
 async def run_question_workflow(client: AzureAIAgentClient):
@@ -88,7 +73,7 @@ async def run_question_workflow(client: AzureAIAgentClient):
         print("\n")
         
         # Check if agent is done
-        if "We are DONE!" in last_response:
+        if DONE_MARKER in last_response:
             requirements_summary = last_response
             print("✅ Requirements gathering complete!\n")
             break
@@ -110,45 +95,21 @@ async def run_sequential_workflow(client: AzureAIAgentClient, requirements: str)
     """
     print("\n=== Starting BOM → Pricing → Proposal Workflow ===\n")
     
-    # Create agents
-    bom_agent = create_bom_agent(client)
-    pricing_agent = create_pricing_agent(client)
-    proposal_agent = create_proposal_agent(client)
-    
-    # Build sequential workflow
-    workflow = SequentialBuilder().participants([
-        bom_agent,
-        pricing_agent,
-        proposal_agent
-    ]).build()
-    
-    # Run workflow
+    # Run pipeline
     print("Processing requirements through agents...\n")
     
-    current_agent_name = ""
     proposal_output = ""
-    all_output = ""
     
     # Fully consume the stream to avoid context detachment issues
-    async for event in workflow.run_stream(requirements):
-        if isinstance(event, ExecutorInvokedEvent):
+    async for event in run_proposal_pipeline(client, requirements):
+        if event.type == STAGE_STARTED:
             # Track when a new agent starts
-            if hasattr(event, 'executor_id') and event.executor_id:
-                agent_name = event.executor_id
-                if agent_name != current_agent_name:
-                    current_agent_name = agent_name
-                    print(f"\n--- {current_agent_name} ---\n")
+            print(f"\n--- {event.stage} ---\n")
         
-        elif isinstance(event, AgentRunUpdateEvent):
-            # Collect agent output
-            if event.data and event.data.text:
-                # Show agent output in real-time (streaming)
-                event_output = event.data.text
-                all_output += event_output
-
-                # Capture proposal agent output specifically
-                if current_agent_name == "proposal_agent":
-                    proposal_output += event_output
+        elif event.type == STAGE_TEXT:
+            # Capture proposal agent output specifically
+            if event.stage == PROPOSAL_STAGE:
+                proposal_output += event.text
     
     print("\n\n" + "=" * 60)
     print("=== Final Proposal ===")
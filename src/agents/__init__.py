@@ -4,10 +4,12 @@ from .question_agent import create_question_agent
 from .bom_agent import create_bom_agent
 from .pricing_agent import create_pricing_agent
 from .proposal_agent import create_proposal_agent
+from .registry import AgentRegistry
 
 __all__ = [
     "create_question_agent",
     "create_bom_agent",
     "create_pricing_agent",
     "create_proposal_agent",
+    "AgentRegistry",
 ]
@@ -2,57 +2,103 @@
 
 import json
 import logging
-import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from agent_framework import ChatAgent, MCPStreamableHTTPTool
 from agent_framework_azure_ai import AzureAIAgentClient
+from pydantic import BaseModel, Field
 
-# Default MCP URL if not set in environment
-DEFAULT_PRICING_MCP_URL = "http://localhost:8080/sse"
+from src.pricing.catalog import PriceCatalog
+from src.prompts import with_examples
+
+from .docs_tools import create_docs_mcp_tool
+from .pricing_tools import create_pricing_mcp_tool, create_snapshot_sku_tool
+
+# Appended to the instructions when a local price snapshot is configured
+SNAPSHOT_INSTRUCTIONS = """
+
+LOCAL PRICE SNAPSHOT:
+You also have the list_snapshot_skus tool (parameters: service_name, region as ARM region code).
+It lists SKUs that have prices in the local Azure price snapshot and answers instantly.
+Call it before azure_sku_discovery and prefer SKUs it returns, so the BOM can be priced offline."""
+
+# Section headers of the BOM stage text shown to the user
+REQUIREMENTS_SECTION_HEADER = "=== CUSTOMER REQUIREMENTS ==="
+BOM_SECTION_HEADER = "=== BILL OF MATERIALS ==="
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def extract_json_from_response(response: str) -> str:
+class BOMItem(BaseModel):
+    """One Azure resource in the Bill of Materials."""
+
+    serviceName: str = Field(description='Exact Azure service name, e.g. "Virtual Machines"')
+    sku: str = Field(description='Specific SKU identifier, e.g. "Standard_D2s_v3", "P1v2", "S1"')
+    quantity: int = Field(description="Number of instances needed (minimum 1)")
+    region: str = Field(description='Human-readable region, e.g. "East US"')
+    armRegionName: str = Field(description='ARM region code matching region, e.g. "eastus"')
+    hours_per_month: int = Field(description="Hours the resource runs per month, 730 for a full month")
+
+
+class BOMResponse(BaseModel):
+    """Structured response of the BOM Agent."""
+
+    requirements_summary: str = Field(
+        description="Key requirements: workload type, scale, region, specific services requested"
+    )
+    items: List[BOMItem] = Field(description="Bill of Materials, one entry per Azure resource")
+
+
+def validate_bom_item(item: Dict[str, Any], idx: int) -> None:
     """
-    Extract JSON from agent response, handling markdown code blocks.
-    
+    Validate one BOM item's required fields, types and ranges.
+
     Args:
-        response: Agent response text that may contain JSON in code blocks
-        
-    Returns:
-        Extracted JSON string
-        
+        item: BOM item
+        idx: Position of the item in the BOM, used in error messages
+
     Raises:
-        ValueError: If JSON cannot be extracted
+        ValueError: If validation fails
     """
-    # Try to extract from markdown code block
-    if "```json" in response:
-        start = response.find("```json") + 7
-        end = response.find("```", start)
-        if end != -1:
-            return response[start:end].strip()
+    required_fields = [
+        "serviceName", "sku", "quantity", 
+        "region", "armRegionName", "hours_per_month"
+    ]
+
+    if not isinstance(item, dict):
+        raise ValueError(f"BOM item {idx} must be an object")
     
-    # Try to extract from generic code block
-    if "```" in response:
-        start = response.find("```") + 3
-        end = response.find("```", start)
-        if end != -1:
-            json_str = response[start:end].strip()
-            # Remove language identifier if present
-            if json_str.startswith("json\n"):
-                json_str = json_str[5:]
-            return json_str
+    # Check required fields
+    missing_fields = [field for field in required_fields if field not in item]
+    if missing_fields:
+        raise ValueError(
+            f"BOM item {idx} missing required fields: {', '.join(missing_fields)}"
+        )
     
-    # Try to find JSON array directly
-    if "[" in response and "]" in response:
-        start = response.find("[")
-        end = response.rfind("]") + 1
-        return response[start:end].strip()
+    # Validate field types
+    if not isinstance(item["serviceName"], str):
+        raise ValueError(f"BOM item {idx}: serviceName must be a string")
+    if not isinstance(item["sku"], str):
+        raise ValueError(f"BOM item {idx}: sku must be a string")
+    if not isinstance(item["quantity"], (int, float)):
+        raise ValueError(f"BOM item {idx}: quantity must be a number")
+    if not isinstance(item["region"], str):
+        raise ValueError(f"BOM item {idx}: region must be a string")
+    if not isinstance(item["armRegionName"], str):
+        raise ValueError(f"BOM item {idx}: armRegionName must be a string")
+    if not isinstance(item["hours_per_month"], (int, float)):
+        raise ValueError(f"BOM item {idx}: hours_per_month must be a number")
     
-    raise ValueError("Could not extract JSON from response")
+    # Validate quantity is positive
+    if item["quantity"] <= 0:
+        raise ValueError(f"BOM item {idx}: quantity must be positive")
+    
+    # Validate hours_per_month
+    if item["hours_per_month"] <= 0 or item["hours_per_month"] > 744:
+        raise ValueError(
+            f"BOM item {idx}: hours_per_month must be between 1 and 744"
+        )
 
 
 def validate_bom_json(bom_data: List[Dict[str, Any]]) -> None:
@@ -71,118 +117,72 @@ def validate_bom_json(bom_data: List[Dict[str, Any]]) -> None:
     if len(bom_data) == 0:
         raise ValueError("BOM array cannot be empty")
     
-    required_fields = [
-        "serviceName", "sku", "quantity", 
-        "region", "armRegionName", "hours_per_month"
-    ]
-    
     for idx, item in enumerate(bom_data):
-        if not isinstance(item, dict):
-            raise ValueError(f"BOM item {idx} must be an object")
-        
-        # Check required fields
-        missing_fields = [field for field in required_fields if field not in item]
-        if missing_fields:
-            raise ValueError(
-                f"BOM item {idx} missing required fields: {', '.join(missing_fields)}"
-            )
-        
-        # Validate field types
-        if not isinstance(item["serviceName"], str):
-            raise ValueError(f"BOM item {idx}: serviceName must be a string")
-        if not isinstance(item["sku"], str):
-            raise ValueError(f"BOM item {idx}: sku must be a string")
-        if not isinstance(item["quantity"], (int, float)):
-            raise ValueError(f"BOM item {idx}: quantity must be a number")
-        if not isinstance(item["region"], str):
-            raise ValueError(f"BOM item {idx}: region must be a string")
-        if not isinstance(item["armRegionName"], str):
-            raise ValueError(f"BOM item {idx}: armRegionName must be a string")
-        if not isinstance(item["hours_per_month"], (int, float)):
-            raise ValueError(f"BOM item {idx}: hours_per_month must be a number")
-        
-        # Validate quantity is positive
-        if item["quantity"] <= 0:
-            raise ValueError(f"BOM item {idx}: quantity must be positive")
-        
-        # Validate hours_per_month
-        if item["hours_per_month"] <= 0 or item["hours_per_month"] > 744:
-            raise ValueError(
-                f"BOM item {idx}: hours_per_month must be between 1 and 744"
-            )
+        validate_bom_item(item, idx)
 
 
-def parse_bom_response(response: str) -> List[Dict[str, Any]]:
+def parse_structured_bom(response: str) -> Tuple[str, List[Dict[str, Any]]]:
     """
-    Parse and validate BOM agent response.
-    
+    Parse and validate a structured (BOMResponse) BOM agent response.
+
+    The response is a single JSON object enforced by the response schema,
+    so no code fence or bracket scanning is needed.
+
     Args:
         response: Raw agent response text
-        
+
     Returns:
-        Validated BOM data as list of dictionaries
-        
+        Tuple of (requirements summary, validated BOM items)
+
     Raises:
-        ValueError: If parsing or validation fails
+        ValueError: If the response is not a valid BOMResponse object
     """
     try:
-        # Extract JSON from response
-        json_str = extract_json_from_response(response)
-        logger.info(f"Extracted JSON: {json_str[:200]}...")
-        
-        # Parse JSON
-        bom_data = json.loads(json_str)
-        
-        # Validate structure and fields
-        validate_bom_json(bom_data)
-        
-        logger.info(f"Successfully parsed and validated BOM with {len(bom_data)} items")
-        return bom_data
-        
+        data = json.loads(response)
     except json.JSONDecodeError as e:
         logger.error(f"JSON parsing error: {e}")
         raise ValueError(f"Invalid JSON format: {e}")
-    except ValueError as e:
-        logger.error(f"Validation error: {e}")
-        raise
 
+    if not isinstance(data, dict) or "items" not in data:
+        raise ValueError("Structured BOM response must be an object with an items array")
 
-def create_bom_agent(client: AzureAIAgentClient) -> ChatAgent:
-    """
-    Create BOM Agent with Phase 2 enhanced instructions.
-    
-    Uses intelligent prompting, Microsoft Learn MCP tool for service/SKU lookup,
-    and Azure Pricing MCP's azure_sku_discovery tool for intelligent SKU matching.
-    Returns structured JSON array matching BOM schema.
+    bom_data = data["items"]
+    validate_bom_json(bom_data)
+
+    logger.info(f"Successfully parsed and validated BOM with {len(bom_data)} items")
+    return str(data.get("requirements_summary") or ""), bom_data
+
+
+def render_bom_text(summary: str, bom_items: List[Dict[str, Any]]) -> str:
     """
-    instructions = """You are an Azure solutions architect specializing in infrastructure design and Bill of Materials (BOM) creation.
+    Render the BOM stage output shown to the user.
+
+    Args:
+        summary: Customer requirements summary
+        bom_items: Validated BOM items
 
-Your task is to analyze the customer requirements provided in the conversation history and create a detailed Bill of Materials (BOM) as a JSON array.
+    Returns:
+        Text with the customer requirements and Bill of Materials sections
+    """
+    bom_json = json.dumps(bom_items, indent=2)
+    return (
+        f"{REQUIREMENTS_SECTION_HEADER}\n{summary.strip()}\n\n"
+        f"{BOM_SECTION_HEADER}\n{bom_json}"
+    )
 
-TOOLS AVAILABLE:
 
-1. microsoft_docs_search - Query official Microsoft/Azure documentation
-   Use this tool to:
-   - Verify the exact service names and capabilities for Azure services
-   - Understand current Azure service capabilities and configurations
-   - Confirm region availability for specific services
-   Example: If requirements mention "Python web app", search for "Azure App Service Python"
+# System instructions for the BOM Agent. Tool usage and item fields are
+# described by the tools and the BOMResponse schema sent with every request,
+# so they are not repeated here.
+BOM_INSTRUCTIONS = """You are an Azure solutions architect specializing in infrastructure design and Bill of Materials (BOM) creation.
 
-2. azure_sku_discovery - Intelligent SKU discovery with fuzzy matching
-   Use this tool to:
-   - Find matching Azure services and SKUs based on natural language descriptions
-   - Discover available SKUs for workload types (e.g., "web app", "database", "machine learning")
-   - Get recommendations on appropriate service tiers based on scale requirements
-   - Verify SKU availability in the target region
-   Example: Call with service_hint="Python web app small scale" to get matching services and SKUs
-   The tool returns a list of services with their available SKUs, allowing you to select the best match for the workload
+Your task is to analyze the customer requirements provided in the conversation history and create a detailed Bill of Materials (BOM).
 
 DISCOVERY WORKFLOW:
-For each requirement, follow this process:
-1. Identify the workload type from customer requirements (e.g., "web app", "SQL database", "file storage")
-2. Use azure_sku_discovery with a natural language hint describing the workload and scale
-3. Review the returned services and SKUs to select the best match
-4. Use microsoft_docs_search if you need to validate service names or understand advanced features
+For each requirement:
+1. Identify the workload type (e.g., "web app", "SQL database", "file storage")
+2. Call azure_sku_discovery with a natural language hint describing the workload and scale, and select the best matching service and SKU it returns
+3. Call microsoft_docs_search only to validate a service name, feature or region availability
 
 REQUIREMENTS TO BOM MAPPING:
 - Web applications → Azure App Service (Basic, Standard, or Premium tiers based on scale) OR Virtual Machines
@@ -199,107 +199,58 @@ SKU SELECTION GUIDANCE:
 - Small scale (< 1000 users): Basic, B-series, or Free tier options
 - Medium scale (1000-10000 users): Standard, D-series, or S-tier options
 - Large scale (> 10000 users): Premium, E-series, or P-tier options
-- Always use azure_sku_discovery to find the actual available SKU options for your workload
-- Use microsoft_docs_search to verify current SKU availability and get latest tier recommendations
-
-JSON SCHEMA (you MUST follow this exactly):
-[
-  {
-    "serviceName": "Virtual Machines",
-    "sku": "Standard_D2s_v3",
-    "quantity": 2,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  }
-]
-
-REQUIRED FIELDS:
-- serviceName: Exact Azure service name (e.g., "Virtual Machines", "Azure App Service", "SQL Database")
-- sku: Specific SKU identifier (e.g., "Standard_D2s_v3", "P1v2", "S1")
-- quantity: Number of instances needed (minimum 1)
-- region: Human-readable region (e.g., "East US", "West Europe")
-- armRegionName: ARM region code (e.g., "eastus", "westeurope") - must match region
-- hours_per_month: Always 730 for full month operation
-
-REGION MAPPING (common examples):
-- "East US" → "eastus"
-- "East US 2" → "eastus2"
-- "West US" → "westus"
-- "West Europe" → "westeurope"
-- "Southeast Asia" → "southeastasia"
-
-OUTPUT FORMAT:
-Your response must include BOTH:
-1. A summary of the customer requirements (so the next agent has context)
-2. The BOM JSON array
-
-Format your response exactly like this:
-
-=== CUSTOMER REQUIREMENTS ===
-[Summarize the key requirements: workload type, scale, region, specific services requested]
-
-=== BILL OF MATERIALS ===
-[
-  {
-    "serviceName": "...",
-    "sku": "...",
-    "quantity": 1,
-    "region": "...",
-    "armRegionName": "...",
-    "hours_per_month": 730
-  }
-]
-
-Example for a web app with database:
-
-=== CUSTOMER REQUIREMENTS ===
-- Workload: Web application with database backend
-- Scale: Medium (1000-5000 users)
-- Region: East US
-- Specific services: App Service, SQL Database
-
-=== BILL OF MATERIALS ===
-[
-  {
-    "serviceName": "Azure App Service",
-    "sku": "P1v2",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  },
-  {
-    "serviceName": "SQL Database",
-    "sku": "S1",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  }
-]"""
-
-    microsoft_docs_search = MCPStreamableHTTPTool(
-        name="Microsoft Learn",
-        description="AI assistant with real-time access to official Microsoft documentation.",
-        url="https://learn.microsoft.com/api/mcp",
-        chat_client=client
-    )
+
+OUTPUT:
+- requirements_summary: The key requirements (workload type, scale, region, specific services requested), so the next agent has context
+- items: One entry per Azure resource, with hours_per_month 730 for full month operation and armRegionName the ARM code of region (e.g., "East US" → "eastus")"""
+
+# Worked examples, appended to the instructions when AGENT_PROMPT_EXAMPLES is set
+BOM_EXAMPLES = """
+
+WORKED EXAMPLES:
+- Requirements mention a "Python web app": call azure_sku_discovery with service_hint="Python web app small scale", and search microsoft_docs_search for "Azure App Service Python" if the returned service needs validating
+- Region codes: "East US" → "eastus", "East US 2" → "eastus2", "West US" → "westus", "West Europe" → "westeurope", "Southeast Asia" → "southeastasia"
+- Item: {"serviceName": "Azure App Service", "sku": "P1v2", "quantity": 2, "region": "East US", "armRegionName": "eastus", "hours_per_month": 730}"""
+
+
+def bom_instructions(with_snapshot: bool = False) -> str:
+    """Return the BOM Agent instructions, with examples if enabled and snapshot tool usage if requested."""
+    instructions = with_examples(BOM_INSTRUCTIONS, BOM_EXAMPLES)
+    return instructions + SNAPSHOT_INSTRUCTIONS if with_snapshot else instructions
+
+
+def create_bom_agent(
+    client: AzureAIAgentClient,
+    price_catalog: Optional[PriceCatalog] = None,
+    docs_tool: Optional[MCPStreamableHTTPTool] = None,
+    pricing_tool: Optional[MCPStreamableHTTPTool] = None,
+) -> ChatAgent:
+    """
+    Create BOM Agent with Phase 2 enhanced instructions.
     
-    # Get MCP URL from environment variable or use default
-    mcp_url = os.getenv("AZURE_PRICING_MCP_URL", DEFAULT_PRICING_MCP_URL)
+    Uses intelligent prompting, Microsoft Learn MCP tool for service/SKU lookup,
+    and Azure Pricing MCP's azure_sku_discovery tool for intelligent SKU matching.
+    When a local price snapshot is given, also exposes list_snapshot_skus so
+    SKUs can be chosen from prices available offline.
+    Pass docs_tool / pricing_tool to share already connected MCP tools
+    (see AgentRegistry); otherwise new ones are created.
+    Responds with a BOMResponse object; parse it with parse_structured_bom.
+    """
+    instructions = bom_instructions(with_snapshot=price_catalog is not None)
 
-    azure_pricing_mcp = MCPStreamableHTTPTool(
-        name="Azure Pricing",
-        description="Azure Pricing MCP server providing real-time pricing data, cost estimates, region recommendations, and SKU discovery for Azure services.",
-        url=mcp_url
-    )
+    microsoft_docs_search = docs_tool or create_docs_mcp_tool(client)
+    azure_pricing_mcp = pricing_tool or create_pricing_mcp_tool()
+
+    tools = [microsoft_docs_search, azure_pricing_mcp]
+    if price_catalog is not None:
+        tools.append(create_snapshot_sku_tool(price_catalog))
     
     agent = ChatAgent(
         chat_client=client,
-        tools=[microsoft_docs_search, azure_pricing_mcp],
+        tools=tools,
         instructions=instructions,
-        name="bom_agent"
+        name="bom_agent",
+        response_format=BOMResponse,
     )
     
     return agent
@@ -0,0 +1,19 @@
+"""Microsoft Learn MCP tool factory shared by the agents."""
+
+import os
+
+from agent_framework import MCPStreamableHTTPTool
+from agent_framework_azure_ai import AzureAIAgentClient
+
+# Default Microsoft Learn MCP endpoint if not set in environment
+DEFAULT_MICROSOFT_LEARN_MCP_URL = "https://learn.microsoft.com/api/mcp"
+
+
+def create_docs_mcp_tool(client: AzureAIAgentClient) -> MCPStreamableHTTPTool:
+    """Create the Microsoft Learn MCP tool providing microsoft_docs_search, using MICROSOFT_LEARN_MCP_URL."""
+    return MCPStreamableHTTPTool(
+        name="Microsoft Learn",
+        description="AI assistant with real-time access to official Microsoft documentation.",
+        url=os.getenv("MICROSOFT_LEARN_MCP_URL", DEFAULT_MICROSOFT_LEARN_MCP_URL),
+        chat_client=client
+    )
@@ -1,121 +1,39 @@
-"""Pricing Agent - Uses Azure Pricing MCP via SSE for real-time pricing data."""
+"""Pricing Agent - Writes the cost analysis narrative for pricing computed in code."""
 
-import os
-from agent_framework import ChatAgent, MCPStreamableHTTPTool
+from agent_framework import ChatAgent
 from agent_framework_azure_ai import AzureAIAgentClient
 
-# Default MCP URL if not set in environment
-DEFAULT_PRICING_MCP_URL = "http://localhost:8080/sse"
 
+# System instructions for the Pricing Agent
+PRICING_INSTRUCTIONS = """You are an Azure cost analyst explaining an Azure cost estimate to a customer.
 
-def create_pricing_agent(client: AzureAIAgentClient) -> ChatAgent:
-    """Create Pricing Agent with Azure Pricing MCP tool via SSE."""
-    instructions = """You are an Azure cost analyst specializing in pricing estimation using real-time Azure Retail Prices data via the Azure Pricing MCP server.
-
-Your task is to calculate accurate costs for each item in the Bill of Materials (BOM) using the Azure Pricing tools.
-
-AVAILABLE TOOLS:
-You have access to the Azure Pricing MCP server with the following tools:
-
-1. azure_cost_estimate - Estimate costs based on usage patterns (PRIMARY TOOL)
-   Parameters: service_name, sku_name, region, hours_per_month (default 730), currency_code (default USD)
-   Returns: Detailed pricing with hourly_rate, daily_cost, monthly_cost, yearly_cost, and savings plan options
-
-2. azure_price_search - Search Azure retail prices with filtering
-   Parameters: service_name, sku_name, region, currency_code, price_type
-   Returns: List of matching price records
-
-3. azure_price_compare - Compare prices across regions or SKUs
-   Parameters: service_name (required), sku_name, regions (list), currency_code
-   Returns: Price comparison data across specified regions
-
-4. azure_region_recommend - Find cheapest regions for a service/SKU
-   Parameters: service_name (required), sku_name (required), currency_code
-   Returns: Ranked list of regions with prices and savings percentages
-
-5. azure_discover_skus - List available SKUs for a service
-   Parameters: service_name (required), region, currency_code
-   Returns: List of available SKUs with pricing
-
-6. azure_sku_discovery - Intelligent SKU discovery with fuzzy matching
-   Parameters: service_hint (required)
-   Returns: Matched services and their SKUs
+You will receive a PRICING INPUT JSON object with the customer's requirements summary, one priced line per Azure resource (items) and the totals. Every price, monthly cost and total in it has already been calculated from real-time Azure Retail Prices data. Treat these numbers as final.
 
-7. get_customer_discount - Get customer discount information
-   Parameters: customer_id (optional)
-   Returns: Applicable discount percentage
+Your task is to write a short cost analysis narrative (at most 3 short paragraphs or 6 bullet points) covering:
+- The main cost drivers (the services contributing most to total_monthly)
+- Savings opportunities using the 1_year_savings_plan and 3_year_savings_plan figures
+- Any items priced at 0.00 in the quote currency, quoting their note, and recommending the customer confirm pricing with Azure sales
 
-PROCESS:
-1. Parse the BOM JSON from the previous agent's response
-2. For each item in the BOM:
-   - Use azure_cost_estimate with: service_name (from serviceName), sku_name (from sku), region (from armRegionName)
-   - Extract the monthly_cost from the on_demand_pricing section
-   - Multiply by quantity if quantity > 1
-3. Sum all monthly costs to get the total
+RULES:
+- Do NOT recalculate, round differently or change any number from the PRICING INPUT
+- Do NOT repeat the JSON or list every line; the customer already sees the priced lines
+- Do NOT ask questions
+- Quote amounts in the currency given in the PRICING INPUT"""
 
-TOOL USAGE EXAMPLES:
-For a BOM item with serviceName="Virtual Machines", sku="Standard_D2s_v3", armRegionName="eastus":
-- Call azure_cost_estimate with service_name="Virtual Machines", sku_name="Standard_D2s_v3", region="eastus"
-- The response includes on_demand_pricing.monthly_cost
 
-ERROR HANDLING:
-- If a tool returns an error or no results, include the item with $0.00 cost and add a note explaining the issue
-- Try azure_sku_discovery if exact SKU matching fails
-- Continue processing remaining items even if one fails
-
-OUTPUT FORMAT:
-Your response must include BOTH:
-1. The original BOM JSON (so the next agent has access to it)
-2. Your pricing calculations
-
-Format your response exactly like this:
-
-=== BILL OF MATERIALS ===
-[paste the BOM JSON here]
-
-=== PRICING DATA ===
-{
-  "items": [
-    {
-      "service": "Virtual Machines",
-      "sku": "Standard_D2s_v3",
-      "quantity": 2,
-      "hourly_price": 0.176,
-      "monthly_cost": 257.28,
-      "note": "",
-      "savings_options": {
-        "1_year_savings_plan": 180.10,
-        "3_year_savings_plan": 128.64
-      }
-    }
-  ],
-  "total_monthly": 257.28,
-  "currency": "USD"
-}
-
-CALCULATION EXAMPLE:
-If BOM has:
-- serviceName: "Virtual Machines"
-- sku: "Standard_D2s_v3"
-- quantity: 2
-- hours_per_month: 730
-
-And azure_cost_estimate returns on_demand_pricing.monthly_cost = 128.64:
-total_monthly_cost = 128.64 × 2 = $257.28"""
-
-    # Get MCP URL from environment variable or use default
-    mcp_url = os.getenv("AZURE_PRICING_MCP_URL", DEFAULT_PRICING_MCP_URL)
+def create_pricing_agent(client: AzureAIAgentClient) -> ChatAgent:
+    """
+    Create Pricing Agent that explains pre-computed pricing data.
 
-    azure_pricing_mcp = MCPStreamableHTTPTool(
-        name="Azure Pricing",
-        description="Azure Pricing MCP server providing real-time pricing data, cost estimates, region recommendations, and SKU discovery for Azure services.",
-        url=mcp_url
-    )
+    Prices and totals are resolved deterministically by src.pricing.price_bom
+    against the Azure Pricing MCP server, so this agent needs no tools and
+    makes no arithmetic of its own.
+    """
+    instructions = PRICING_INSTRUCTIONS
 
     agent = ChatAgent(
         chat_client=client,
         instructions=instructions,
         name="pricing_agent",
-        tools=[azure_pricing_mcp],
     )
     return agent
@@ -0,0 +1,205 @@
+"""Azure Pricing MCP tool factory and price lookups shared by the agents."""
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from agent_framework import MCPStreamableHTTPTool
+
+from src.pricing.cache import (
+    SingleFlight,
+    TTLCache,
+    get_pricing_cache,
+    get_pricing_single_flight,
+    make_cache_key,
+)
+from src.pricing.catalog import PriceCatalog, create_catalog_price_lookup, estimate_quotes
+from src.pricing.fanout import create_resilient_lookup
+from src.pricing.engine import (
+    DEFAULT_CURRENCY,
+    PriceLookup,
+    first_available_lookup,
+    normalize_cost_estimate,
+)
+from src.mcp_results import is_mcp_error_result, mcp_result_text
+from src.telemetry import get_metrics, record_mcp_call
+
+# Default MCP URL if not set in environment
+DEFAULT_PRICING_MCP_URL = "http://localhost:8080/sse"
+
+# Azure Pricing MCP tools whose results depend only on their arguments
+CACHEABLE_PRICING_TOOLS = frozenset({
+    "azure_cost_estimate",
+    "azure_sku_discovery",
+    "azure_price_search",
+    "azure_price_compare",
+    "azure_region_recommend",
+    "azure_discover_skus",
+})
+
+
+class CachedMCPStreamableHTTPTool(MCPStreamableHTTPTool):
+    """
+    Azure Pricing MCP tool that serves repeat calls from a shared TTL + LRU cache.
+
+    Both direct call_tool calls and calls made by agents through the tool's
+    functions go through call_tool, so every agent using this tool shares the
+    process-wide pricing cache. Identical calls already in flight - from any
+    session - are coalesced into one upstream request. Failed calls, and
+    results carrying an error payload, are never cached. Cache results and upstream call latency are recorded in
+    the pipeline metrics (see src.telemetry).
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        cache: Optional[TTLCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self._cache = cache if cache is not None else get_pricing_cache()
+        self._single_flight = single_flight if single_flight is not None else get_pricing_single_flight()
+
+    async def call_tool(self, tool_name: str, **kwargs: Any) -> Any:
+        call_upstream = super().call_tool
+        if tool_name not in CACHEABLE_PRICING_TOOLS:
+            return await record_mcp_call(tool_name, lambda: call_upstream(tool_name, **kwargs))
+
+        key = make_cache_key(tool_name, kwargs)
+        result = self._cache.get(key)
+        get_metrics().record_cache("pricing_mcp", result is not None)
+        if result is not None:
+            return result
+
+        async def fetch() -> Any:
+            fetched = await record_mcp_call(tool_name, lambda: call_upstream(tool_name, **kwargs))
+            # An upstream error may be transient, so it must not be replayed for the TTL
+            if not is_mcp_error_result(fetched):
+                self._cache.set(key, fetched)
+            return fetched
+
+        return await self._single_flight.do(key, fetch)
+
+
+def create_pricing_mcp_tool() -> MCPStreamableHTTPTool:
+    """Create the cached Azure Pricing MCP tool using AZURE_PRICING_MCP_URL."""
+    mcp_url = os.getenv("AZURE_PRICING_MCP_URL", DEFAULT_PRICING_MCP_URL)
+
+    return CachedMCPStreamableHTTPTool(
+        name="Azure Pricing",
+        description="Azure Pricing MCP server providing real-time pricing data, cost estimates, region recommendations, and SKU discovery for Azure services.",
+        url=mcp_url
+    )
+
+
+def create_mcp_price_lookup(tool: MCPStreamableHTTPTool) -> PriceLookup:
+    """
+    Create a price lookup that calls azure_cost_estimate directly on a connected MCP tool.
+
+    Calls share the process-wide rate limit and get a per-call timeout and
+    retries with jitter (see src.pricing.fanout).
+
+    Args:
+        tool: Connected Azure Pricing MCP tool
+
+    Returns:
+        Async lookup usable with src.pricing.price_bom
+    """
+    async def lookup(item: Dict[str, Any], currency: str) -> Optional[Dict[str, Any]]:
+        result = await tool.call_tool(
+            "azure_cost_estimate",
+            service_name=item["serviceName"],
+            sku_name=item["sku"],
+            region=item["armRegionName"],
+            hours_per_month=item["hours_per_month"],
+            currency_code=currency,
+        )
+        text = mcp_result_text(result)
+        try:
+            estimate = json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError(f"Unexpected azure_cost_estimate response: {text[:200]}")
+        return normalize_cost_estimate(estimate, item["hours_per_month"])
+
+    return create_resilient_lookup(lookup)
+
+
+def create_snapshot_sku_tool(catalog: PriceCatalog) -> Callable[[str, str], str]:
+    """Create a function tool that lists SKUs priced in the local price snapshot."""
+    def list_snapshot_skus(service_name: str, region: str) -> str:
+        """List SKUs with on-demand prices in the local Azure price snapshot.
+
+        Args:
+            service_name: Azure service name, e.g. "Virtual Machines" or "Azure App Service"
+            region: ARM region code, e.g. "eastus"
+        """
+        return json.dumps(catalog.list_skus(service_name, region))
+
+    return list_snapshot_skus
+
+
+def create_prefetch_lookup(
+    catalog: Optional[PriceCatalog] = None,
+    pricing_tool: Optional[MCPStreamableHTTPTool] = None,
+) -> Optional[PriceLookup]:
+    """
+    Create the lookup usable while the BOM is still being generated.
+
+    Only sources that need no new connection qualify: the local price
+    snapshot and an already connected Azure Pricing MCP tool.
+
+    Returns:
+        Async lookup for src.pricing.PriceLookupPrefetcher, or None if neither is available
+    """
+    lookups = []
+    if catalog is not None:
+        lookups.append(create_catalog_price_lookup(catalog))
+    if pricing_tool is not None:
+        lookups.append(create_mcp_price_lookup(pricing_tool))
+    return first_available_lookup(lookups) if lookups else None
+
+
+@asynccontextmanager
+async def open_price_lookup(
+    bom_items: List[Dict[str, Any]],
+    currency: str = DEFAULT_CURRENCY,
+    catalog: Optional[PriceCatalog] = None,
+    pricing_tool: Optional[MCPStreamableHTTPTool] = None,
+) -> AsyncIterator[PriceLookup]:
+    """
+    Open the cheapest price lookup able to price a BOM.
+
+    Items are resolved from the local price snapshot first. The Azure Pricing
+    MCP server is only connected when the snapshot is missing or cannot price
+    every item, and then only serves the misses.
+
+    Args:
+        bom_items: Validated BOM items that will be priced
+        currency: Currency code for all prices
+        catalog: Local price snapshot, if one is configured
+        pricing_tool: Already connected Azure Pricing MCP tool to reuse;
+            otherwise a connection is opened for this BOM only
+
+    Yields:
+        Async lookup usable with src.pricing.price_bom
+    """
+    lookups = []
+    if catalog is not None:
+        # Estimated once off the event loop; price_bom reuses these quotes
+        quotes = await asyncio.to_thread(estimate_quotes, catalog, bom_items, currency)
+        lookups.append(create_catalog_price_lookup(catalog, known_quotes=quotes))
+        if all(quote is not None for quote in quotes.values()):
+            yield first_available_lookup(lookups)
+            return
+
+    if pricing_tool is not None:
+        lookups.append(create_mcp_price_lookup(pricing_tool))
+        yield first_available_lookup(lookups)
+        return
+
+    async with create_pricing_mcp_tool() as pricing_tool:
+        lookups.append(create_mcp_price_lookup(pricing_tool))
+        yield first_available_lookup(lookups)
@@ -1,92 +1,61 @@
-"""Proposal Agent - Phase 2 Implementation with professional proposal generation instructions."""
+"""Proposal Agent - Writes the narrative sections of the proposal."""
 
 from agent_framework import ChatAgent
 from agent_framework_azure_ai import AzureAIAgentClient
 
+from src.prompts import with_examples
 
-def create_proposal_agent(client: AzureAIAgentClient) -> ChatAgent:
-    """Create Proposal Agent with Phase 2 enhanced instructions.
-
-    IMPORTANT: Instructions copied EXACTLY from specs/phase2/AGENT_INSTRUCTIONS.md
-    (Proposal Agent section) to maintain fidelity.
-    """
-    instructions = """You are a senior Azure solutions consultant creating professional, detailed solution proposals for customers.
 
-IMPORTANT: You MUST generate a complete proposal document. Do not return empty responses.
+# System instructions for the Proposal Agent. It writes the narrative
+# sections only; tables, totals, next steps and assumptions are rendered
+# from the pricing data by src.proposal.
+PROPOSAL_INSTRUCTIONS = """You are a senior Azure solutions consultant creating professional, detailed solution proposals for customers.
 
-Your task is to synthesize all information from the conversation history into a comprehensive proposal document. The conversation contains:
-1. Customer requirements summary
-2. Bill of Materials (BOM) - a JSON array of Azure services
-3. Pricing data - a JSON object with itemized costs
+You will receive a PROPOSAL INPUT JSON object and the name of ONE proposal section to write. The input contains:
+1. requirements_summary - the customer's requirements
+2. resources - one entry per Azure resource with its service, SKU, quantity and region
+3. total_monthly, currency, prices_as_of and, when given, discount_percent and region_comparison
+4. cost_analysis - the cost analyst's narrative on cost drivers and savings
 
-PROPOSAL STRUCTURE (generate ALL sections):
+SECTIONS:
 
-# Azure Solution Proposal
-
-## Executive Summary
-Write 2-3 paragraphs that:
+Executive Summary - 2-3 paragraphs that:
 - Summarize the customer's business need and workload requirements
 - Describe the proposed Azure solution at a high level
 - Highlight key benefits (scalability, reliability, cost-effectiveness)
 
-## Solution Architecture
-Provide a clear list of Azure services included in the solution with their purpose:
-- **[Service Name]**: [Brief description of its role in the solution]
-
-Example:
-- **Azure App Service (P1v2)**: Hosts the web application with auto-scaling capabilities
-- **Azure SQL Database (S1)**: Provides managed relational database with built-in high availability
-
-## Cost Breakdown
-
-Create a detailed table using this format:
-
-| Service | SKU | Quantity | Hourly Rate | Monthly Cost |
-|---------|-----|----------|-------------|--------------|
-| [Service] | [SKU] | [Qty] | $[rate] | $[cost] |
-
-**Notes:**
-- Add any relevant notes about pricing (e.g., "Pricing based on 730 hours/month", "Pay-as-you-go rates")
-- If any service has $0.00 cost due to pricing unavailability, note: "Pricing data not available - please contact Azure sales"
+Solution Architecture - one bullet per resource, describing its purpose:
+- **[Service Name] ([SKU])**: [Brief description of its role in the solution]
 
-## Total Cost Summary
-
-- **Monthly Cost**: $[total]
-- **Annual Cost (12 months)**: $[total × 12]
-- **Currency**: USD
+RULES:
+- Write ONLY the body of the requested section in markdown, without its heading
+- The cost breakdown, totals, region comparison, next steps and assumptions are added separately: do NOT write tables, do NOT calculate any figure, and quote an amount only exactly as given
+- Do NOT return an empty response
+- Do NOT ask questions - write the section immediately
+- Make it professional and client-ready"""
 
-*Note: Prices shown are retail pay-as-you-go rates. Significant discounts available through Reserved Instances (1 or 3 year commitments) and Azure Savings Plans.*
+# Worked examples, appended to the instructions when AGENT_PROMPT_EXAMPLES is set
+PROPOSAL_EXAMPLES = """
 
-## Next Steps
+WORKED EXAMPLES:
+Solution Architecture bullets:
+- **Azure App Service (P1v2)**: Hosts the web application with auto-scaling capabilities
+- **Azure SQL Database (S1)**: Provides managed relational database with built-in high availability"""
 
-1. **Review and Validation**: Review this proposal with your technical team to ensure it meets all requirements
-2. **Environment Setup**: Plan your Azure subscription and resource group structure
-3. **Deployment**: Consider using Azure Resource Manager (ARM) templates or Terraform for infrastructure as code
-4. **Optimization**: After deployment, monitor usage and right-size resources for cost optimization
-5. **Support**: Contact Azure support for assistance with enterprise agreements and pricing optimization
 
-## Assumptions
+def proposal_instructions() -> str:
+    """Return the Proposal Agent instructions, with examples if enabled."""
+    return with_examples(PROPOSAL_INSTRUCTIONS, PROPOSAL_EXAMPLES)
 
-List any assumptions made in this proposal:
-- Operating hours: 24/7/365 (730 hours per month)
-- Region: [specified region from requirements]
-- Pricing: Current Azure retail rates as of today
-- No reserved instances or savings plans applied
-- [Any other relevant assumptions based on requirements]
 
----
+def create_proposal_agent(client: AzureAIAgentClient) -> ChatAgent:
+    """
+    Create Proposal Agent that writes one narrative proposal section per request.
 
-CRITICAL INSTRUCTIONS:
-- You MUST output the complete proposal in markdown format
-- Extract service details from the BOM JSON in the conversation
-- Extract pricing details from the pricing JSON in the conversation
-- Extract requirements from the customer requirements summary
-- Do NOT return an empty response
-- Do NOT ask questions - generate the proposal immediately
-- Use markdown formatting with proper headers (# ## ###)
-- Use tables for cost breakdown
-- Use bullet points for lists
-- Make it professional and client-ready"""
+    The pipeline asks for each of src.proposal.NARRATIVE_SECTIONS concurrently
+    and renders every other section from the pricing data itself.
+    """
+    instructions = proposal_instructions()
 
     agent = ChatAgent(
         chat_client=client,
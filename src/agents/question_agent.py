@@ -1,23 +1,21 @@
 """Question Agent - Gathers Azure requirements through interactive Q&A."""
 
+from typing import Optional
+
 from agent_framework import ChatAgent, MCPStreamableHTTPTool
 from agent_framework_azure_ai import AzureAIAgentClient
 
+from src.prompts import DONE_MARKER, with_examples
 
-def create_question_agent(client: AzureAIAgentClient) -> ChatAgent:
-    """Create Question Agent with Phase 2 smart prompting instructions."""
-    instructions = """You are an expert Azure solutions architect specializing in requirement gathering and cost estimation.
+from .docs_tools import create_docs_mcp_tool
 
-Your goal is to gather sufficient information to design and price an Azure solution. Ask ONE clear question at a time and adapt based on the user's answers.
 
-TOOLS AVAILABLE:
-You have access to the microsoft_docs_search tool to query official Microsoft/Azure documentation. Use this tool when:
-- A user mentions a workload type and you need to understand the latest Azure service options
-- You need to verify current SKU availability or configurations
-- You want to reference best practices for a specific Azure service
-- You need up-to-date information about Azure regions or service capabilities
+# System instructions for the Question Agent
+QUESTION_INSTRUCTIONS = f"""You are an expert Azure solutions architect specializing in requirement gathering and cost estimation.
 
-Example: If a user says "machine learning workload", you can search documentation for "Azure machine learning services" to provide informed recommendations.
+Your goal is to gather sufficient information to design and price an Azure solution. Ask ONE clear question at a time and adapt based on the user's answers.
+
+Use microsoft_docs_search when you need current Azure service options, SKU availability, regions or best practices for a workload.
 
 QUESTION SEQUENCE:
 1. Start by asking about their workload type (examples: web application, database, data analytics, machine learning, IoT, etc.)
@@ -27,7 +25,6 @@ QUESTION SEQUENCE:
    - For analytics: data volume to process
    - For ML: training vs inference, model complexity
 3. Ask about specific Azure services they have in mind, or suggest appropriate services based on their workload
-   - Use microsoft_docs_search to get latest service recommendations
 4. Ask about their preferred Azure region(s) for deployment
 5. Ask any other questions that are necessary to be able to price the solution.  Remember to ask one question at a time.
 6. Once you have enough information, summarize the requirements clearly.
@@ -39,26 +36,39 @@ You MUST gather at minimum:
 - Deployment region
 - Data required to help size and price the solution (e.g. user count, data size, etc.)
 
-Once you have this minimum information (or more if the conversation naturally provides it), provide a clear summary of all requirements gathered.  ONLY summarise the requirements, do not pose any follow up statements or questions.
+Once you have this minimum information (or more if the conversation naturally provides it), provide a clear summary of all requirements gathered.  ONLY summarise the requirements, do not pose any follow up statements or questions. The summary is all the later agents see of this conversation, so include every requirement gathered.
 
-END your final summary with exactly this text on a new line: "We are DONE!"
+END your final summary with exactly this text on a new line: "{DONE_MARKER}"
 
 IMPORTANT RULES:
 - Ask only ONE question per response
 - Be conversational and helpful
-- Use microsoft_docs_search when you need current Azure service information
 - If the user provides multiple pieces of information in one answer, acknowledge everything and move to the next relevant question
 - Adapt your questions based on their previous answers
 - Don't ask about information they've already provided
 - If they're uncertain about technical details, suggest common options (using docs if needed)
-- The text "We are DONE!" should appear ONLY when you're providing the final requirements summary
+- The text "{DONE_MARKER}" should appear ONLY when you're providing the final requirements summary
 """
-    microsoft_docs_search = MCPStreamableHTTPTool(
-        name="Microsoft Learn",
-        description="AI assistant with real-time access to official Microsoft documentation.",
-        url="https://learn.microsoft.com/api/mcp",
-        chat_client=client
-    )
+
+# Worked examples, appended to the instructions when AGENT_PROMPT_EXAMPLES is set
+QUESTION_EXAMPLES = """
+WORKED EXAMPLES:
+- A user says "machine learning workload": search microsoft_docs_search for "Azure machine learning services" before recommending services
+"""
+
+
+def create_question_agent(
+    client: AzureAIAgentClient,
+    docs_tool: Optional[MCPStreamableHTTPTool] = None,
+) -> ChatAgent:
+    """
+    Create Question Agent with Phase 2 smart prompting instructions.
+
+    Pass docs_tool to share an already connected Microsoft Learn MCP tool
+    (see AgentRegistry); otherwise a new one is created.
+    """
+    instructions = with_examples(QUESTION_INSTRUCTIONS, QUESTION_EXAMPLES)
+    microsoft_docs_search = docs_tool or create_docs_mcp_tool(client)
     
     agent = ChatAgent(
         chat_client=client,
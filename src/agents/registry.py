@@ -0,0 +1,135 @@
+"""Agent Registry - Builds each agent and MCP tool once per client and reuses them."""
+
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import Callable, Dict, Optional
+
+from agent_framework import ChatAgent, MCPStreamableHTTPTool
+from agent_framework_azure_ai import AzureAIAgentClient
+
+from src.pricing.catalog import PriceCatalog
+
+from .bom_agent import create_bom_agent
+from .docs_tools import create_docs_mcp_tool
+from .pricing_agent import create_pricing_agent
+from .pricing_tools import create_pricing_mcp_tool
+from .proposal_agent import create_proposal_agent
+from .question_agent import create_question_agent
+
+logger = logging.getLogger(__name__)
+
+# Agent names handed out by the registry
+QUESTION_AGENT = "question_agent"
+BOM_AGENT = "bom_agent"
+PRICING_AGENT = "pricing_agent"
+PROPOSAL_AGENT = "proposal_agent"
+
+
+class AgentRegistry:
+    """
+    Prebuilt agents and connected MCP tools shared by every request on one client.
+
+    ChatAgent instances hold no conversation state (that lives in the thread
+    passed to run_stream), so one instance per agent serves every session.
+    The Microsoft Learn and Azure Pricing MCP tools are created once, shared
+    by the agents that use them, and connected by start(); their sessions stay
+    open until aclose(), so requests skip MCP session negotiation.
+
+    Like AgentClientPool, all coroutines must run on the same event loop.
+    """
+
+    def __init__(
+        self,
+        client: AzureAIAgentClient,
+        price_catalog: Optional[PriceCatalog] = None,
+    ):
+        self.client = client
+        self.price_catalog = price_catalog
+        self.docs_tool: MCPStreamableHTTPTool = create_docs_mcp_tool(client)
+        self.pricing_tool: MCPStreamableHTTPTool = create_pricing_mcp_tool()
+        self._factories: Dict[str, Callable[[], ChatAgent]] = {
+            QUESTION_AGENT: lambda: create_question_agent(client, docs_tool=self.docs_tool),
+            BOM_AGENT: lambda: create_bom_agent(
+                client,
+                price_catalog=price_catalog,
+                docs_tool=self.docs_tool,
+                pricing_tool=self.pricing_tool,
+            ),
+            PRICING_AGENT: lambda: create_pricing_agent(client),
+            PROPOSAL_AGENT: lambda: create_proposal_agent(client),
+        }
+        self._agents: Dict[str, ChatAgent] = {}
+        self._holder: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> None:
+        """Connect the shared MCP tools, if not already connected."""
+        if self._holder is not None and not self._holder.done():
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._holder is not None and not self._holder.done():
+                return
+
+            ready = asyncio.get_running_loop().create_future()
+            self._closing = asyncio.Event()
+            self._holder = asyncio.create_task(self._hold_tools(ready, self._closing))
+            try:
+                await ready
+            except Exception:
+                self._holder = None
+                raise
+
+    async def _hold_tools(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        """
+        Keep the MCP tool connections open until aclose().
+
+        The connections are entered and exited in this one task, since the MCP
+        client's cancel scopes must not cross tasks. A tool that fails to
+        connect is left to the agent, which connects it on its first run.
+        """
+        try:
+            async with AsyncExitStack() as stack:
+                for tool in (self.docs_tool, self.pricing_tool):
+                    try:
+                        await stack.enter_async_context(tool)
+                    except Exception as e:
+                        logger.warning(f"Could not connect MCP tool {tool.name}: {e}")
+                ready.set_result(None)
+                logger.info("Connected shared MCP tools")
+                await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"Error closing shared MCP tools: {e}")
+
+    async def get(self, name: str) -> ChatAgent:
+        """
+        Return the shared agent with the given name, building it on first use.
+
+        Raises:
+            KeyError: If name is not a known agent
+        """
+        if name not in self._factories:
+            raise KeyError(f"Unknown agent: {name}")
+
+        await self.start()
+        agent = self._agents.get(name)
+        if agent is None:
+            agent = self._agents[name] = self._factories[name]()
+            logger.info(f"Built shared {name}")
+        return agent
+
+    async def aclose(self) -> None:
+        """Close the shared MCP tool connections and drop the agents."""
+        self._agents.clear()
+        holder, self._holder = self._holder, None
+        if holder is None:
+            return
+        self._closing.set()
+        await holder
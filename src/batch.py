@@ -0,0 +1,310 @@
+"""Batch Quoting - Run the proposal pipeline for many requirement documents offline.
+
+Skips the interactive question phase: each input is a requirements summary,
+quoted with the BOM → Pricing → Proposal pipeline by a pool of concurrent
+workers sharing one client and agent registry.
+
+Inputs are either a directory of .txt / .md files (the file name is the ID)
+or a JSONL file of {"id": ..., "requirements": ...} objects.
+
+Results are appended to <output>/results.jsonl as each input completes, and
+each proposal is written to <output>/proposals/<id>.md. Rerunning with the
+same output directory resumes: inputs that already succeeded are skipped
+and failed ones are retried.
+
+    python -m src.batch requirements/ --output quotes/ --workers 8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.pricing import PricingOptions
+from src.runtime import suppress_async_generator_errors
+
+# Environment variables configuring batch runs
+BATCH_WORKERS_ENV = "BATCH_WORKERS"
+BATCH_TIMEOUT_ENV = "BATCH_TIMEOUT_SECONDS"
+
+# Defaults if not set in environment
+DEFAULT_BATCH_WORKERS = 4
+DEFAULT_BATCH_TIMEOUT_SECONDS = 600.0
+
+# Requirement document extensions read from an input directory
+INPUT_EXTENSIONS = (".txt", ".md")
+
+# Output layout
+RESULTS_FILE = "results.jsonl"
+PROPOSALS_DIR = "proposals"
+
+# Result statuses
+BATCH_SUCCEEDED = "succeeded"
+BATCH_FAILED = "failed"
+
+# Generates the outputs dict ("bom", "pricing", "proposal") for one requirements text
+QuoteRunner = Callable[[str], Awaitable[Dict[str, str]]]
+
+logger = logging.getLogger(__name__)
+
+
+def load_batch_inputs(path: str) -> List[Dict[str, str]]:
+    """
+    Read requirement documents from a directory or a JSONL file.
+
+    Args:
+        path: Directory of .txt / .md files, or a .jsonl file whose lines are
+            objects with "requirements" and an optional "id"
+
+    Returns:
+        List of {"id", "requirements"} dicts in a stable order
+
+    Raises:
+        ValueError: If an input is malformed, empty, or an ID is repeated or
+            shares its proposal file name with another
+    """
+    inputs = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            stem, extension = os.path.splitext(name)
+            if extension.lower() not in INPUT_EXTENSIONS:
+                continue
+            with open(os.path.join(path, name), encoding="utf-8") as f:
+                inputs.append({"id": stem, "requirements": f.read()})
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+                if not isinstance(record, dict) or not isinstance(record.get("requirements"), str):
+                    raise ValueError(f"{path}:{line_number}: expected an object with a requirements string")
+                inputs.append({
+                    "id": str(record.get("id") or f"line-{line_number:05d}"),
+                    "requirements": record["requirements"],
+                })
+
+    seen: Set[str] = set()
+    # Proposal file names by lowercased path, since file systems may ignore case
+    files: Dict[str, str] = {}
+    for batch_input in inputs:
+        input_id = batch_input["id"]
+        if not batch_input["requirements"].strip():
+            raise ValueError(f"Input {input_id} has empty requirements")
+        if input_id in seen:
+            raise ValueError(f"Duplicate input ID: {input_id}")
+        seen.add(input_id)
+        path = proposal_path("", input_id).lower()
+        if path in files:
+            raise ValueError(f"Input IDs {files[path]!r} and {input_id!r} map to the same proposal file")
+        files[path] = input_id
+    return inputs
+
+
+def completed_ids(output_dir: str) -> Set[str]:
+    """
+    Return the IDs already quoted successfully in an output directory.
+
+    A partial last line left by an interrupted run is ignored, so that
+    input is quoted again.
+    """
+    results_path = os.path.join(output_dir, RESULTS_FILE)
+    done: Set[str] = set()
+    if not os.path.exists(results_path):
+        return done
+
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if result.get("status") == BATCH_SUCCEEDED:
+                done.add(result["id"])
+    return done
+
+
+def proposal_path(output_dir: str, input_id: str) -> str:
+    """
+    Return the proposal Markdown path for an input, with a file-system-safe name.
+
+    An ID that has to be changed to be safe gets a short hash of the original
+    appended, so "a/b" and "a_b" are written to different files.
+    """
+    safe_id = re.sub(r"[^\w.-]", "_", input_id)
+    if safe_id != input_id:
+        digest = hashlib.sha256(input_id.encode("utf-8")).hexdigest()[:8]
+        safe_id = f"{safe_id}-{digest}"
+    return os.path.join(output_dir, PROPOSALS_DIR, f"{safe_id}.md")
+
+
+async def run_batch(
+    inputs: List[Dict[str, str]],
+    run_quote: QuoteRunner,
+    output_dir: str,
+    workers: int = DEFAULT_BATCH_WORKERS,
+    timeout: Optional[float] = DEFAULT_BATCH_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    """
+    Quote many inputs concurrently, writing each result as it completes.
+
+    Args:
+        inputs: {"id", "requirements"} dicts from load_batch_inputs
+        run_quote: Coroutine function generating one input's outputs
+        output_dir: Directory for results.jsonl and proposals/
+        workers: Number of inputs quoted at once
+        timeout: Seconds allowed per input, or None for no limit
+
+    Returns:
+        Counts of total, skipped (already done), succeeded and failed inputs
+    """
+    os.makedirs(os.path.join(output_dir, PROPOSALS_DIR), exist_ok=True)
+    done = completed_ids(output_dir)
+    pending = [batch_input for batch_input in inputs if batch_input["id"] not in done]
+    summary = {
+        "total": len(inputs),
+        "skipped": len(inputs) - len(pending),
+        BATCH_SUCCEEDED: 0,
+        BATCH_FAILED: 0,
+    }
+    logger.info(f"Quoting {len(pending)} inputs with {workers} workers ({summary['skipped']} already done)")
+
+    queue: "asyncio.Queue[Dict[str, str]]" = asyncio.Queue()
+    for batch_input in pending:
+        queue.put_nowait(batch_input)
+
+    results_path = os.path.join(output_dir, RESULTS_FILE)
+    with open(results_path, "a", encoding="utf-8") as results_file:
+        # End a partial line left by an interrupted run so it can't swallow the next result
+        if results_file.tell() > 0:
+            with open(results_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    results_file.write("\n")
+
+        def record(result: Dict[str, Any]) -> None:
+            # Workers share one event loop thread, so whole lines are written in turn
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            os.fsync(results_file.fileno())
+            summary[result["status"]] += 1
+
+        async def worker() -> None:
+            while True:
+                try:
+                    batch_input = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                record(await quote_one(batch_input))
+
+        async def quote_one(batch_input: Dict[str, str]) -> Dict[str, Any]:
+            started = time.monotonic()
+            result: Dict[str, Any] = {"id": batch_input["id"]}
+            try:
+                outputs = await asyncio.wait_for(run_quote(batch_input["requirements"]), timeout)
+                path = proposal_path(output_dir, batch_input["id"])
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(outputs.get("proposal", ""))
+                result.update(status=BATCH_SUCCEEDED, proposal_path=path, **outputs)
+            except asyncio.TimeoutError:
+                result.update(status=BATCH_FAILED, error=f"Timed out after {timeout:.0f}s")
+            except Exception as e:
+                logger.warning(f"Quote for {batch_input['id']} failed: {e}")
+                result.update(status=BATCH_FAILED, error=str(e))
+            result["duration_seconds"] = round(time.monotonic() - started, 3)
+            logger.info(f"{batch_input['id']}: {result['status']} in {result['duration_seconds']:.1f}s")
+            return result
+
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+
+    return summary
+
+
+async def quote_with_pipeline(
+    args: argparse.Namespace,
+    inputs: List[Dict[str, str]],
+    options: PricingOptions,
+) -> Dict[str, Any]:
+    """Run a batch through the real pipeline with one shared client and agent registry."""
+    # Imported here so the input/resume helpers above work without the agent framework
+    from src.clients import AgentClientPool
+    from src.pipeline import generate_proposal_outputs
+
+    # Suppress MCP cleanup errors, as the interactive CLI does
+    asyncio.get_running_loop().set_exception_handler(suppress_async_generator_errors)
+
+    client_pool = AgentClientPool()
+    try:
+        registry = await client_pool.get_registry()
+
+        async def run_quote(requirements: str) -> Dict[str, str]:
+            return await generate_proposal_outputs(
+                registry.client,
+                requirements,
+                registry=registry,
+                use_cache=not args.refresh,
+                options=options,
+            )
+
+        return await run_batch(
+            inputs,
+            run_quote,
+            args.output,
+            workers=args.workers,
+            timeout=args.timeout if args.timeout > 0 else None,
+        )
+    finally:
+        await client_pool.aclose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for batch quoting; returns the exit code."""
+    parser = argparse.ArgumentParser(description="Quote many requirement documents without the question phase.")
+    parser.add_argument("input", help="Directory of .txt/.md requirement files, or a .jsonl file")
+    parser.add_argument("--output", required=True, help="Directory for results.jsonl and proposals/ (reused to resume)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv(BATCH_WORKERS_ENV, DEFAULT_BATCH_WORKERS)),
+        help=f"Inputs quoted at once (default: ${BATCH_WORKERS_ENV} or {DEFAULT_BATCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=float(os.getenv(BATCH_TIMEOUT_ENV, DEFAULT_BATCH_TIMEOUT_SECONDS)),
+        help="Seconds allowed per input, 0 for no limit",
+    )
+    parser.add_argument("--refresh", action="store_true", help="Bypass cached proposals and BOMs")
+    parser.add_argument("--currency", default="USD", help="Currency code for all prices")
+    parser.add_argument("--region", help="ARM region code applied to every BOM item")
+    parser.add_argument("--discount-percent", type=float, default=0.0, help="Discount off retail prices")
+    args = parser.parse_args(argv)
+    try:
+        options = PricingOptions(
+            currency=args.currency,
+            region=args.region,
+            discount_percent=args.discount_percent,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    inputs = load_batch_inputs(args.input)
+    summary = asyncio.run(quote_with_pipeline(args, inputs, options))
+    print(json.dumps(summary))
+    return 1 if summary[BATCH_FAILED] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""Incremental parser for the BOM Agent's structured response stream.
+
+The BOM Agent responds with a BOMResponse object:
+
+    {"requirements_summary": "...", "items": [{...}, {...}]}
+
+BOMStreamParser consumes the streamed text and returns each item of the
+"items" array as soon as its object closes, so pricing lookups for early
+items can start while the model is still generating later ones.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+# Validates one BOM item given its index, raising ValueError if invalid
+ItemValidator = Callable[[Dict[str, Any], int], None]
+
+# Top-level field holding the BOM items
+ITEMS_FIELD = "items"
+
+
+class BOMStreamParser:
+    """
+    Scan a streamed BOMResponse and emit validated items as they complete.
+
+    Only the JSON structure is tracked (strings, escapes and nesting), so
+    each chunk is scanned once; complete items are decoded with json.loads.
+    The full text stays available for a final whole-object parse.
+    """
+
+    def __init__(self, validate_item: Optional[ItemValidator] = None):
+        """
+        Args:
+            validate_item: Per-item checks (e.g. validate_bom_item) run as each
+                item completes; invalid items raise ValueError from feed
+        """
+        self._validate_item = validate_item
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._in_items = False
+        self._item_start: Optional[int] = None
+        self.items: List[Dict[str, Any]] = []
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next chunk of the response.
+
+        Args:
+            chunk: Streamed response text
+
+        Returns:
+            Items completed by this chunk, in order (often empty)
+
+        Raises:
+            ValueError: If a completed item is not valid JSON or fails validation
+        """
+        self._buffer += chunk
+        completed = []
+
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        # Strings directly in the top-level object; the one
+                        # before a "[" is the key of that array
+                        self._last_key = json.loads(buffer[self._string_start:pos + 1])
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                if char == "[" and self._stack == ["{"] and self._last_key == ITEMS_FIELD:
+                    self._in_items = True
+                elif char == "{" and self._in_items and len(self._stack) == 2:
+                    self._item_start = pos
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if char == "]" and self._in_items and len(self._stack) == 1:
+                    self._in_items = False
+                elif char == "}" and self._item_start is not None and len(self._stack) == 2:
+                    completed.append(self._complete_item(buffer[self._item_start:pos + 1]))
+                    self._item_start = None
+
+        self._pos = len(buffer)
+        return completed
+
+    def _complete_item(self, item_text: str) -> Dict[str, Any]:
+        """Decode and validate one completed item."""
+        index = len(self.items)
+        try:
+            item = json.loads(item_text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"BOM item {index}: invalid JSON: {e}")
+
+        if self._validate_item is not None:
+            self._validate_item(item, index)
+        self.items.append(item)
+        return item
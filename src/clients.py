@@ -0,0 +1,88 @@
+"""Agent Client Pool - Long-lived Azure credential, AzureAIAgentClient and agents per worker."""
+
+import asyncio
+import logging
+import os
+from contextlib import AsyncExitStack
+from typing import Optional
+
+from azure.identity.aio import DefaultAzureCredential
+from agent_framework_azure_ai import AzureAIAgentClient
+
+from src.agents import AgentRegistry
+from src.pricing import get_price_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class AgentClientPool:
+    """
+    Lazily created, shared AzureAIAgentClient, credential and AgentRegistry.
+
+    The credential caches tokens and the client keeps its HTTP connections
+    alive, so chat turns skip token acquisition and connection setup. The
+    registry's agents and MCP sessions are built once on top of the client. All
+    coroutines using the pool must run on the same event loop (see
+    src.runtime.BackgroundEventLoop), and aclose() must be awaited on that
+    loop at shutdown.
+    """
+
+    def __init__(self, endpoint: Optional[str] = None, client: Optional[AzureAIAgentClient] = None):
+        """
+        Args:
+            endpoint: Azure AI project endpoint (default: AZURE_AI_PROJECT_ENDPOINT)
+            client: Chat client to share instead of creating an AzureAIAgentClient,
+                e.g. the offline stand-in used by the benchmarks; the pool
+                does not close it
+        """
+        self.endpoint = endpoint or os.getenv("AZURE_AI_PROJECT_ENDPOINT")
+        self._client: Optional[AzureAIAgentClient] = client
+        self._registry: Optional[AgentRegistry] = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def get_client(self) -> AzureAIAgentClient:
+        """Return the shared client, creating the credential and client on first use."""
+        if self._client is not None:
+            return self._client
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._client is None:
+                if not self.endpoint:
+                    raise RuntimeError("AZURE_AI_PROJECT_ENDPOINT environment variable is not set")
+
+                stack = AsyncExitStack()
+                credential = await stack.enter_async_context(DefaultAzureCredential())
+                self._client = await stack.enter_async_context(
+                    AzureAIAgentClient(
+                        project_endpoint=self.endpoint,
+                        async_credential=credential
+                    )
+                )
+                self._stack = stack
+                logger.info("Created shared AzureAIAgentClient")
+        return self._client
+
+    async def get_registry(self) -> AgentRegistry:
+        """Return the shared agent registry, connecting its MCP tools on first use."""
+        if self._registry is None:
+            client = await self.get_client()
+            if self._registry is None:
+                self._registry = AgentRegistry(client, price_catalog=get_price_catalog())
+        await self._registry.start()
+        return self._registry
+
+    async def aclose(self) -> None:
+        """Close the agent registry, client and credential."""
+        if self._registry is not None:
+            registry, self._registry = self._registry, None
+            await registry.aclose()
+        if self._stack is None:
+            return
+        stack, self._stack, self._client = self._stack, None, None
+        try:
+            await stack.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing AzureAIAgentClient: {e}")
@@ -0,0 +1,128 @@
+"""Stage Hand-off - Compact context passed from one pipeline stage to the next agent.
+
+The pipeline keeps what each stage produced in a StageHandoff: the BOM Agent's
+requirements summary and validated items, then the pricing computed in code
+and the Pricing Agent's narrative. Each agent is sent only the slice it needs,
+as one compact JSON object:
+
+    Pricing Agent   Requirements summary and priced lines with totals. It
+                    narrates, so it never sees (or echoes) the BOM JSON.
+    Proposal Agent  Requirements summary, the resources (service, SKU,
+                    quantity, region), totals, the region ranking and the cost
+                    analysis narrative. It writes prose only; the priced lines
+                    are rendered into the proposal by src.proposal.
+
+The user-facing stage text (the rendered BOM and PRICING DATA blocks) is
+unchanged; only agent input is compacted.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Header of the compact input sent to the Pricing Agent
+PRICING_INPUT_HEADER = "=== PRICING INPUT ==="
+
+# Header of the compact input sent to the Proposal Agent
+PROPOSAL_INPUT_HEADER = "=== PROPOSAL INPUT ==="
+
+# Pricing data fields passed through to the agents when present
+PRICING_TOTAL_FIELDS = ("total_monthly", "currency", "discount_percent", "prices_as_of")
+
+# Region comparison fields the agents need; the full region x line matrix is left out
+REGION_COMPARISON_FIELDS = ("cheapest_region", "ranking")
+
+# Line fields the Proposal Agent needs to describe the architecture
+RESOURCE_FIELDS = ("service", "sku", "quantity", "region")
+
+
+@dataclass
+class StageHandoff:
+    """What the BOM and Pricing stages produced, for the agents after them."""
+
+    requirements_summary: str
+    bom_items: List[Dict[str, Any]]
+    pricing: Optional[Dict[str, Any]] = None
+    pricing_narrative: str = ""
+
+
+def _compact_json(data: Any) -> str:
+    """Serialize without indentation or spaces after separators."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _pricing_totals(pricing: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the totals and, if present, the region ranking of pricing data."""
+    totals = {name: pricing[name] for name in PRICING_TOTAL_FIELDS if name in pricing}
+    comparison = pricing.get("region_comparison")
+    if comparison is not None:
+        totals["region_comparison"] = {
+            name: comparison[name] for name in REGION_COMPARISON_FIELDS if name in comparison
+        }
+    return totals
+
+
+def render_pricing_input(handoff: StageHandoff) -> str:
+    """
+    Render the Pricing Agent's input: requirements summary and priced lines.
+
+    Raises:
+        ValueError: If the hand-off has no pricing yet
+    """
+    if handoff.pricing is None:
+        raise ValueError("Pricing input needs pricing data")
+    data = {
+        "requirements_summary": handoff.requirements_summary,
+        "items": handoff.pricing["items"],
+        **_pricing_totals(handoff.pricing),
+    }
+    return f"{PRICING_INPUT_HEADER}\n{_compact_json(data)}"
+
+
+def proposal_line_items(handoff: StageHandoff) -> List[Dict[str, Any]]:
+    """
+    Merge each BOM item with its pricing line.
+
+    Raises:
+        ValueError: If the hand-off has no pricing, or its lines don't match the BOM
+    """
+    if handoff.pricing is None:
+        raise ValueError("Proposal input needs pricing data")
+    priced = handoff.pricing["items"]
+    if len(priced) != len(handoff.bom_items):
+        raise ValueError(f"Pricing has {len(priced)} lines for {len(handoff.bom_items)} BOM items")
+
+    lines = []
+    for item, line in zip(handoff.bom_items, priced):
+        lines.append({
+            "service": item["serviceName"],
+            "sku": item["sku"],
+            "quantity": item["quantity"],
+            "region": item["region"],
+            "hours_per_month": item["hours_per_month"],
+            "hourly_price": line["hourly_price"],
+            "monthly_cost": line["monthly_cost"],
+            "savings_options": line.get("savings_options", {}),
+            **({"note": line["note"]} if line.get("note") else {}),
+        })
+    return lines
+
+
+def render_proposal_input(handoff: StageHandoff) -> str:
+    """
+    Render the Proposal Agent's input: requirements summary, resources,
+    totals and the cost analysis narrative.
+
+    Raises:
+        ValueError: If the hand-off has no pricing, or its lines don't match the BOM
+    """
+    data = {
+        "requirements_summary": handoff.requirements_summary,
+        "resources": [
+            {name: line[name] for name in RESOURCE_FIELDS}
+            for line in proposal_line_items(handoff)
+        ],
+        **_pricing_totals(handoff.pricing),
+        "cost_analysis": handoff.pricing_narrative.strip(),
+    }
+    return f"{PROPOSAL_INPUT_HEADER}\n{_compact_json(data)}"
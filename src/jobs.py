@@ -0,0 +1,350 @@
+"""Job Queue - Background proposal generation with pollable job IDs.
+
+Proposal generation is submitted as a job and runs on the worker's event loop
+(src/runtime.py), so the HTTP request returns a job ID immediately. Job status,
+per-stage progress and results are kept in a store selected by JOB_STORE_URL:
+
+    memory://                   In-process dict (default, single worker only)
+    sqlite:///path/to/jobs.db   SQLite file shared by all workers on a host
+
+With several workers, use SQLite so a status poll answered by any worker sees
+the job. Each worker bounds its own jobs with:
+
+    JOB_MAX_CONCURRENCY         Jobs running at once; the rest wait in the queue
+    JOB_MAX_PENDING             Jobs queued or running; submissions beyond are rejected
+    JOB_TIMEOUT_SECONDS         Jobs running longer than this fail
+    JOB_RESULT_TTL_SECONDS      Finished jobs are kept this long after their last update
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from src.runtime import BackgroundEventLoop
+
+# Environment variables configuring the job queue
+JOB_STORE_URL_ENV = "JOB_STORE_URL"
+JOB_MAX_CONCURRENCY_ENV = "JOB_MAX_CONCURRENCY"
+JOB_MAX_PENDING_ENV = "JOB_MAX_PENDING"
+JOB_TIMEOUT_ENV = "JOB_TIMEOUT_SECONDS"
+JOB_RESULT_TTL_ENV = "JOB_RESULT_TTL_SECONDS"
+
+# Defaults for the job queue
+DEFAULT_JOB_STORE_URL = "memory://"
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_PENDING = 100
+DEFAULT_JOB_TIMEOUT_SECONDS = 600.0
+DEFAULT_RESULT_TTL_SECONDS = 3600.0
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Coroutine a job uses to persist progress, e.g. await report(stage="bom_agent")
+ProgressReporter = Callable[..., Awaitable[None]]
+
+# A job body: receives the progress reporter and returns the job result
+JobRunner = Callable[[ProgressReporter], Awaitable[Dict[str, Any]]]
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when a worker already has JOB_MAX_PENDING jobs queued or running."""
+
+
+class JobStore(ABC):
+    """Storage for job records, expired JOB_RESULT_TTL_SECONDS after their last update."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    @abstractmethod
+    def create(self, job: Dict[str, Any]) -> None:
+        """Store a new job record keyed by job["job_id"]."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if unknown or expired."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Merge fields into a job record and return it, or None if unknown."""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Remove expired jobs, returning how many were removed."""
+
+
+class InMemoryJobStore(JobStore):
+    """Job store held in this process only."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    def create(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job, updated_at=self._clock())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or self._clock() - job["updated_at"] > self.ttl_seconds:
+                return None
+            return dict(job)
+
+    def update(self, job_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields, updated_at=self._clock())
+            return dict(job)
+
+    def evict_expired(self) -> int:
+        cutoff = self._clock() - self.ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job["updated_at"] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at)")
+
+    def create(self, job: Dict[str, Any]) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, data, updated_at) VALUES (?, ?, ?)",
+                (job["job_id"], json.dumps(dict(job, updated_at=now)), now),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE job_id = ? AND updated_at >= ?",
+                (job_id, self._clock() - self.ttl_seconds),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def update(self, job_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        now = self._clock()
+        with self._lock:
+            # Only the worker running a job writes to it, so read-modify-write is safe
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = json.loads(row[0])
+            job.update(fields, updated_at=now)
+            self._conn.execute(
+                "UPDATE jobs SET data = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(job), now, job_id),
+            )
+        return job
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE updated_at < ?",
+                (self._clock() - self.ttl_seconds,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_store(url: Optional[str] = None) -> JobStore:
+    """
+    Create the job store named by a URL (default: JOB_STORE_URL).
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    url = url or os.getenv(JOB_STORE_URL_ENV, DEFAULT_JOB_STORE_URL)
+    ttl_seconds = float(os.getenv(JOB_RESULT_TTL_ENV, DEFAULT_RESULT_TTL_SECONDS))
+
+    if url.startswith("memory://"):
+        return InMemoryJobStore(ttl_seconds=ttl_seconds)
+    if url.startswith("sqlite:///"):
+        return SQLiteJobStore(url[len("sqlite:///"):], ttl_seconds=ttl_seconds)
+    raise ValueError(f"Unsupported job store URL: {url}")
+
+
+class JobQueue:
+    """
+    Bounded queue running jobs on a BackgroundEventLoop.
+
+    submit() is called from request threads and returns as soon as the job
+    is recorded. At most max_concurrency jobs run at once; the rest wait
+    (status "queued"). Once max_pending jobs are queued or running in this
+    worker, submit() raises JobQueueFull instead of accepting more.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runtime: BackgroundEventLoop,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        timeout_seconds: Optional[float] = DEFAULT_JOB_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.store = store
+        self.runtime = runtime
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max(1, max_pending)
+        self.timeout_seconds = timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._active: Set[str] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, runner: JobRunner, **metadata: Any) -> Dict[str, Any]:
+        """
+        Record a new job and schedule it.
+
+        Args:
+            runner: Coroutine function doing the work; it receives a progress
+                reporter and returns the job result
+            **metadata: Extra fields stored on the job (e.g. session_id)
+
+        Returns:
+            The queued job record
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already queued or running
+        """
+        job = {
+            **metadata,
+            "job_id": uuid.uuid4().hex,
+            "status": JOB_QUEUED,
+            "stage": None,
+            "outputs": {},
+            "result": None,
+            "error": None,
+            "created_at": self._clock(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock:
+            if len(self._active) >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFull(f"{len(self._active)} jobs already queued or running")
+            self._active.add(job["job_id"])
+
+        self.store.evict_expired()
+        self.store.create(job)
+        self.runtime.submit(self._run(job["job_id"], runner))
+        return job
+
+    async def _run(self, job_id: str, runner: JobRunner) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Store calls run in a thread: a SQLite write can wait on a busy lock,
+        # and the loop is shared by every job and request on the worker
+        async def report(**fields: Any) -> None:
+            await asyncio.to_thread(self.store.update, job_id, **fields)
+
+        try:
+            async with self._semaphore:
+                await report(status=JOB_RUNNING, started_at=self._clock())
+                result = await asyncio.wait_for(runner(report), self.timeout_seconds)
+            await report(status=JOB_SUCCEEDED, result=result, finished_at=self._clock())
+            self.completed += 1
+        except asyncio.CancelledError:
+            with self._lock:
+                # fail_active() already recorded jobs cancelled at shutdown
+                still_active = job_id in self._active
+            if still_active:
+                self._fail(job_id, "Job was cancelled")
+            raise
+        except asyncio.TimeoutError:
+            await asyncio.to_thread(self._fail, job_id, f"Job did not complete within {self.timeout_seconds} seconds")
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            await asyncio.to_thread(self._fail, job_id, str(e))
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def _fail(self, job_id: str, error: str) -> None:
+        self.store.update(job_id, status=JOB_FAILED, error=error, finished_at=self._clock())
+        self.failed += 1
+
+    def fail_active(self, error: str = "Worker shut down before the job finished") -> int:
+        """Mark every queued or running job in this worker as failed, e.g. at shutdown."""
+        with self._lock:
+            job_ids, self._active = self._active, set()
+        for job_id in job_ids:
+            self._fail(job_id, error)
+        return len(job_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return this worker's pending, completed, failed and rejected job counts."""
+        with self._lock:
+            pending = len(self._active)
+        return {
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+def create_job_queue(runtime: BackgroundEventLoop, store: Optional[JobStore] = None) -> JobQueue:
+    """Create a job queue on a BackgroundEventLoop, configured from the JOB_* environment variables."""
+    return JobQueue(
+        store if store is not None else create_job_store(),
+        runtime,
+        max_concurrency=int(os.getenv(JOB_MAX_CONCURRENCY_ENV, DEFAULT_MAX_CONCURRENCY)),
+        max_pending=int(os.getenv(JOB_MAX_PENDING_ENV, DEFAULT_MAX_PENDING)),
+        timeout_seconds=float(os.getenv(JOB_TIMEOUT_ENV, DEFAULT_JOB_TIMEOUT_SECONDS)),
+    )
@@ -0,0 +1,22 @@
+"""MCP Results - Flatten MCP tool call results and recognize error payloads."""
+
+import json
+from typing import Any
+
+
+def mcp_result_text(result: Any) -> str:
+    """Flatten an MCP call_tool result (string or list of contents) into text."""
+    if isinstance(result, str):
+        return result
+    return "".join(getattr(content, "text", None) or "" for content in result or [])
+
+
+def is_mcp_error_result(result: Any) -> bool:
+    """Whether an MCP call_tool result reports an error rather than data."""
+    if getattr(result, "isError", False):
+        return True
+    try:
+        payload = json.loads(mcp_result_text(result))
+    except (json.JSONDecodeError, TypeError):
+        return False
+    return isinstance(payload, dict) and bool(payload.get("error"))
@@ -0,0 +1,409 @@
+"""BOM → Pricing → Proposal pipeline shared by the CLI and the web app."""
+
+import copy
+import logging
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from agent_framework_azure_ai import AzureAIAgentClient
+
+from src.agents import (
+    AgentRegistry,
+    create_bom_agent,
+    create_pricing_agent,
+    create_proposal_agent,
+)
+from src.agents.bom_agent import (
+    bom_instructions,
+    parse_structured_bom,
+    render_bom_text,
+    validate_bom_item,
+)
+from src.agents.pricing_agent import PRICING_INSTRUCTIONS
+from src.agents.pricing_tools import create_prefetch_lookup, open_price_lookup
+from src.agents.proposal_agent import proposal_instructions
+from src.bom_stream import BOMStreamParser
+from src.handoff import StageHandoff, render_pricing_input
+from src.pipeline_cache import (
+    get_bom_cache,
+    get_pipeline_cache,
+    instructions_version,
+    make_bom_cache_key,
+    make_pipeline_cache_key,
+)
+from src.pricing import (
+    DEFAULT_CURRENCY,
+    PriceCatalog,
+    PriceLookupPrefetcher,
+    PricingOptions,
+    apply_discount,
+    apply_region_override,
+    compare_regions,
+    comparison_items,
+    format_pricing_data,
+    get_max_concurrency,
+    get_price_catalog,
+    has_failed_lookups,
+    price_bom,
+)
+from src.proposal import (
+    PROPOSAL_TEMPLATE_VERSION,
+    PROPOSAL_TITLE,
+    render_computed_sections,
+    render_section_request,
+    stream_narrative_sections,
+)
+from src.telemetry import RunTelemetry, get_metrics
+
+# Stage names, matching the agent names used throughout the app
+BOM_STAGE = "bom_agent"
+PRICING_STAGE = "pricing_agent"
+PROPOSAL_STAGE = "proposal_agent"
+
+# Keys under which each stage's text output is returned to callers
+STAGE_OUTPUT_KEYS = {
+    BOM_STAGE: "bom",
+    PRICING_STAGE: "pricing",
+    PROPOSAL_STAGE: "proposal",
+}
+
+# Event types emitted by run_proposal_pipeline
+STAGE_STARTED = "stage_started"
+STAGE_TEXT = "text"
+STAGE_COMPLETED = "stage_completed"
+
+# Model deployment used by every agent, part of every cache key
+MODEL_DEPLOYMENT = os.getenv("AZURE_AI_MODEL_DEPLOYMENT_NAME", "")
+
+# Version of the agent configuration, part of every pipeline cache key
+AGENTS_VERSION = instructions_version(
+    bom_instructions(),
+    bom_instructions(with_snapshot=True),
+    PRICING_INSTRUCTIONS,
+    proposal_instructions(),
+    str(PROPOSAL_TEMPLATE_VERSION),
+    MODEL_DEPLOYMENT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineEvent:
+    """A progress update emitted while the pipeline runs."""
+
+    stage: str
+    type: str
+    text: str = ""
+    data: Any = None
+
+
+def prices_version(catalog: Optional[PriceCatalog]) -> str:
+    """Return the snapshot time of the prices used, or today's UTC date for live prices."""
+    snapshot_time = catalog.snapshot_time if catalog else None
+    return snapshot_time or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def bom_version(catalog: Optional[PriceCatalog]) -> str:
+    """Return the version of everything that shapes the BOM Agent's SKU choices."""
+    if catalog is None:
+        return instructions_version(bom_instructions(), MODEL_DEPLOYMENT)
+    return instructions_version(
+        bom_instructions(with_snapshot=True),
+        catalog.snapshot_time or "",
+        MODEL_DEPLOYMENT,
+    )
+
+
+async def run_proposal_pipeline(
+    client: AzureAIAgentClient,
+    requirements: str,
+    registry: Optional[AgentRegistry] = None,
+    use_cache: bool = True,
+    options: Optional[PricingOptions] = None,
+) -> AsyncIterator[PipelineEvent]:
+    """
+    Run the BOM → Pricing → Proposal pipeline, yielding events as it progresses.
+
+    The BOM and Proposal stages are LLM agents. The Pricing stage resolves every
+    BOM line concurrently - from the local price snapshot when one is configured,
+    otherwise from the Azure Pricing MCP server - and computes the totals in
+    code; the Pricing Agent only writes the narrative around them. The BOM
+    Agent responds with a schema-enforced object, so the BOM stage emits its
+    text in one event once the object is validated. Price lookups for each
+    BOM item start as soon as the item is streamed, overlapping the two stages.
+
+    Each run records per-stage spans and metrics (see src.telemetry).
+
+    Results are cached by canonical requirements, agent instructions, price
+    version and pricing options (see src.pipeline_cache). A cached result is
+    replayed as the same sequence of events, with each stage's text in a
+    single event. The BOM is also memoized on its own, so a re-quote that
+    only changes the pricing options skips the BOM Agent.
+
+    Args:
+        client: Azure AI agent client
+        requirements: Requirements summary gathered by the Question Agent
+        registry: Prebuilt agents and connected MCP tools to reuse; without
+            one, agents and MCP connections are created for this run only
+        use_cache: False to skip the cache lookups and regenerate; the fresh
+            results still replace the cached ones
+        options: Currency, region override, discount and regions to compare
+            (default: USD retail, no comparison)
+
+    Yields:
+        PipelineEvent for stage starts, streamed text and stage completion.
+        Completed BOM and Pricing stages carry the parsed BOM items and the
+        pricing data dict respectively.
+    """
+    options = options or PricingOptions()
+    catalog = registry.price_catalog if registry is not None else get_price_catalog()
+    cache = get_pipeline_cache()
+    key = make_pipeline_cache_key(
+        requirements, AGENTS_VERSION, prices_version(catalog), asdict(options)
+    )
+
+    cached = cache.get(key) if use_cache else None
+    if use_cache:
+        get_metrics().record_cache("pipeline", cached is not None)
+    if cached is not None:
+        logger.info(f"Pipeline cache hit {key[:12]}")
+        for event in _replay(cached):
+            yield event
+        return
+
+    result = {output_key: "" for output_key in STAGE_OUTPUT_KEYS.values()}
+    telemetry = RunTelemetry("proposal_pipeline")
+    error = None
+    try:
+        async for event in _run_stages(client, requirements, catalog, registry, options, use_cache, telemetry):
+            if event.type == STAGE_STARTED:
+                telemetry.stage_started(event.stage)
+            elif event.type == STAGE_TEXT:
+                # Time to first token comes from agent updates, not text rendered by the pipeline
+                result[STAGE_OUTPUT_KEYS[event.stage]] += event.text
+            elif event.type == STAGE_COMPLETED:
+                telemetry.stage_completed(event.stage)
+                if event.stage == BOM_STAGE:
+                    result["bom_items"] = copy.deepcopy(event.data)
+                elif event.stage == PRICING_STAGE:
+                    result["pricing_data"] = copy.deepcopy(event.data)
+            yield event
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        telemetry.finish(error)
+
+    # Don't pin transient pricing failures or empty proposals for the cache lifetime
+    if result["proposal"].strip() and not has_failed_lookups(result["pricing_data"]):
+        cache.set(key, result)
+
+
+def _replay(result: Dict[str, Any]) -> Iterator[PipelineEvent]:
+    """Yield the events of a completed run from its cached result."""
+    data = {
+        BOM_STAGE: result["bom_items"],
+        PRICING_STAGE: result["pricing_data"],
+        PROPOSAL_STAGE: None,
+    }
+    for stage, output_key in STAGE_OUTPUT_KEYS.items():
+        yield PipelineEvent(stage, STAGE_STARTED)
+        yield PipelineEvent(stage, STAGE_TEXT, result[output_key])
+        yield PipelineEvent(stage, STAGE_COMPLETED, data=copy.deepcopy(data[stage]))
+
+
+async def _run_stages(
+    client: AzureAIAgentClient,
+    requirements: str,
+    catalog: Optional[PriceCatalog],
+    registry: Optional[AgentRegistry],
+    options: PricingOptions,
+    use_cache: bool,
+    telemetry: RunTelemetry,
+) -> AsyncIterator[PipelineEvent]:
+    """Run the three stages for real, yielding events as they progress; agent updates go to telemetry."""
+    pricing_tool = None
+    if registry is not None and registry.pricing_tool.is_connected:
+        pricing_tool = registry.pricing_tool
+
+    # Lookups for streamed BOM items start while later items are generated
+    max_concurrency = get_max_concurrency()
+    prefetcher = PriceLookupPrefetcher(
+        create_prefetch_lookup(catalog, pricing_tool),
+        currency=options.currency,
+        max_concurrency=max_concurrency,
+    )
+    try:
+        # Stage 1: BOM - memoized on its own, since pricing options don't change it
+        yield PipelineEvent(BOM_STAGE, STAGE_STARTED)
+        bom_cache = get_bom_cache()
+        bom_key = make_bom_cache_key(requirements, bom_version(catalog))
+        memoized = bom_cache.get(bom_key) if use_cache else None
+        if use_cache:
+            get_metrics().record_cache("bom", memoized is not None)
+
+        if memoized is not None:
+            logger.info(f"BOM cache hit {bom_key[:12]}")
+            summary, bom_items = memoized["summary"], copy.deepcopy(memoized["bom_items"])
+        else:
+            bom_agent = (
+                await registry.get(BOM_STAGE) if registry is not None
+                else create_bom_agent(client, price_catalog=catalog)
+            )
+            # Structured output arrives as JSON; it is rendered once validated
+            parser = BOMStreamParser(validate_item=validate_bom_item)
+            async for update in bom_agent.run_stream(requirements):
+                telemetry.agent_update(BOM_STAGE, update)
+                if update.text:
+                    for item in parser.feed(update.text):
+                        prefetcher.prefetch(apply_region_override([item], options.region)[0])
+
+            summary, bom_items = parse_structured_bom(parser.text)
+            logger.info(f"Prefetched prices for {prefetcher.prefetched} of {len(bom_items)} BOM items")
+            bom_cache.set(bom_key, {"summary": summary, "bom_items": copy.deepcopy(bom_items)})
+
+        if options.region:
+            bom_items = apply_region_override(bom_items, options.region)
+        handoff = StageHandoff(requirements_summary=summary or requirements, bom_items=bom_items)
+        bom_output = render_bom_text(summary, bom_items)
+        yield PipelineEvent(BOM_STAGE, STAGE_TEXT, bom_output)
+        yield PipelineEvent(BOM_STAGE, STAGE_COMPLETED, data=bom_items)
+
+        # Stage 2: Pricing - computed in code, narrated by the Pricing Agent
+        yield PipelineEvent(PRICING_STAGE, STAGE_STARTED)
+        pricing_agent = (
+            await registry.get(PRICING_STAGE) if registry is not None
+            else create_pricing_agent(client)
+        )
+        async with open_price_lookup(
+            bom_items + comparison_items(bom_items, options.compare_regions),
+            currency=options.currency,
+            catalog=catalog,
+            pricing_tool=pricing_tool,
+        ) as lookup:
+            pricing = await price_bom(
+                bom_items,
+                prefetcher.wrap(lookup),
+                currency=options.currency,
+                max_concurrency=max_concurrency,
+            )
+            comparison = None
+            if options.compare_regions:
+                comparison = await compare_regions(
+                    bom_items,
+                    options.compare_regions,
+                    lookup,
+                    currency=options.currency,
+                    max_concurrency=max_concurrency,
+                )
+    finally:
+        await prefetcher.aclose()
+
+    pricing = apply_discount(pricing, options.discount_percent)
+    if comparison is not None:
+        pricing["region_comparison"] = comparison
+    pricing["prices_as_of"] = prices_version(catalog)
+    handoff.pricing = pricing
+
+    yield PipelineEvent(PRICING_STAGE, STAGE_TEXT, format_pricing_data(pricing) + "\n\n")
+
+    # The agents get compact JSON slices of the hand-off, never the rendered BOM text
+    async for update in pricing_agent.run_stream(render_pricing_input(handoff)):
+        telemetry.agent_update(PRICING_STAGE, update)
+        if update.text:
+            handoff.pricing_narrative += update.text
+            yield PipelineEvent(PRICING_STAGE, STAGE_TEXT, update.text)
+
+    yield PipelineEvent(PRICING_STAGE, STAGE_COMPLETED, data=pricing)
+
+    # Stage 3: Proposal
+    yield PipelineEvent(PROPOSAL_STAGE, STAGE_STARTED)
+    proposal_agent = (
+        await registry.get(PROPOSAL_STAGE) if registry is not None
+        else create_proposal_agent(client)
+    )
+    # Only the narrative is written by the model; every figure is rendered from the pricing
+    computed_sections = render_computed_sections(handoff)
+    yield PipelineEvent(PROPOSAL_STAGE, STAGE_TEXT, f"{PROPOSAL_TITLE}\n\n")
+
+    async def write_section(section: str) -> AsyncIterator[str]:
+        async for update in proposal_agent.run_stream(render_section_request(handoff, section)):
+            telemetry.agent_update(PROPOSAL_STAGE, update)
+            if update.text:
+                yield update.text
+
+    async for text in stream_narrative_sections(write_section):
+        yield PipelineEvent(PROPOSAL_STAGE, STAGE_TEXT, text)
+    yield PipelineEvent(PROPOSAL_STAGE, STAGE_TEXT, computed_sections)
+
+    yield PipelineEvent(PROPOSAL_STAGE, STAGE_COMPLETED)
+
+
+async def generate_proposal_outputs(
+    client: AzureAIAgentClient,
+    requirements: str,
+    registry: Optional[AgentRegistry] = None,
+    use_cache: bool = True,
+    options: Optional[PricingOptions] = None,
+) -> Dict[str, str]:
+    """
+    Run the pipeline to completion and collect the text output of each stage.
+
+    Args:
+        use_cache: False to bypass the pipeline result and BOM caches
+        options: Currency, region override, discount and regions to compare
+            (default: USD retail, no comparison)
+
+    Returns:
+        Dict with "bom", "pricing" and "proposal" text
+    """
+    outputs = {key: "" for key in STAGE_OUTPUT_KEYS.values()}
+
+    async for event in run_proposal_pipeline(
+        client, requirements, registry=registry, use_cache=use_cache, options=options
+    ):
+        if event.type == STAGE_TEXT:
+            outputs[STAGE_OUTPUT_KEYS[event.stage]] += event.text
+
+    return outputs
+
+
+async def run_region_comparison(
+    bom_items: List[Dict[str, Any]],
+    regions: List[str],
+    registry: Optional[AgentRegistry] = None,
+    currency: str = DEFAULT_CURRENCY,
+) -> Dict[str, Any]:
+    """
+    Price a validated BOM in every given region, without running any agent.
+
+    Args:
+        bom_items: Validated BOM items
+        regions: ARM region codes to compare
+        registry: Agent registry whose price snapshot and connected Azure
+            Pricing MCP tool to reuse; without one, the configured snapshot
+            is used and an MCP connection is opened for this comparison only
+        currency: Currency code for all prices
+
+    Returns:
+        Region x line cost matrix and ranking from src.pricing.compare_regions
+    """
+    catalog = registry.price_catalog if registry is not None else get_price_catalog()
+    pricing_tool = None
+    if registry is not None and registry.pricing_tool.is_connected:
+        pricing_tool = registry.pricing_tool
+
+    async with open_price_lookup(
+        comparison_items(bom_items, regions),
+        currency=currency,
+        catalog=catalog,
+        pricing_tool=pricing_tool,
+    ) as lookup:
+        comparison = await compare_regions(
+            bom_items, regions, lookup, currency=currency, max_concurrency=get_max_concurrency()
+        )
+    comparison["prices_as_of"] = prices_version(catalog)
+    return comparison
@@ -0,0 +1,144 @@
+"""Pipeline Cache - Content-addressed caches of BOM → Pricing → Proposal results.
+
+A full pipeline result is keyed on these inputs, so it is reused only when
+rerunning the pipeline would produce an equivalent quote:
+
+    requirements    Canonicalized requirements text (case, whitespace and
+                    list bullet differences are ignored)
+    agents          Version hash of the agent instructions and model deployment
+    prices          Price snapshot time, or the current UTC date for live prices
+    options         Pricing options (currency, region override, discount)
+
+The BOM stage is also memoized on its own, keyed on the requirements and the
+BOM Agent version only, so a what-if re-quote with different pricing options
+skips the BOM Agent and its tool calls.
+
+Configured by:
+
+    PIPELINE_CACHE_TTL_SECONDS      Lifetime of a cached result (0 disables the cache)
+    PIPELINE_CACHE_MAX_ENTRIES      Least recently used results beyond this are evicted
+    BOM_CACHE_TTL_SECONDS           Lifetime of a memoized BOM (0 disables memoization)
+    BOM_CACHE_MAX_ENTRIES           Least recently used BOMs beyond this are evicted
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from src.pricing.cache import TTLCache
+
+# Environment variables configuring the pipeline result and BOM caches
+PIPELINE_CACHE_TTL_ENV = "PIPELINE_CACHE_TTL_SECONDS"
+PIPELINE_CACHE_MAX_ENTRIES_ENV = "PIPELINE_CACHE_MAX_ENTRIES"
+BOM_CACHE_TTL_ENV = "BOM_CACHE_TTL_SECONDS"
+BOM_CACHE_MAX_ENTRIES_ENV = "BOM_CACHE_MAX_ENTRIES"
+
+# Defaults for the pipeline result and BOM caches
+DEFAULT_PIPELINE_CACHE_TTL_SECONDS = 86400.0
+DEFAULT_PIPELINE_CACHE_MAX_ENTRIES = 256
+DEFAULT_BOM_CACHE_TTL_SECONDS = 86400.0
+DEFAULT_BOM_CACHE_MAX_ENTRIES = 1024
+
+# Bump when the shape of cached results changes
+PIPELINE_CACHE_SCHEMA = 1
+
+# Question Agent completion marker, which carries no requirement
+_COMPLETION_MARKER = re.compile(r"we are done!?", re.IGNORECASE)
+
+# Markdown list bullet opening a line, which carries no requirement
+_LIST_BULLET = re.compile(r"^[ \t]*[-*+][ \t]+", re.MULTILINE)
+
+
+def canonicalize_requirements(requirements: str) -> str:
+    """
+    Reduce requirements text to a canonical form for cache keys.
+
+    Unicode compatibility forms, letter case, whitespace and list bullets
+    are normalized away, so "- Web app,\n- 10k users" and "* web app, 10k
+    users" share an entry. Every other character is kept verbatim, since
+    symbols change meaning ("< 1000 users" vs "> 1000 users", "2-4 vCPU" vs
+    "24 vCPU"), so any change in sizing or services is a different entry.
+    """
+    text = unicodedata.normalize("NFKC", requirements).casefold()
+    text = _COMPLETION_MARKER.sub(" ", text)
+    text = _LIST_BULLET.sub("", text)
+    return " ".join(text.split())
+
+
+def instructions_version(*parts: str) -> str:
+    """Return a short, stable hash identifying a set of agent instructions and settings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def make_pipeline_cache_key(
+    requirements: str,
+    agents_version: str,
+    prices_version: str,
+    pricing_options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Build the content address of a pipeline result.
+
+    Args:
+        requirements: Requirements text passed to the pipeline
+        agents_version: Result of instructions_version for the pipeline agents
+        prices_version: Price snapshot time, or the date live prices were fetched
+        pricing_options: Currency, region override and discount, if any
+
+    Returns:
+        Hex SHA-256 of the canonical requirements, versions and options
+    """
+    material = "\n".join([
+        f"schema={PIPELINE_CACHE_SCHEMA}",
+        f"agents={agents_version}",
+        f"prices={prices_version}",
+        f"options={json.dumps(pricing_options or {}, sort_keys=True)}",
+        canonicalize_requirements(requirements),
+    ])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def make_bom_cache_key(requirements: str, bom_version: str) -> str:
+    """
+    Build the content address of a memoized BOM.
+
+    Args:
+        requirements: Requirements text passed to the pipeline
+        bom_version: Result of instructions_version for the BOM Agent and
+            whatever else changes its SKU choices (e.g. the price snapshot)
+
+    Returns:
+        Hex SHA-256 of the canonical requirements and BOM version
+    """
+    material = "\n".join([
+        f"schema={PIPELINE_CACHE_SCHEMA}",
+        f"bom={bom_version}",
+        canonicalize_requirements(requirements),
+    ])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_pipeline_cache() -> TTLCache:
+    """Return the process-wide pipeline result cache configured from the environment."""
+    return TTLCache(
+        max_entries=int(os.getenv(PIPELINE_CACHE_MAX_ENTRIES_ENV, DEFAULT_PIPELINE_CACHE_MAX_ENTRIES)),
+        ttl_seconds=float(os.getenv(PIPELINE_CACHE_TTL_ENV, DEFAULT_PIPELINE_CACHE_TTL_SECONDS)),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_bom_cache() -> TTLCache:
+    """Return the process-wide memoized BOM cache configured from the environment."""
+    return TTLCache(
+        max_entries=int(os.getenv(BOM_CACHE_MAX_ENTRIES_ENV, DEFAULT_BOM_CACHE_MAX_ENTRIES)),
+        ttl_seconds=float(os.getenv(BOM_CACHE_TTL_ENV, DEFAULT_BOM_CACHE_TTL_SECONDS)),
+    )
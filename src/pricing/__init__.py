@@ -0,0 +1,87 @@
+"""Deterministic pricing helpers for Azure Pricing Assistant."""
+
+from .engine import (
+    DEFAULT_CURRENCY,
+    PriceLookup,
+    PriceLookupPrefetcher,
+    PricingOptions,
+    apply_discount,
+    apply_region_override,
+    region_display_name,
+    normalize_cost_estimate,
+    first_available_lookup,
+    price_bom,
+    has_failed_lookups,
+    format_pricing_data,
+)
+from .cache import (
+    SingleFlight,
+    TTLCache,
+    get_pricing_cache,
+    get_pricing_single_flight,
+    make_cache_key,
+)
+from .fanout import (
+    TokenBucket,
+    create_resilient_lookup,
+    get_max_concurrency,
+    get_pricing_rate_limiter,
+    resilient_lookup,
+)
+from .vectorized import (
+    CostColumns,
+    columns_from_quotes,
+    cost_totals,
+    line_costs,
+    scenario_costs,
+    scenario_totals,
+    scenario_unpriced_lines,
+)
+from .regions import (
+    comparison_items,
+    compare_regions,
+)
+from .catalog import (
+    PriceCatalog,
+    create_catalog_price_lookup,
+    estimate_quotes,
+    get_price_catalog,
+)
+
+__all__ = [
+    "DEFAULT_CURRENCY",
+    "PriceLookup",
+    "PriceLookupPrefetcher",
+    "PricingOptions",
+    "apply_discount",
+    "apply_region_override",
+    "region_display_name",
+    "normalize_cost_estimate",
+    "first_available_lookup",
+    "price_bom",
+    "has_failed_lookups",
+    "format_pricing_data",
+    "SingleFlight",
+    "TTLCache",
+    "get_pricing_cache",
+    "get_pricing_single_flight",
+    "make_cache_key",
+    "TokenBucket",
+    "create_resilient_lookup",
+    "get_max_concurrency",
+    "get_pricing_rate_limiter",
+    "resilient_lookup",
+    "CostColumns",
+    "columns_from_quotes",
+    "cost_totals",
+    "line_costs",
+    "scenario_costs",
+    "scenario_totals",
+    "scenario_unpriced_lines",
+    "comparison_items",
+    "compare_regions",
+    "PriceCatalog",
+    "create_catalog_price_lookup",
+    "estimate_quotes",
+    "get_price_catalog",
+]
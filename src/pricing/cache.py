@@ -0,0 +1,205 @@
+"""Pricing Cache - Thread-safe TTL + LRU cache and single-flight for pricing lookups."""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Default lifetime of a cached entry in seconds
+DEFAULT_TTL_SECONDS = 3600.0
+
+# Default maximum number of cached entries
+DEFAULT_MAX_ENTRIES = 2048
+
+# Environment variables configuring the process-wide pricing cache
+CACHE_TTL_ENV = "PRICING_CACHE_TTL_SECONDS"
+CACHE_MAX_ENTRIES_ENV = "PRICING_CACHE_MAX_ENTRIES"
+
+
+def _normalize_value(value: Any) -> Any:
+    """Normalize a tool argument so equivalent calls share a cache key."""
+    if isinstance(value, str):
+        return value.strip().casefold()
+    if isinstance(value, dict):
+        return {str(k): _normalize_value(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def make_cache_key(name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Build a cache key from a tool name and its arguments.
+
+    Strings are case-folded and stripped, None arguments are dropped and
+    argument order is ignored, so "Standard_D2s_v3"/"eastus" and
+    " standard_d2s_v3"/"EastUS" map to the same entry.
+    """
+    return name, json.dumps(_normalize_value(arguments), sort_keys=True, default=str)
+
+
+class TTLCache:
+    """Bounded cache with per-entry expiry and least-recently-used eviction."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, hit/miss/eviction counters and hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_pricing_cache() -> TTLCache:
+    """Return the process-wide pricing cache configured from the environment."""
+    return TTLCache(
+        max_entries=int(os.getenv(CACHE_MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES)),
+        ttl_seconds=float(os.getenv(CACHE_TTL_ENV, DEFAULT_TTL_SECONDS)),
+    )
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent async calls into one upstream call.
+
+    The first caller for a key starts the call; callers arriving while it is
+    in flight await the same result (or exception). Nothing is kept once the
+    call completes - pair with TTLCache for reuse after that. The call runs
+    as its own task, so one caller being cancelled doesn't fail the others;
+    when every caller has left (cancelled or timed out) the call is cancelled
+    and forgotten, so a retry starts a fresh upstream call instead of joining
+    a hung one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Task and number of callers awaiting it, per key
+        self._in_flight: Dict[Tuple[int, Hashable], List[Any]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run call(), or join the identical call already in flight.
+
+        Args:
+            key: Identifies equivalent calls, e.g. from make_cache_key
+            call: Zero-argument coroutine function making the upstream call
+
+        Returns:
+            The shared result; the shared exception is raised to every caller
+        """
+        loop = asyncio.get_running_loop()
+        # Futures belong to one event loop, so calls are only shared within it
+        flight_key = (id(loop), key)
+        with self._lock:
+            flight = self._in_flight.get(flight_key)
+            if flight is None:
+                task = loop.create_task(call())
+                flight = [task, 0]
+                self._in_flight[flight_key] = flight
+                task.add_done_callback(lambda done: self._finish(flight_key, done))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+            flight[1] += 1
+        task = flight[0]
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._leave(flight_key, flight)
+
+    def _leave(self, flight_key: Tuple[int, Hashable], flight: List[Any]) -> None:
+        """Drop one caller; the last one to leave cancels a call still running."""
+        with self._lock:
+            flight[1] -= 1
+            abandoned = flight[1] == 0 and not flight[0].done()
+            if abandoned and self._in_flight.get(flight_key) is flight:
+                del self._in_flight[flight_key]
+        if abandoned:
+            flight[0].cancel()
+
+    def _finish(self, flight_key: Tuple[int, Hashable], task: "asyncio.Future[Any]") -> None:
+        with self._lock:
+            flight = self._in_flight.get(flight_key)
+            if flight is not None and flight[0] is task:
+                del self._in_flight[flight_key]
+        # Mark the exception retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return upstream call and coalesced call counters."""
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_pricing_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group for pricing lookups."""
+    return SingleFlight()
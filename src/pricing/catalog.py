@@ -0,0 +1,410 @@
+"""Price Catalog - Local SQLite snapshot of the Azure Retail Prices API.
+
+Build a snapshot from a Retail Prices API export with:
+
+    python -m src.pricing.catalog ingest prices.json --db data/azure_prices.db
+
+Set AZURE_PRICES_SNAPSHOT_PATH to the database file to price BOMs from it.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .engine import DEFAULT_CURRENCY, USAGE_BASED_NOTE, PriceLookup, _lookup_key
+
+# Environment variable pointing at the snapshot database
+PRICE_SNAPSHOT_ENV = "AZURE_PRICES_SNAPSHOT_PATH"
+
+# Default snapshot location used by the ingest command
+DEFAULT_SNAPSHOT_PATH = "data/azure_prices.db"
+
+# Price types stored in the catalog
+CONSUMPTION = "Consumption"
+SAVINGS_PLAN = "SavingsPlan"
+
+# Leading quantity of a unit of measure ("100 Hours", "10K", "1 GB/Month")
+_UNIT_QUANTITY = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KM](?![A-Za-z]))?\s*(.*)$", re.IGNORECASE)
+
+# Multipliers for abbreviated unit quantities
+_UNIT_SUFFIXES = {"K": 1_000, "M": 1_000_000}
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    service_key TEXT NOT NULL,
+    sku_key TEXT NOT NULL,
+    arm_sku_key TEXT NOT NULL,
+    arm_region_name TEXT NOT NULL,
+    price_type TEXT NOT NULL,
+    currency_code TEXT NOT NULL,
+    service_name TEXT NOT NULL,
+    sku_name TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    meter_name TEXT NOT NULL,
+    unit_of_measure TEXT NOT NULL,
+    unit_price REAL NOT NULL,
+    term TEXT NOT NULL,
+    tier_minimum_units REAL NOT NULL,
+    is_primary_meter_region INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Run one by one with execute(): executescript() would commit an open ingest transaction
+INDEXES = (
+    """CREATE INDEX IF NOT EXISTS idx_prices_sku
+    ON prices (service_key, sku_key, arm_region_name, price_type, currency_code)""",
+    """CREATE INDEX IF NOT EXISTS idx_prices_arm_sku
+    ON prices (service_key, arm_sku_key, arm_region_name, price_type, currency_code)""",
+)
+
+# Prefer primary meters, base tiers and Linux/regular-priority meters when several match
+BEST_ROW_ORDER = """
+ORDER BY
+    is_primary_meter_region DESC,
+    tier_minimum_units ASC,
+    (product_name LIKE '%Windows%') ASC,
+    unit_price ASC
+"""
+
+
+def _key(value: Any) -> str:
+    """Normalize a lookup value for indexed, case-insensitive matching."""
+    return str(value or "").strip().lower()
+
+
+def _export_rows(item: Dict[str, Any]) -> Iterator[tuple]:
+    """Convert one Retail Prices API item (and its savings plans) to catalog rows."""
+    base = (
+        _key(item.get("serviceName")),
+        _key(item.get("skuName")),
+        _key(item.get("armSkuName")),
+        _key(item.get("armRegionName")),
+    )
+    details = (
+        item.get("serviceName") or "",
+        item.get("skuName") or "",
+        item.get("productName") or "",
+        item.get("meterName") or "",
+        item.get("unitOfMeasure") or "",
+    )
+    currency = item.get("currencyCode") or DEFAULT_CURRENCY
+    tier = float(item.get("tierMinimumUnits") or 0.0)
+    primary = 1 if item.get("isPrimaryMeterRegion", True) else 0
+
+    yield base + (
+        item.get("type") or CONSUMPTION, currency
+    ) + details + (
+        float(item.get("unitPrice", item.get("retailPrice", 0.0))),
+        item.get("reservationTerm") or "",
+        tier,
+        primary,
+    )
+
+    for plan in item.get("savingsPlan") or []:
+        yield base + (SAVINGS_PLAN, currency) + details + (
+            float(plan.get("unitPrice", plan.get("retailPrice", 0.0))),
+            plan.get("term") or "",
+            tier,
+            primary,
+        )
+
+
+def iter_export_items(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate price items from a Retail Prices API export.
+
+    Accepts a JSON array of items, a single API page ({"Items": [...]}),
+    or JSON Lines where each line is an item or an API page.
+    """
+    def expand(record: Any) -> Iterator[Dict[str, Any]]:
+        if isinstance(record, dict) and "Items" in record:
+            yield from record["Items"]
+        elif isinstance(record, list):
+            yield from record
+        elif isinstance(record, dict):
+            yield record
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield from expand(json.loads(line))
+        else:
+            yield from expand(json.load(f))
+
+
+def _parse_unit(unit_of_measure: str) -> Tuple[float, str]:
+    """Split a unit of measure such as "100 Hours" or "10K" into (quantity, base unit)."""
+    match = _UNIT_QUANTITY.match(unit_of_measure)
+    if not match:
+        return 1.0, unit_of_measure.strip()
+    number, suffix, base = match.groups()
+    quantity = float(number) * _UNIT_SUFFIXES.get((suffix or "").upper(), 1)
+    return (quantity or 1.0), base.strip().lstrip("/").strip()
+
+
+def _monthly_from_unit(unit_price: float, unit_of_measure: str, hours_per_month: float) -> Dict[str, Any]:
+    """
+    Convert a unit price to hourly and monthly costs based on its unit of measure.
+
+    The price is first divided by the unit's quantity ("100 Hours" is priced
+    per 100 hours). Time-based units are converted to hourly and monthly
+    costs; anything else (GB, transactions) is usage-based, so the monthly
+    cost is for one billed unit as listed and the line carries a note saying so.
+    """
+    quantity, base = _parse_unit(unit_of_measure)
+    per_unit = unit_price / quantity
+    unit = base.lower()
+    if unit.startswith("hour"):
+        return {"hourly_price": per_unit, "monthly_cost": per_unit * hours_per_month, "note": ""}
+    if unit.startswith("day"):
+        return {"hourly_price": per_unit / 24, "monthly_cost": per_unit / 24 * hours_per_month, "note": ""}
+    if unit.startswith("month"):
+        return {"hourly_price": per_unit / hours_per_month, "monthly_cost": per_unit, "note": ""}
+    return {
+        "hourly_price": 0.0,
+        "monthly_cost": unit_price,
+        "note": f"{USAGE_BASED_NOTE}: priced per {unit_of_measure}; monthly cost assumes {unit_of_measure} of usage",
+    }
+
+
+class PriceCatalog:
+    """Indexed local snapshot of Azure retail prices backed by SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._create_indexes()
+
+    def _create_indexes(self) -> None:
+        for statement in INDEXES:
+            self._conn.execute(statement)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def ingest(
+        self,
+        items: Iterable[Dict[str, Any]],
+        source: str = "",
+        snapshot_time: Optional[str] = None,
+    ) -> int:
+        """
+        Replace the catalog contents with a Retail Prices API export.
+
+        Args:
+            items: Retail Prices API items
+            source: Description of where the export came from
+            snapshot_time: ISO 8601 time the export was taken (defaults to now)
+
+        Returns:
+            Number of price rows loaded
+        """
+        snapshot_time = snapshot_time or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        rows = (row for item in items for row in _export_rows(item))
+
+        with self._lock, self._conn:
+            # One transaction, so a failed ingest leaves the previous snapshot and
+            # its metadata untouched (sqlite3 would not open one before the DDL)
+            self._conn.execute("BEGIN")
+            # Rebuilding indexes after the bulk insert is much faster than maintaining them
+            self._conn.execute("DROP INDEX IF EXISTS idx_prices_sku")
+            self._conn.execute("DROP INDEX IF EXISTS idx_prices_arm_sku")
+            self._conn.execute("DELETE FROM prices")
+            cursor = self._conn.executemany(
+                "INSERT INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            row_count = cursor.rowcount
+            self._create_indexes()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?)",
+                [
+                    ("snapshot_time", snapshot_time),
+                    ("source", source),
+                    ("row_count", str(row_count)),
+                ],
+            )
+
+        logger.info(f"Ingested {row_count} price rows into {self.path} (as of {snapshot_time})")
+        return row_count
+
+    def snapshot_info(self) -> Dict[str, str]:
+        """Return snapshot metadata: snapshot_time, source and row_count."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM metadata").fetchall()
+        return dict(rows)
+
+    @property
+    def snapshot_time(self) -> Optional[str]:
+        """ISO 8601 time the snapshot was taken, or None if nothing was ingested."""
+        return self.snapshot_info().get("snapshot_time")
+
+    def _best_row(self, item: Dict[str, Any], price_type: str, currency: str, term: str = "") -> Optional[tuple]:
+        """Find the best matching price row for a BOM item."""
+        service, sku, region = _key(item["serviceName"]), _key(item["sku"]), _key(item["armRegionName"])
+        query = f"""
+            SELECT unit_price, unit_of_measure FROM prices
+            WHERE service_key = ? AND (sku_key = ? OR arm_sku_key = ?)
+              AND arm_region_name = ? AND price_type = ? AND currency_code = ?
+              AND term LIKE ?
+              AND sku_key NOT LIKE '%spot%' AND sku_key NOT LIKE '%low priority%'
+            {BEST_ROW_ORDER}
+            LIMIT 1
+        """
+        with self._lock:
+            return self._conn.execute(
+                query, (service, sku, sku, region, price_type, currency, f"{term}%")
+            ).fetchone()
+
+    def estimate(self, item: Dict[str, Any], currency: str = DEFAULT_CURRENCY) -> Optional[Dict[str, Any]]:
+        """
+        Price one BOM item from the snapshot.
+
+        Returns:
+            Per-unit quote dict (same shape as normalize_cost_estimate), or None
+            if the snapshot has no price for the item
+        """
+        hours = item["hours_per_month"]
+        row = self._best_row(item, CONSUMPTION, currency)
+        if row is None:
+            return None
+
+        quote = _monthly_from_unit(row[0], row[1], hours)
+        savings_options = {}
+        for years in (1, 3):
+            plan = self._best_row(item, SAVINGS_PLAN, currency, term=str(years))
+            savings_options[f"{years}_year_savings_plan"] = (
+                _monthly_from_unit(plan[0], plan[1], hours)["monthly_cost"] if plan else 0.0
+            )
+        quote["savings_options"] = savings_options
+        return quote
+
+    def list_skus(self, service_name: str, region: str, currency: str = DEFAULT_CURRENCY, limit: int = 50) -> List[Dict[str, Any]]:
+        """List SKUs with on-demand prices for a service in a region."""
+        query = """
+            SELECT sku_name, MIN(unit_price), unit_of_measure FROM prices
+            WHERE service_key = ? AND arm_region_name = ? AND price_type = ? AND currency_code = ?
+              AND sku_key NOT LIKE '%spot%' AND sku_key NOT LIKE '%low priority%'
+            GROUP BY sku_name, unit_of_measure
+            ORDER BY MIN(unit_price)
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                query, (_key(service_name), _key(region), CONSUMPTION, currency, limit)
+            ).fetchall()
+        return [
+            {"sku": sku, "unit_price": price, "unit_of_measure": unit}
+            for sku, price, unit in rows
+        ]
+
+
+def create_catalog_price_lookup(
+    catalog: PriceCatalog,
+    known_quotes: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+) -> PriceLookup:
+    """
+    Create a price lookup that resolves BOM items from a local snapshot.
+
+    Snapshot queries run in a worker thread so they never block the event loop.
+
+    Args:
+        catalog: Local price snapshot
+        known_quotes: Quotes already estimated from the snapshot, keyed by
+            item and currency; these are returned without querying it again
+    """
+    known_quotes = known_quotes or {}
+
+    async def lookup(item: Dict[str, Any], currency: str) -> Optional[Dict[str, Any]]:
+        key = _lookup_key(item, currency)
+        if key in known_quotes:
+            return known_quotes[key]
+        return await asyncio.to_thread(catalog.estimate, item, currency)
+
+    return lookup
+
+
+def estimate_quotes(
+    catalog: PriceCatalog,
+    bom_items: List[Dict[str, Any]],
+    currency: str = DEFAULT_CURRENCY,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Price BOM items from the snapshot, for create_catalog_price_lookup(known_quotes=...).
+
+    Returns:
+        Quote (or None for a miss) per item, keyed by item and currency
+    """
+    return {_lookup_key(item, currency): catalog.estimate(item, currency) for item in bom_items}
+
+
+@lru_cache(maxsize=None)
+def _open_catalog(path: str) -> PriceCatalog:
+    return PriceCatalog(path)
+
+
+def get_price_catalog() -> Optional[PriceCatalog]:
+    """Return the process-wide snapshot named by AZURE_PRICES_SNAPSHOT_PATH, if it exists."""
+    path = os.getenv(PRICE_SNAPSHOT_ENV)
+    if not path or not os.path.exists(path):
+        return None
+    return _open_catalog(os.path.abspath(path))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point for building and inspecting price snapshots."""
+    parser = argparse.ArgumentParser(description="Manage the local Azure retail price snapshot.")
+    parser.add_argument(
+        "--db",
+        default=os.getenv(PRICE_SNAPSHOT_ENV, DEFAULT_SNAPSHOT_PATH),
+        help="Snapshot database path (default: $AZURE_PRICES_SNAPSHOT_PATH or data/azure_prices.db)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Bulk-load a Retail Prices API export")
+    ingest_parser.add_argument("export", help="Export file (.json or .jsonl)")
+    ingest_parser.add_argument("--as-of", help="ISO 8601 time the export was taken (default: now)")
+
+    subparsers.add_parser("info", help="Show snapshot freshness and size")
+
+    args = parser.parse_args(argv)
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    catalog = PriceCatalog(args.db)
+
+    try:
+        if args.command == "ingest":
+            row_count = catalog.ingest(
+                iter_export_items(args.export),
+                source=os.path.basename(args.export),
+                snapshot_time=args.as_of,
+            )
+            print(f"Loaded {row_count} price rows into {args.db}")
+        else:
+            for key, value in sorted(catalog.snapshot_info().items()):
+                print(f"{key}: {value}")
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
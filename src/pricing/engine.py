@@ -0,0 +1,499 @@
+"""Pricing Engine - Prices a validated BOM in code instead of via LLM tool calls."""
+
+import asyncio
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .vectorized import columns_from_quotes, cost_totals, line_costs
+
+# Default currency for pricing output
+DEFAULT_CURRENCY = "USD"
+
+# Maximum number of price lookups in flight at once
+DEFAULT_MAX_CONCURRENCY = 10
+
+# Maximum number of regions in a region comparison
+MAX_COMPARE_REGIONS = 20
+
+# Display names of Azure public cloud regions, by ARM region code
+REGION_DISPLAY_NAMES = {
+    "eastus": "East US",
+    "eastus2": "East US 2",
+    "centralus": "Central US",
+    "northcentralus": "North Central US",
+    "southcentralus": "South Central US",
+    "westcentralus": "West Central US",
+    "westus": "West US",
+    "westus2": "West US 2",
+    "westus3": "West US 3",
+    "canadacentral": "Canada Central",
+    "canadaeast": "Canada East",
+    "mexicocentral": "Mexico Central",
+    "brazilsouth": "Brazil South",
+    "brazilsoutheast": "Brazil Southeast",
+    "chilecentral": "Chile Central",
+    "northeurope": "North Europe",
+    "westeurope": "West Europe",
+    "uksouth": "UK South",
+    "ukwest": "UK West",
+    "francecentral": "France Central",
+    "francesouth": "France South",
+    "germanywestcentral": "Germany West Central",
+    "germanynorth": "Germany North",
+    "switzerlandnorth": "Switzerland North",
+    "switzerlandwest": "Switzerland West",
+    "norwayeast": "Norway East",
+    "norwaywest": "Norway West",
+    "swedencentral": "Sweden Central",
+    "polandcentral": "Poland Central",
+    "italynorth": "Italy North",
+    "spaincentral": "Spain Central",
+    "israelcentral": "Israel Central",
+    "qatarcentral": "Qatar Central",
+    "uaenorth": "UAE North",
+    "uaecentral": "UAE Central",
+    "southafricanorth": "South Africa North",
+    "southafricawest": "South Africa West",
+    "eastasia": "East Asia",
+    "southeastasia": "Southeast Asia",
+    "japaneast": "Japan East",
+    "japanwest": "Japan West",
+    "koreacentral": "Korea Central",
+    "koreasouth": "Korea South",
+    "centralindia": "Central India",
+    "southindia": "South India",
+    "westindia": "West India",
+    "indonesiacentral": "Indonesia Central",
+    "malaysiawest": "Malaysia West",
+    "australiaeast": "Australia East",
+    "australiasoutheast": "Australia Southeast",
+    "australiacentral": "Australia Central",
+    "australiacentral2": "Australia Central 2",
+    "newzealandnorth": "New Zealand North",
+}
+
+# Note prefix for items whose lookup raised (as opposed to having no price)
+LOOKUP_FAILED_NOTE = "Pricing lookup failed"
+
+# Note prefix for items billed per unit of usage (GB, transactions) rather than time
+USAGE_BASED_NOTE = "Usage-based"
+
+logger = logging.getLogger(__name__)
+
+# A price lookup resolves one BOM item to a per-unit quote (or None if no price exists).
+# Quotes are dicts with "hourly_price", "monthly_cost" and "savings_options" keys.
+PriceLookup = Callable[[Dict[str, Any], str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class PricingOptions:
+    """
+    Inputs that change the price of a BOM but not the BOM itself.
+
+    Changing only these re-prices a memoized BOM without rerunning the BOM Agent.
+
+    Attributes:
+        currency: ISO currency code for all prices
+        region: ARM region code overriding every BOM item's region, e.g. "westeurope"
+        discount_percent: Negotiated discount off retail prices, 0 to 100 (exclusive)
+        compare_regions: ARM region codes to also price the BOM in, for a
+            cheapest-region comparison (see src.pricing.regions)
+    """
+
+    currency: str = DEFAULT_CURRENCY
+    region: Optional[str] = None
+    discount_percent: float = 0.0
+    compare_regions: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        currency = str(self.currency or DEFAULT_CURRENCY).strip().upper()
+        if not re.fullmatch(r"[A-Z]{3}", currency):
+            raise ValueError(f"Invalid currency code: {self.currency}")
+        if self.region and not isinstance(self.region, str):
+            raise ValueError("region must be an ARM region code")
+        region = self.region.strip().lower().replace(" ", "") if self.region else None
+        try:
+            discount = float(self.discount_percent or 0.0)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid discount_percent: {self.discount_percent!r}")
+        if not 0.0 <= discount < 100.0:
+            raise ValueError(f"discount_percent must be between 0 and 100, got {discount}")
+        # Checked as a sequence of strings, so a JSON number or object is a ValueError, not a TypeError
+        if not isinstance(self.compare_regions or (), (list, tuple)) or not all(
+            isinstance(name, str) for name in self.compare_regions or ()
+        ):
+            raise ValueError("compare_regions must be a list of ARM region codes")
+        compare_regions = tuple(dict.fromkeys(
+            name.strip().lower().replace(" ", "") for name in self.compare_regions or () if name.strip()
+        ))
+        if len(compare_regions) > MAX_COMPARE_REGIONS:
+            raise ValueError(f"At most {MAX_COMPARE_REGIONS} regions can be compared, got {len(compare_regions)}")
+        object.__setattr__(self, "currency", currency)
+        object.__setattr__(self, "region", region or None)
+        object.__setattr__(self, "discount_percent", discount)
+        object.__setattr__(self, "compare_regions", compare_regions)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Convert a numeric-looking value to float, returning None if not possible."""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _savings_plan_monthly(estimate: Dict[str, Any], years: int, hours_per_month: float) -> float:
+    """Extract the monthly savings plan cost for a 1 or 3 year term from a cost estimate."""
+    savings_options = estimate.get("savings_options")
+    if isinstance(savings_options, dict):
+        value = _to_float(savings_options.get(f"{years}_year_savings_plan"))
+        if value is not None:
+            return value
+
+    for plan in estimate.get("savings_plans") or []:
+        if not isinstance(plan, dict):
+            continue
+        term = str(plan.get("term", "")).lower()
+        if not term.startswith(str(years)):
+            continue
+        monthly = _to_float(plan.get("monthly_cost"))
+        if monthly is not None:
+            return monthly
+        hourly = _to_float(plan.get("hourly_rate"))
+        if hourly is not None:
+            return hourly * hours_per_month
+
+    return 0.0
+
+
+def normalize_cost_estimate(estimate: Dict[str, Any], hours_per_month: float) -> Optional[Dict[str, Any]]:
+    """
+    Reduce an azure_cost_estimate payload to a per-unit quote.
+
+    Args:
+        estimate: Parsed azure_cost_estimate response
+        hours_per_month: Hours the resource runs per month
+
+    Returns:
+        Quote dict with hourly_price, monthly_cost and savings_options,
+        or None if the estimate contains no usable price
+    """
+    if not isinstance(estimate, dict) or estimate.get("error"):
+        return None
+
+    on_demand = estimate.get("on_demand_pricing")
+    if not isinstance(on_demand, dict):
+        on_demand = estimate
+
+    hourly = _to_float(on_demand.get("hourly_rate"))
+    if hourly is None:
+        hourly = _to_float(on_demand.get("hourly_price"))
+    monthly = _to_float(on_demand.get("monthly_cost"))
+
+    if monthly is None and hourly is None:
+        return None
+    if monthly is None:
+        monthly = hourly * hours_per_month
+    if hourly is None:
+        hourly = monthly / hours_per_month if hours_per_month else 0.0
+
+    return {
+        "hourly_price": hourly,
+        "monthly_cost": monthly,
+        "savings_options": {
+            "1_year_savings_plan": _savings_plan_monthly(estimate, 1, hours_per_month),
+            "3_year_savings_plan": _savings_plan_monthly(estimate, 3, hours_per_month),
+        },
+    }
+
+
+def _unpriced_item(item: Dict[str, Any], note: str) -> Dict[str, Any]:
+    """Build a $0.00 pricing line for an item that could not be priced."""
+    return {
+        "service": item["serviceName"],
+        "sku": item["sku"],
+        "quantity": item["quantity"],
+        "hourly_price": 0.0,
+        "monthly_cost": 0.0,
+        "note": note,
+        "savings_options": {
+            "1_year_savings_plan": 0.0,
+            "3_year_savings_plan": 0.0,
+        },
+    }
+
+
+def _priced_item(item: Dict[str, Any], quote: Dict[str, Any], costs: Dict[str, float]) -> Dict[str, Any]:
+    """Build a pricing line from a per-unit quote and the line's costs from line_costs."""
+    return {
+        "service": item["serviceName"],
+        "sku": item["sku"],
+        "quantity": item["quantity"],
+        "hourly_price": round(quote["hourly_price"], 6),
+        "monthly_cost": costs["monthly"],
+        "note": quote.get("note", ""),
+        "savings_options": {
+            "1_year_savings_plan": costs["savings_1y_monthly"],
+            "3_year_savings_plan": costs["savings_3y_monthly"],
+        },
+    }
+
+
+def first_available_lookup(lookups: List[PriceLookup]) -> PriceLookup:
+    """
+    Combine lookups so the first one returning a quote wins.
+
+    Useful for resolving from a local snapshot before falling back to the
+    Azure Pricing MCP server. If every lookup misses and one of them raised,
+    the last error is re-raised so the item is reported as a failed lookup.
+    """
+    async def lookup(item: Dict[str, Any], currency: str) -> Optional[Dict[str, Any]]:
+        error: Optional[Exception] = None
+        for candidate in lookups:
+            try:
+                quote = await candidate(item, currency)
+            except Exception as e:
+                error = e
+                continue
+            if quote is not None:
+                return quote
+        if error is not None:
+            raise error
+        return None
+
+    return lookup
+
+
+def _lookup_key(item: Dict[str, Any], currency: str) -> str:
+    """Identify a lookup by the item's content, since parsed items are new dicts."""
+    return json.dumps([item, currency], sort_keys=True, default=str)
+
+
+class PriceLookupPrefetcher:
+    """
+    Start price lookups for BOM items before the whole BOM is known.
+
+    Items are prefetched as the BOM Agent streams them. Once the full BOM
+    is parsed, wrap() gives price_bom a lookup that awaits the prefetched
+    quotes and only falls back to a fresh lookup for the rest.
+    """
+
+    def __init__(
+        self,
+        lookup: Optional[PriceLookup],
+        currency: str = DEFAULT_CURRENCY,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """
+        Args:
+            lookup: Lookup usable before the BOM is complete (e.g. the local
+                snapshot or an already connected MCP tool); None disables prefetching
+            currency: Currency code for all prices
+            max_concurrency: Maximum number of prefetches in flight at once
+        """
+        self._lookup = lookup
+        self._currency = currency
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def prefetched(self) -> int:
+        """Number of distinct items prefetched."""
+        return len(self._tasks)
+
+    def prefetch(self, item: Dict[str, Any]) -> None:
+        """Start looking up an item's price in the background; repeats are ignored."""
+        if self._lookup is None:
+            return
+        key = _lookup_key(item, self._currency)
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._fetch(item))
+
+    async def _fetch(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with self._semaphore:
+            return await self._lookup(item, self._currency)
+
+    def wrap(self, fallback: PriceLookup) -> PriceLookup:
+        """
+        Combine prefetched quotes with a fallback lookup.
+
+        A prefetched quote is used when it exists. Items never prefetched,
+        or whose prefetch missed or raised, are looked up with fallback.
+        """
+        async def lookup(item: Dict[str, Any], currency: str) -> Optional[Dict[str, Any]]:
+            task = self._tasks.get(_lookup_key(item, currency))
+            if task is not None:
+                try:
+                    quote = await task
+                except Exception as e:
+                    logger.info(f"Prefetched lookup failed for {item['sku']}, retrying: {e}")
+                    quote = None
+                if quote is not None:
+                    return quote
+            return await fallback(item, currency)
+
+        return lookup
+
+    async def aclose(self) -> None:
+        """Cancel prefetches that are still running (e.g. when the BOM failed)."""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+
+async def price_bom(
+    bom_items: List[Dict[str, Any]],
+    lookup: PriceLookup,
+    currency: str = DEFAULT_CURRENCY,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Price every BOM item concurrently and compute line costs and totals in code.
+
+    Quotes are costed in one vectorized pass (see src.pricing.vectorized).
+
+    Lookup failures never abort the run: the item is priced at $0.00 with a
+    note explaining the issue, matching the Pricing Agent's error handling.
+
+    Args:
+        bom_items: Validated BOM items from parse_structured_bom
+        lookup: Async callable resolving an item to a per-unit quote
+        currency: Currency code for all prices
+        max_concurrency: Maximum number of lookups in flight at once
+
+    Returns:
+        Pricing data dict with items, total_monthly and currency
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def quote_item(item: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        async with semaphore:
+            try:
+                quote = await lookup(item, currency)
+            except Exception as e:
+                logger.warning(f"Pricing lookup failed for {item['serviceName']} {item['sku']}: {e}")
+                return None, f"{LOOKUP_FAILED_NOTE}: {e}"
+
+        if quote is None:
+            return None, f"No pricing data found for {item['sku']} in {item['armRegionName']}"
+        return quote, ""
+
+    results = await asyncio.gather(*(quote_item(item) for item in bom_items))
+    quotes = [quote for quote, _ in results]
+
+    # Cost every line in one pass, rounded to cents so the total is the sum of the lines shown
+    costs = {
+        name: np.round(values, 2)
+        for name, values in line_costs(columns_from_quotes(bom_items, quotes)).items()
+    }
+    totals = cost_totals(costs)
+
+    items = []
+    for index, (item, (quote, note)) in enumerate(zip(bom_items, results)):
+        if quote is None:
+            items.append(_unpriced_item(item, note))
+        else:
+            items.append(_priced_item(item, quote, {name: float(values[index]) for name, values in costs.items()}))
+
+    logger.info(
+        f"Priced {len(items)} BOM items ({totals['unpriced_lines']} unpriced): "
+        f"{totals['monthly']:.2f} {currency}/month"
+    )
+    return {
+        "items": items,
+        "total_monthly": totals["monthly"],
+        "currency": currency,
+    }
+
+
+def has_failed_lookups(pricing: Dict[str, Any]) -> bool:
+    """Whether any item in pricing data was priced at $0.00 because its lookup raised."""
+    return any(
+        item.get("note", "").startswith(LOOKUP_FAILED_NOTE)
+        for item in pricing.get("items", [])
+    )
+
+
+def region_display_name(arm_region: str, bom_items: Sequence[Dict[str, Any]] = ()) -> str:
+    """
+    Return the human-readable name of an ARM region, e.g. "westeurope" -> "West Europe".
+
+    Args:
+        arm_region: ARM region code
+        bom_items: Items whose region names are used for codes not in REGION_DISPLAY_NAMES
+
+    Returns:
+        The display name, or the code itself when it is unknown
+    """
+    if arm_region in REGION_DISPLAY_NAMES:
+        return REGION_DISPLAY_NAMES[arm_region]
+    for item in bom_items:
+        if item.get("armRegionName") == arm_region and item.get("region"):
+            return item["region"]
+    return arm_region
+
+
+def apply_region_override(bom_items: List[Dict[str, Any]], region: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Return copies of BOM items moved to another ARM region.
+
+    armRegionName, used for price lookups, is set to the code; region, shown
+    in proposals, is set to the region's display name.
+
+    Args:
+        bom_items: Validated BOM items
+        region: ARM region code, or None to leave the items unchanged
+
+    Returns:
+        New item dicts; the input list is not modified
+    """
+    if not region:
+        return bom_items
+    display_name = region_display_name(region, bom_items)
+    return [dict(item, armRegionName=region, region=display_name) for item in bom_items]
+
+
+def apply_discount(pricing: Dict[str, Any], discount_percent: float) -> Dict[str, Any]:
+    """
+    Apply a percentage discount to every price and total in pricing data.
+
+    Args:
+        pricing: Pricing data from price_bom
+        discount_percent: Discount off retail prices; 0 returns pricing unchanged
+
+    Returns:
+        New pricing data with discounted prices and a discount_percent field
+    """
+    if not discount_percent:
+        return pricing
+
+    factor = 1.0 - discount_percent / 100.0
+    items = []
+    for item in pricing["items"]:
+        savings = item.get("savings_options", {})
+        items.append(dict(
+            item,
+            hourly_price=round(item["hourly_price"] * factor, 6),
+            monthly_cost=round(item["monthly_cost"] * factor, 2),
+            savings_options={name: round(cost * factor, 2) for name, cost in savings.items()},
+        ))
+
+    return dict(
+        pricing,
+        items=items,
+        total_monthly=round(sum(item["monthly_cost"] for item in items), 2),
+        discount_percent=discount_percent,
+    )
+
+
+def format_pricing_data(pricing: Dict[str, Any]) -> str:
+    """Format pricing data as the "=== PRICING DATA ===" block shown in the pricing stage output."""
+    return "=== PRICING DATA ===\n" + json.dumps(pricing, indent=2)
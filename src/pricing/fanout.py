@@ -0,0 +1,139 @@
+"""Pricing Fan-out - Rate limiting, timeouts and retries for concurrent price lookups."""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from .engine import DEFAULT_MAX_CONCURRENCY, PriceLookup
+
+# Environment variables configuring lookups against the Azure Pricing MCP server
+MAX_CONCURRENCY_ENV = "PRICING_MAX_CONCURRENCY"
+RATE_LIMIT_ENV = "PRICING_RATE_LIMIT_PER_SECOND"
+RATE_LIMIT_BURST_ENV = "PRICING_RATE_LIMIT_BURST"
+LOOKUP_TIMEOUT_ENV = "PRICING_LOOKUP_TIMEOUT_SECONDS"
+LOOKUP_RETRIES_ENV = "PRICING_LOOKUP_RETRIES"
+
+# Defaults if not set in environment
+DEFAULT_RATE_LIMIT_PER_SECOND = 10.0
+DEFAULT_RATE_LIMIT_BURST = 10
+DEFAULT_LOOKUP_TIMEOUT_SECONDS = 15.0
+DEFAULT_LOOKUP_RETRIES = 2
+
+# First retry delay; doubled per attempt, with full jitter
+DEFAULT_BACKOFF_SECONDS = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` calls per second with bursts of up to `burst`.
+
+    Tokens are reserved under a thread lock and waited for with asyncio.sleep,
+    so one bucket can be shared by every event loop in the process.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> None:
+        """Wait until a call is allowed."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def resilient_lookup(
+    lookup: PriceLookup,
+    rate_limiter: Optional[TokenBucket] = None,
+    timeout: Optional[float] = DEFAULT_LOOKUP_TIMEOUT_SECONDS,
+    retries: int = DEFAULT_LOOKUP_RETRIES,
+    backoff: float = DEFAULT_BACKOFF_SECONDS,
+) -> PriceLookup:
+    """
+    Wrap a lookup with rate limiting, a per-call timeout and retries.
+
+    Every attempt takes a token from the rate limiter. Failed or timed out
+    attempts are retried after an exponential backoff with full jitter, so
+    concurrent lookups failing together don't retry in lockstep. A lookup
+    returning None (no price exists) is not retried.
+
+    Args:
+        lookup: Async lookup to wrap
+        rate_limiter: Token bucket shared by every call to the same backend
+        timeout: Seconds allowed per attempt, or None for no limit
+        retries: Additional attempts after the first failure
+        backoff: Delay before the first retry, doubled for each later one
+
+    Returns:
+        Async lookup usable with src.pricing.price_bom; raises the last
+        error once every attempt has failed
+    """
+    async def wrapped(item: Dict[str, Any], currency: str) -> Optional[Dict[str, Any]]:
+        for attempt in range(retries + 1):
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            try:
+                return await asyncio.wait_for(lookup(item, currency), timeout)
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                delay = random.uniform(0, backoff * 2 ** attempt)
+                logger.info(
+                    f"Price lookup for {item.get('sku')} failed "
+                    f"(attempt {attempt + 1}/{retries + 1}), retrying in {delay:.2f}s: {e!r}"
+                )
+                await asyncio.sleep(delay)
+
+    return wrapped
+
+
+def get_max_concurrency() -> int:
+    """Return the maximum number of price lookups in flight per BOM."""
+    return max(1, int(os.getenv(MAX_CONCURRENCY_ENV, DEFAULT_MAX_CONCURRENCY)))
+
+
+@lru_cache(maxsize=1)
+def get_pricing_rate_limiter() -> TokenBucket:
+    """Return the process-wide Azure Pricing MCP rate limiter configured from the environment."""
+    return TokenBucket(
+        rate=float(os.getenv(RATE_LIMIT_ENV, DEFAULT_RATE_LIMIT_PER_SECOND)),
+        burst=int(os.getenv(RATE_LIMIT_BURST_ENV, DEFAULT_RATE_LIMIT_BURST)),
+    )
+
+
+def create_resilient_lookup(lookup: PriceLookup) -> PriceLookup:
+    """Wrap a lookup with the rate limit, timeout and retries configured from the environment."""
+    timeout = float(os.getenv(LOOKUP_TIMEOUT_ENV, DEFAULT_LOOKUP_TIMEOUT_SECONDS))
+    return resilient_lookup(
+        lookup,
+        rate_limiter=get_pricing_rate_limiter(),
+        timeout=timeout if timeout > 0 else None,
+        retries=max(0, int(os.getenv(LOOKUP_RETRIES_ENV, DEFAULT_LOOKUP_RETRIES))),
+    )
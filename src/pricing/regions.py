@@ -0,0 +1,110 @@
+"""Region Comparison - Price one BOM across many Azure regions in a single pass."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .engine import DEFAULT_CURRENCY, DEFAULT_MAX_CONCURRENCY, PriceLookup, apply_region_override
+from .vectorized import scenario_costs, scenario_totals, scenario_unpriced_lines
+
+logger = logging.getLogger(__name__)
+
+
+async def compare_regions(
+    bom_items: List[Dict[str, Any]],
+    regions: Sequence[str],
+    lookup: PriceLookup,
+    currency: str = DEFAULT_CURRENCY,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Re-price every BOM line in every region and rank the regions.
+
+    All region x line lookups run concurrently. A line that has no price
+    or whose lookup fails in a region leaves that region's total incomplete;
+    incomplete regions are ranked after every fully priced one, those missing
+    the fewest lines first.
+
+    Args:
+        bom_items: Validated BOM items
+        regions: ARM region codes, e.g. ["eastus", "westeurope"]
+        lookup: Async callable resolving an item to a per-unit quote
+        currency: Currency code for all prices
+        max_concurrency: Maximum number of lookups in flight at once
+
+    Returns:
+        Dict with currency, regions, lines, matrix (monthly cost per region
+        and line, None where unpriced), ranking (cheapest first) and
+        cheapest_region
+    """
+    regions = list(dict.fromkeys(regions))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def hourly_price(item: Dict[str, Any]) -> float:
+        async with semaphore:
+            try:
+                quote = await lookup(item, currency)
+            except Exception as e:
+                logger.warning(f"Region lookup failed for {item['sku']} in {item['armRegionName']}: {e}")
+                return float("nan")
+        if quote is None:
+            return float("nan")
+        # The quote's monthly cost spread over the line's hours, so lines priced
+        # per month (e.g. storage, with no hourly rate) cost the same as in price_bom
+        return quote["monthly_cost"] / item["hours_per_month"]
+
+    prices = await asyncio.gather(*(
+        hourly_price(item)
+        for region in regions
+        for item in apply_region_override(bom_items, region)
+    ))
+
+    # One scenario per region: (regions, lines) unit hourly prices, NaN where unpriced
+    hourly = np.asarray(prices, dtype=float).reshape(len(regions), len(bom_items))
+    quantity = [item["quantity"] for item in bom_items]
+    hours = [[item["hours_per_month"] for item in bom_items]]
+    matrix = scenario_costs(hourly, quantity, hours)[:, :, 0]
+    totals = scenario_totals(hourly, quantity, hours, skip_unpriced=True)[:, 0]
+    unpriced = scenario_unpriced_lines(hourly)
+
+    # Fewest unpriced lines first (fully priced regions lead), then cheapest
+    order = np.lexsort((totals, unpriced))
+    complete = [index for index in order if unpriced[index] == 0]
+    cheapest_total = float(totals[complete[0]]) if complete else None
+
+    ranking = []
+    for rank, index in enumerate(order, start=1):
+        total = round(float(totals[index]), 2)
+        ranking.append({
+            "rank": rank,
+            "region": regions[index],
+            "total_monthly": total,
+            "unpriced_lines": int(unpriced[index]),
+            "difference_from_cheapest": (
+                round(total - cheapest_total, 2)
+                if cheapest_total is not None and unpriced[index] == 0 else None
+            ),
+        })
+
+    return {
+        "currency": currency,
+        "regions": regions,
+        "lines": [
+            {"service": item["serviceName"], "sku": item["sku"], "quantity": item["quantity"]}
+            for item in bom_items
+        ],
+        "matrix": [
+            [None if np.isnan(cost) else round(float(cost), 2) for cost in row]
+            for row in matrix
+        ],
+        "ranking": ranking,
+        "cheapest_region": regions[complete[0]] if complete else None,
+    }
+
+
+def comparison_items(bom_items: List[Dict[str, Any]], regions: Sequence[str]) -> List[Dict[str, Any]]:
+    """Return the BOM items moved to every compared region, e.g. to decide which price sources to open."""
+    return [item for region in regions for item in apply_region_override(bom_items, region)]
+
@@ -0,0 +1,193 @@
+"""Vectorized Costs - Columnar cost computation for large BOMs and scenario matrices.
+
+A BOM is held as parallel numpy arrays (one entry per line), so monthly,
+annual and savings-plan costs for every line are computed in one pass.
+Unpriced lines are NaN: they are skipped by totals and counted separately.
+price_bom costs its lines and totals this way.
+
+Scenario matrices price the same lines across regions (or SKU alternatives)
+and hour profiles at once:
+
+    hourly_prices   (scenarios, lines)   unit hourly price, NaN if unavailable
+    quantity        (lines,)
+    hour_profiles   (profiles,) or (profiles, lines)
+
+    scenario_costs  -> (scenarios, lines, profiles) monthly cost per line
+    scenario_totals -> (scenarios, profiles) monthly BOM total, NaN if any
+                       line is unpriced in that scenario
+
+compare_regions ranks regions this way, one scenario per region.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Months used to turn monthly costs into annual ones
+MONTHS_PER_YEAR = 12
+
+
+@dataclass
+class CostColumns:
+    """
+    Per-line BOM inputs as columnar arrays.
+
+    Attributes:
+        quantity: Instances per line
+        hours_per_month: Hours each line runs per month
+        hourly_price: Per-unit hourly price
+        monthly_price: Per-unit monthly price at hours_per_month
+        savings_1y_price: Per-unit monthly price with a 1 year savings plan
+        savings_3y_price: Per-unit monthly price with a 3 year savings plan
+    """
+
+    quantity: np.ndarray
+    hours_per_month: np.ndarray
+    hourly_price: np.ndarray
+    monthly_price: np.ndarray
+    savings_1y_price: np.ndarray
+    savings_3y_price: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+
+def columns_from_quotes(
+    bom_items: Sequence[Dict[str, Any]],
+    quotes: Sequence[Optional[Dict[str, Any]]],
+) -> CostColumns:
+    """
+    Build cost columns from BOM items and their per-unit quotes.
+
+    Args:
+        bom_items: Validated BOM items
+        quotes: Per-unit quote for each item (as returned by a PriceLookup),
+            or None for items without a price
+
+    Returns:
+        CostColumns with NaN prices for unpriced items
+
+    Raises:
+        ValueError: If bom_items and quotes differ in length
+    """
+    if len(bom_items) != len(quotes):
+        raise ValueError(f"Got {len(quotes)} quotes for {len(bom_items)} BOM items")
+
+    nan = float("nan")
+
+    def column(values: List[float]) -> np.ndarray:
+        return np.asarray(values, dtype=float)
+
+    def savings(quote: Optional[Dict[str, Any]], years: int) -> float:
+        if quote is None:
+            return nan
+        return quote.get("savings_options", {}).get(f"{years}_year_savings_plan", 0.0)
+
+    return CostColumns(
+        quantity=column([item["quantity"] for item in bom_items]),
+        hours_per_month=column([item["hours_per_month"] for item in bom_items]),
+        hourly_price=column([quote["hourly_price"] if quote else nan for quote in quotes]),
+        monthly_price=column([quote["monthly_cost"] if quote else nan for quote in quotes]),
+        savings_1y_price=column([savings(quote, 1) for quote in quotes]),
+        savings_3y_price=column([savings(quote, 3) for quote in quotes]),
+    )
+
+
+def line_costs(columns: CostColumns) -> Dict[str, np.ndarray]:
+    """
+    Compute every line's costs in one vectorized pass.
+
+    Returns:
+        Arrays for monthly, annual, savings_1y_monthly, savings_1y_annual,
+        savings_3y_monthly and savings_3y_annual (NaN for unpriced lines)
+    """
+    monthly = columns.monthly_price * columns.quantity
+    savings_1y = columns.savings_1y_price * columns.quantity
+    savings_3y = columns.savings_3y_price * columns.quantity
+    return {
+        "monthly": monthly,
+        "annual": monthly * MONTHS_PER_YEAR,
+        "savings_1y_monthly": savings_1y,
+        "savings_1y_annual": savings_1y * MONTHS_PER_YEAR,
+        "savings_3y_monthly": savings_3y,
+        "savings_3y_annual": savings_3y * MONTHS_PER_YEAR,
+    }
+
+
+def cost_totals(costs: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """
+    Sum line costs into BOM totals, skipping unpriced lines.
+
+    Returns:
+        Rounded total for each cost column, plus unpriced_lines
+    """
+    totals = {name: round(float(np.nansum(values)), 2) for name, values in costs.items()}
+    totals["unpriced_lines"] = int(np.count_nonzero(np.isnan(costs["monthly"])))
+    return totals
+
+
+def scenario_costs(
+    hourly_prices: Any,
+    quantity: Any,
+    hour_profiles: Any,
+) -> np.ndarray:
+    """
+    Compute monthly cost per line for every scenario and hour profile at once.
+
+    Args:
+        hourly_prices: (scenarios, lines) unit hourly prices, e.g. one row
+            per region or SKU alternative; NaN where a line has no price
+        quantity: (lines,) instances per line
+        hour_profiles: (profiles,) hours per month applied to every line, or
+            (profiles, lines) hours per line, e.g. [730, 176] for always-on
+            versus business hours
+
+    Returns:
+        (scenarios, lines, profiles) array of monthly costs
+
+    Raises:
+        ValueError: If the shapes don't line up
+    """
+    hourly = np.atleast_2d(np.asarray(hourly_prices, dtype=float))
+    quantity = np.asarray(quantity, dtype=float)
+    hours = np.asarray(hour_profiles, dtype=float)
+
+    lines = hourly.shape[1]
+    if quantity.shape != (lines,):
+        raise ValueError(f"quantity has shape {quantity.shape}, expected ({lines},)")
+    if hours.ndim == 1:
+        hours = np.broadcast_to(hours[:, None], (len(hours), lines))
+    if hours.ndim != 2 or hours.shape[1] != lines:
+        raise ValueError(f"hour_profiles has shape {hours.shape}, expected (profiles,) or (profiles, {lines})")
+
+    return hourly[:, :, None] * (quantity[:, None] * hours.T)[None, :, :]
+
+
+def scenario_totals(
+    hourly_prices: Any,
+    quantity: Any,
+    hour_profiles: Any,
+    skip_unpriced: bool = False,
+) -> np.ndarray:
+    """
+    Compute the monthly BOM total for every scenario and hour profile.
+
+    By default a scenario where any line is unpriced totals to NaN rather
+    than an understated cost, so it is never picked as the cheapest.
+
+    Args:
+        skip_unpriced: Total only the priced lines instead, e.g. to show a
+            partial total next to scenario_unpriced_lines
+
+    Returns:
+        (scenarios, profiles) array of monthly totals
+    """
+    costs = scenario_costs(hourly_prices, quantity, hour_profiles)
+    return np.nansum(costs, axis=1) if skip_unpriced else costs.sum(axis=1)
+
+
+def scenario_unpriced_lines(hourly_prices: Any) -> np.ndarray:
+    """Count the unpriced (NaN) lines of every scenario, as a (scenarios,) array."""
+    hourly = np.atleast_2d(np.asarray(hourly_prices, dtype=float))
+    return np.isnan(hourly).sum(axis=1)
@@ -0,0 +1,145 @@
+"""Prompts - Agent instruction assembly, requirements hand-off and token accounting.
+
+Input tokens dominate the cost and latency of every agent run, so prompts are
+kept small and laid out for prompt caching:
+
+    Instructions    Static per deployment and sent first, so the model
+                    endpoint can serve them from a cached prefix. Nothing
+                    per-request (dates, session ids, requirements) goes in them.
+    Worked examples Optional, appended to the instructions only when
+                    AGENT_PROMPT_EXAMPLES is true.
+    Input           Per request, sent last: the requirements summary rather
+                    than the whole chat transcript.
+
+Configured by:
+
+    AGENT_PROMPT_EXAMPLES   Append worked examples to the agent instructions
+"""
+
+import math
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Environment variable enabling worked examples in the agent instructions
+PROMPT_EXAMPLES_ENV = "AGENT_PROMPT_EXAMPLES"
+
+# Default if not set in environment
+DEFAULT_PROMPT_EXAMPLES = False
+
+# Text ending the Question Agent's final requirements summary
+DONE_MARKER = "We are DONE!"
+
+# Azure OpenAI caches prompts of at least this many tokens...
+MIN_CACHED_PREFIX_TOKENS = 1024
+
+# ...and serves the cached prefix in increments of this many tokens
+CACHED_PREFIX_INCREMENT_TOKENS = 128
+
+# Encoding of the GPT-4o and later model families, used when tiktoken is installed
+TOKEN_ENCODING = "o200k_base"
+
+# Characters per token assumed when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def include_prompt_examples() -> bool:
+    """Return whether worked examples are appended to the agent instructions."""
+    value = os.getenv(PROMPT_EXAMPLES_ENV)
+    if value is None:
+        return DEFAULT_PROMPT_EXAMPLES
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def with_examples(instructions: str, examples: str, include: Optional[bool] = None) -> str:
+    """
+    Append worked examples to static instructions when enabled.
+
+    Args:
+        instructions: Static instructions
+        examples: Worked examples, starting with a blank line
+        include: Whether to append them (default: include_prompt_examples())
+
+    Returns:
+        Instructions, followed by the examples if included
+    """
+    if include is None:
+        include = include_prompt_examples()
+    return instructions + examples if include else instructions
+
+
+def requirements_from_history(history: List[Dict[str, str]]) -> str:
+    """
+    Build the requirements hand-off for the pipeline from a chat history.
+
+    The Question Agent ends the conversation with a summary of every
+    requirement gathered, so the latest summary and any turns after it stand
+    in for the whole transcript. Without a summary the full transcript is used.
+
+    Args:
+        history: Chat messages, each with "role" and "content"
+
+    Returns:
+        Requirements text, one "role: content" line per message
+    """
+    start = 0
+    for index in range(len(history) - 1, -1, -1):
+        message = history[index]
+        if message["role"] == "assistant" and DONE_MARKER in message["content"]:
+            start = index
+            break
+    return "\n".join(f"{msg['role']}: {msg['content']}" for msg in history[start:])
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> Any:
+    """Return the tiktoken encoding, or None when tiktoken is not installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding(TOKEN_ENCODING)
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in text with tiktoken, or estimate them from its length."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def cached_prefix_tokens(prefix_tokens: int) -> int:
+    """Return how many tokens of a repeated static prefix the endpoint can serve from cache."""
+    if prefix_tokens < MIN_CACHED_PREFIX_TOKENS:
+        return 0
+    increments = (prefix_tokens - MIN_CACHED_PREFIX_TOKENS) // CACHED_PREFIX_INCREMENT_TOKENS
+    return MIN_CACHED_PREFIX_TOKENS + increments * CACHED_PREFIX_INCREMENT_TOKENS
+
+
+def prompt_token_report(static: str, optional: str = "", request: str = "") -> Dict[str, int]:
+    """
+    Account for the input tokens of one agent request.
+
+    Args:
+        static: Text sent unchanged on every request (instructions, response schema)
+        optional: Text only sent when enabled (worked examples)
+        request: Per-request input
+
+    Returns:
+        Dict with static, optional, request and total tokens, and the tokens
+        of the static prefix servable from cache without and with the
+        optional text
+    """
+    static_tokens = count_tokens(static)
+    optional_tokens = count_tokens(optional) if optional else 0
+    request_tokens = count_tokens(request) if request else 0
+    return {
+        "static_tokens": static_tokens,
+        "optional_tokens": optional_tokens,
+        "request_tokens": request_tokens,
+        "total_tokens": static_tokens + request_tokens,
+        "cacheable_tokens": cached_prefix_tokens(static_tokens),
+        "cacheable_tokens_with_optional": cached_prefix_tokens(static_tokens + optional_tokens),
+    }
@@ -0,0 +1,254 @@
+"""Proposal Renderer - Proposal sections computed from the stage hand-off.
+
+Everything in a proposal that follows from the pricing data is rendered here,
+so tables, totals and the annual figure are exact and cost no model time:
+
+    Cost Breakdown       One row per BOM line with its hourly rate and monthly cost
+    Total Cost Summary   Monthly and annual totals and savings plan figures
+    Region Comparison    The ranking, when regions were compared
+    Next Steps           Fixed guidance
+    Assumptions          Operating hours, regions, price date and discount
+
+Only the Executive Summary and the Solution Architecture are written by the
+Proposal Agent, one request per section, run concurrently by the pipeline.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from src.handoff import StageHandoff, proposal_line_items, render_proposal_input
+from src.pricing.vectorized import MONTHS_PER_YEAR
+
+# Bump when the rendered sections change, so cached proposals are not reused
+PROPOSAL_TEMPLATE_VERSION = 3
+
+PROPOSAL_TITLE = "# Azure Solution Proposal"
+
+# Sections written by the Proposal Agent, in proposal order
+EXECUTIVE_SUMMARY = "Executive Summary"
+SOLUTION_ARCHITECTURE = "Solution Architecture"
+NARRATIVE_SECTIONS = (EXECUTIVE_SUMMARY, SOLUTION_ARCHITECTURE)
+
+# Hours in a month of continuous operation
+FULL_MONTH_HOURS = 730
+
+# Currencies shown with a symbol; others are shown with their code
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "INR": "₹"}
+
+UNPRICED_NOTE = "Pricing data not available - please contact Azure sales"
+
+NEXT_STEPS = """## Next Steps
+
+1. **Review and Validation**: Review this proposal with your technical team to ensure it meets all requirements
+2. **Environment Setup**: Plan your Azure subscription and resource group structure
+3. **Deployment**: Consider using Azure Resource Manager (ARM) templates or Terraform for infrastructure as code
+4. **Optimization**: After deployment, monitor usage and right-size resources for cost optimization
+5. **Support**: Contact Azure support for assistance with enterprise agreements and pricing optimization"""
+
+
+def format_amount(amount: float, currency: str, decimals: int = 2) -> str:
+    """Format an amount with thousands separators, e.g. "$1,234.56" or "1,234.56 SEK"."""
+    number = f"{amount:,.{decimals}f}"
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    return f"{symbol}{number}" if symbol else f"{number} {currency}"
+
+
+def section_heading(section: str) -> str:
+    """Return the Markdown heading opening a proposal section."""
+    return f"## {section}\n\n"
+
+
+def render_section_request(handoff: StageHandoff, section: str) -> str:
+    """Return the Proposal Agent's input for writing one narrative section."""
+    return f"{render_proposal_input(handoff)}\n\nWrite the {section} section."
+
+
+def _escape_cell(value: Any) -> str:
+    """Make a value safe to put in a Markdown table cell."""
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def render_cost_breakdown(handoff: StageHandoff) -> str:
+    """Render the Cost Breakdown table, with a note under it for every unpriced or usage-based line."""
+    currency = handoff.pricing["currency"]
+    lines = proposal_line_items(handoff)
+    rows = [
+        "## Cost Breakdown",
+        "",
+        "| Service | SKU | Quantity | Region | Hourly Rate | Monthly Cost |",
+        "|---------|-----|----------|--------|-------------|--------------|",
+    ]
+    for line in lines:
+        rows.append(
+            f"| {_escape_cell(line['service'])} | {_escape_cell(line['sku'])} | {line['quantity']} "
+            f"| {_escape_cell(line['region'])} | {format_amount(line['hourly_price'], currency, 4)} "
+            f"| {format_amount(line['monthly_cost'], currency)} |"
+        )
+
+    notes = [f"- Monthly costs are based on {FULL_MONTH_HOURS} hours per month unless noted in the assumptions"]
+    for line in lines:
+        if line.get("note"):
+            note = line["note"] if line["monthly_cost"] else UNPRICED_NOTE
+            notes.append(f"- {line['service']} ({line['sku']}): {note}")
+    return "\n".join(rows + ["", "**Notes:**"] + notes)
+
+
+def savings_plan_monthly(items: List[Dict[str, Any]], plan: str) -> Optional[float]:
+    """
+    Return the monthly total with a savings plan, or None when no line has one.
+
+    Lines without the plan (stored as 0.0, as are unpriced lines) count at
+    their on-demand monthly cost, so the total is never understated.
+
+    Args:
+        items: Pricing lines
+        plan: Savings option name, e.g. "1_year_savings_plan"
+    """
+    costs = [item.get("savings_options", {}).get(plan, 0.0) for item in items]
+    if not any(costs):
+        return None
+    return round(sum(cost or item["monthly_cost"] for cost, item in zip(costs, items)), 2)
+
+
+def render_total_cost_summary(handoff: StageHandoff) -> str:
+    """Render monthly and annual totals, and savings plan totals when any line has one."""
+    pricing = handoff.pricing
+    currency = pricing["currency"]
+    total = pricing["total_monthly"]
+    rows = [
+        "## Total Cost Summary",
+        "",
+        f"- **Monthly Cost**: {format_amount(total, currency)}",
+        f"- **Annual Cost (12 months)**: {format_amount(round(total * MONTHS_PER_YEAR, 2), currency)}",
+        f"- **Currency**: {currency}",
+    ]
+    for name, label in (("1_year_savings_plan", "1-year"), ("3_year_savings_plan", "3-year")):
+        monthly = savings_plan_monthly(pricing["items"], name)
+        if monthly is not None:
+            rows.append(f"- **Monthly Cost with a {label} Savings Plan**: {format_amount(monthly, currency)}")
+
+    if pricing.get("discount_percent"):
+        basis = f"retail pay-as-you-go rates less a {pricing['discount_percent']:g}% discount"
+    else:
+        basis = "retail pay-as-you-go rates"
+    rows += [
+        "",
+        f"*Note: Prices shown are {basis}. Significant discounts are available through "
+        "Reserved Instances (1 or 3 year commitments) and Azure Savings Plans.*",
+    ]
+    return "\n".join(rows)
+
+
+def render_region_comparison(handoff: StageHandoff) -> str:
+    """Render the region ranking, or "" when no regions were compared."""
+    comparison = handoff.pricing.get("region_comparison")
+    if not comparison:
+        return ""
+    currency = comparison.get("currency", handoff.pricing["currency"])
+    rows = [
+        "## Region Comparison",
+        "",
+        "| Rank | Region | Monthly Cost | Difference from Cheapest |",
+        "|------|--------|--------------|--------------------------|",
+    ]
+    for entry in comparison["ranking"]:
+        if entry["unpriced_lines"]:
+            difference = "Not fully priced"
+        else:
+            difference = format_amount(entry["difference_from_cheapest"], currency)
+        rows.append(
+            f"| {entry['rank']} | {entry['region']} "
+            f"| {format_amount(entry['total_monthly'], currency)} | {difference} |"
+        )
+
+    rows.append("")
+    if comparison.get("cheapest_region"):
+        rows.append(f"**Recommended region**: {comparison['cheapest_region']}, the cheapest fully priced region.")
+    rows.append("*Comparison prices are retail rates before any discount.*")
+    return "\n".join(rows)
+
+
+def _operating_hours(lines: List[Dict[str, Any]]) -> List[str]:
+    """Describe operating hours, listing the lines that don't run all month."""
+    partial = [line for line in lines if line["hours_per_month"] != FULL_MONTH_HOURS]
+    if not partial:
+        return [f"- Operating hours: 24/7/365 ({FULL_MONTH_HOURS} hours per month)"]
+    assumptions = [f"- Operating hours: {FULL_MONTH_HOURS} hours per month, except:"]
+    for line in partial:
+        assumptions.append(f"  - {line['service']} ({line['sku']}): {line['hours_per_month']} hours per month")
+    return assumptions
+
+
+def render_assumptions(handoff: StageHandoff) -> str:
+    """Render the assumptions the figures rest on."""
+    pricing = handoff.pricing
+    lines = proposal_line_items(handoff)
+    regions = list(dict.fromkeys(line["region"] for line in lines))
+
+    rows = ["## Assumptions", ""]
+    rows += _operating_hours(lines)
+    rows.append(f"- Region{'s' if len(regions) > 1 else ''}: {', '.join(regions)}")
+    rows.append(f"- Pricing: Azure retail rates in {pricing['currency']} as of {pricing.get('prices_as_of', 'today')}")
+    if pricing.get("discount_percent"):
+        rows.append(f"- A {pricing['discount_percent']:g}% discount off retail rates is applied")
+    rows.append("- No reserved instances or savings plans applied")
+    return "\n".join(rows)
+
+
+async def stream_narrative_sections(
+    write_section: Callable[[str], AsyncIterator[str]],
+    sections: Sequence[str] = NARRATIVE_SECTIONS,
+) -> AsyncIterator[str]:
+    """
+    Write every section concurrently and yield their text, headed, in proposal order.
+
+    The first section streams as it is generated; each later one is buffered
+    until the sections before it are done, then catches up. A section that
+    fails cancels the others and its error is re-raised.
+
+    Args:
+        write_section: Returns the streamed body text of a section
+        sections: Section names in proposal order
+    """
+    queues: Dict[str, asyncio.Queue] = {section: asyncio.Queue() for section in sections}
+
+    async def write(section: str) -> None:
+        try:
+            async for text in write_section(section):
+                queues[section].put_nowait(text)
+        finally:
+            queues[section].put_nowait(None)
+
+    tasks = [asyncio.create_task(write(section)) for section in sections]
+    try:
+        for section, task in zip(sections, tasks):
+            yield section_heading(section)
+            while True:
+                text = await queues[section].get()
+                if text is None:
+                    break
+                yield text
+            # Re-raise the section's error, if it failed
+            await task
+            yield "\n\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def render_computed_sections(handoff: StageHandoff) -> str:
+    """
+    Render every section that follows from the pricing data, in proposal order.
+
+    Raises:
+        ValueError: If the hand-off has no pricing, or its lines don't match the BOM
+    """
+    sections = [
+        render_cost_breakdown(handoff),
+        render_total_cost_summary(handoff),
+        render_region_comparison(handoff),
+        NEXT_STEPS,
+        render_assumptions(handoff),
+    ]
+    return "\n\n".join(section for section in sections if section) + "\n"
@@ -0,0 +1,151 @@
+"""Async Runtime - Persistent per-worker event loop for running agent coroutines."""
+
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def suppress_async_generator_errors(loop, context):
+    """Custom exception handler to suppress async generator cleanup errors during shutdown."""
+    message = context.get("message", "")
+    exception = context.get("exception")
+
+    # Suppress known MCP client cleanup errors during shutdown
+    if "streamablehttp_client" in message or (
+        exception and "cancel scope" in str(exception)
+    ):
+        return  # Suppress these errors
+
+    # For other errors, use default handling
+    loop.default_exception_handler(context)
+
+
+class BackgroundEventLoop:
+    """
+    An asyncio event loop running forever in a daemon thread.
+
+    Long-lived async resources (credentials, agent clients, MCP sessions) are
+    bound to the loop that created them, so a web worker runs every request's
+    coroutine on this one loop instead of a fresh loop per request.
+
+    Create it after the worker process forks (e.g. at app import time without
+    gunicorn --preload), since threads do not survive fork.
+    """
+
+    def __init__(self, name: str = "async-runtime"):
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_exception_handler(suppress_async_generator_errors)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop owned by this runtime."""
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the loop thread is alive."""
+        return self._thread.is_alive()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the loop and block the calling thread for its result.
+
+        Raises:
+            TimeoutError: If the coroutine does not finish within timeout
+                seconds; it is cancelled so it stops holding resources
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Operation did not complete within {timeout} seconds")
+
+    def iterate(
+        self,
+        agen: AsyncIterator[T],
+        timeout: Optional[float] = None,
+    ) -> Iterator[T]:
+        """
+        Drive an async generator on the loop and yield its items in the calling thread.
+
+        Items are handed over as soon as they are produced, so a WSGI response
+        can stream them. Closing the returned iterator early (e.g. the client
+        disconnected) cancels the async generator.
+
+        Args:
+            agen: Async generator to consume
+            timeout: Seconds allowed for the whole iteration
+
+        Raises:
+            TimeoutError: If the generator does not finish within timeout
+                seconds; it is cancelled
+        """
+        items: "queue.Queue[Any]" = queue.Queue()
+        finished = object()
+
+        async def pump() -> None:
+            try:
+                async for item in agen:
+                    items.put(item)
+            finally:
+                items.put(finished)
+                aclose = getattr(agen, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        future = self.submit(pump())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = items.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError(f"Operation did not complete within {timeout} seconds")
+                if item is finished:
+                    # Re-raise any exception from the generator
+                    future.result()
+                    return
+                yield item
+        finally:
+            future.cancel()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cancel outstanding tasks, stop the loop and join its thread."""
+        if not self._thread.is_alive():
+            return
+
+        async def shutdown() -> None:
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks, timeout=timeout)
+            await self._loop.shutdown_asyncgens()
+
+        try:
+            self.run(shutdown(), timeout=timeout + 1)
+        except Exception as e:
+            logger.warning(f"Error shutting down event loop: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._loop.close()
@@ -0,0 +1,383 @@
+"""Session Store - Pluggable storage for chat session state shared across workers.
+
+Select a backend with SESSION_STORE_URL:
+
+    memory://                       In-process dict (default, single worker only)
+    sqlite:///path/to/sessions.db   SQLite file shared by all workers on a host
+    redis://host:6379/0             Redis / Azure Cache for Redis (requires `redis`),
+                                    shared across instances; use a dedicated database
+
+Sessions are stored as compressed compact JSON holding the serialized agent
+thread and the chat history. Memory is bounded by:
+
+    SESSION_IDLE_TTL_SECONDS        Evict sessions idle for longer than this
+    SESSION_MAX_SESSIONS            Evict least recently active sessions beyond this
+    SESSION_MAX_HISTORY_BYTES       Drop the oldest history messages beyond this size
+    SESSION_SWEEP_INTERVAL_SECONDS  How often the background sweeper evicts idle sessions
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# Environment variables configuring the session store
+SESSION_STORE_URL_ENV = "SESSION_STORE_URL"
+SESSION_IDLE_TTL_ENV = "SESSION_IDLE_TTL_SECONDS"
+SESSION_MAX_SESSIONS_ENV = "SESSION_MAX_SESSIONS"
+SESSION_MAX_HISTORY_BYTES_ENV = "SESSION_MAX_HISTORY_BYTES"
+SESSION_SWEEP_INTERVAL_ENV = "SESSION_SWEEP_INTERVAL_SECONDS"
+
+# Defaults for the session store
+DEFAULT_SESSION_STORE_URL = "memory://"
+DEFAULT_IDLE_TTL_SECONDS = 3600.0
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_MAX_HISTORY_BYTES = 256 * 1024
+DEFAULT_SWEEP_INTERVAL_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def encode_session(data: Dict[str, Any]) -> bytes:
+    """Encode session data as zlib-compressed compact JSON."""
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_session(blob: bytes) -> Dict[str, Any]:
+    """Decode session data produced by encode_session."""
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def trim_history(history: List[Dict[str, Any]], max_bytes: int) -> List[Dict[str, Any]]:
+    """
+    Drop the oldest messages until the history fits in max_bytes of JSON.
+
+    The most recent message is always kept, since it carries the latest
+    requirements summary.
+    """
+    sizes = [len(json.dumps(msg, separators=(",", ":")).encode("utf-8")) for msg in history]
+    total = sum(sizes)
+    start = 0
+    while total > max_bytes and start < len(history) - 1:
+        total -= sizes[start]
+        start += 1
+    return history[start:]
+
+
+class SessionStore(ABC):
+    """Storage for per-session chat state ({"thread": ..., "history": [...]})."""
+
+    def __init__(
+        self,
+        idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        max_history_bytes: int = DEFAULT_MAX_HISTORY_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max(1, max_sessions)
+        self.max_history_bytes = max_history_bytes
+        self._clock = clock
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return session data and mark the session active, or None if unknown or idle."""
+
+    @abstractmethod
+    def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        """Store session data and mark the session active."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remove a session."""
+
+    @abstractmethod
+    def evict_idle(self) -> int:
+        """Remove sessions idle for longer than the TTL, returning how many were removed."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Return resident session count and stored bytes."""
+
+    def __len__(self) -> int:
+        return self.stats()["sessions"]
+
+    def _encode(self, data: Dict[str, Any]) -> bytes:
+        """Encode session data, trimming history to max_history_bytes."""
+        history = data.get("history")
+        if history:
+            data = dict(data, history=trim_history(history, self.max_history_bytes))
+        return encode_session(data)
+
+    def start_sweeper(self, interval_seconds: float = DEFAULT_SWEEP_INTERVAL_SECONDS) -> None:
+        """Start a daemon thread that evicts idle sessions every interval_seconds."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+
+        def sweep() -> None:
+            while not self._stop_sweeper.wait(interval_seconds):
+                try:
+                    evicted = self.evict_idle()
+                except Exception as e:
+                    logger.warning(f"Session sweep failed: {e}")
+                    continue
+                if evicted:
+                    logger.info(f"Evicted {evicted} idle sessions")
+
+        self._sweeper = threading.Thread(target=sweep, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper thread, if running."""
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+
+class InMemorySessionStore(SessionStore):
+    """Session store held in this process only, bounded in count and size."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        # session_id -> (last_access, blob), least recently active first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def _remove(self, session_id: str) -> None:
+        _, blob = self._sessions.pop(session_id)
+        self._bytes -= len(blob)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if now - entry[0] > self.idle_ttl_seconds:
+                self._remove(session_id)
+                self.evictions += 1
+                return None
+            self._sessions[session_id] = (now, entry[1])
+            self._sessions.move_to_end(session_id)
+            blob = entry[1]
+        return decode_session(blob)
+
+    def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        blob = self._encode(data)
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._sessions[session_id] = (self._clock(), blob)
+            self._bytes += len(blob)
+            while len(self._sessions) > self.max_sessions:
+                self._remove(next(iter(self._sessions)))
+                self.evictions += 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def evict_idle(self) -> int:
+        cutoff = self._clock() - self.idle_ttl_seconds
+        evicted = 0
+        with self._lock:
+            # Entries are ordered by last access, so idle sessions are at the front
+            while self._sessions:
+                session_id, (last_access, _) = next(iter(self._sessions.items()))
+                if last_access >= cutoff:
+                    break
+                self._remove(session_id)
+                evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_sessions": self.max_sessions,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access)"
+        )
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND last_access >= ?",
+                (session_id, now - self.idle_ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE sessions SET last_access = ? WHERE session_id = ?",
+                (now, session_id),
+            )
+        return decode_session(row[0])
+
+    def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        blob = self._encode(data)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, last_access) VALUES (?, ?, ?)",
+                (session_id, blob, self._clock()),
+            )
+            # Evict least recently active sessions beyond the cap
+            self._conn.execute(
+                """
+                DELETE FROM sessions WHERE session_id IN (
+                    SELECT session_id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_sessions,),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE last_access < ?",
+                (self._clock() - self.idle_ttl_seconds,),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions"
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "sessions": count,
+            "bytes": total_bytes,
+            "max_sessions": self.max_sessions,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.stop_sweeper()
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store in Redis, shared across workers and instances.
+
+    Idle expiry uses Redis TTLs; the session cap is left to the Redis
+    maxmemory eviction policy. stats() counts every key in the database and
+    reports the server's used memory, so give sessions a database of their own.
+    """
+
+    KEY_PREFIX = "azure-pricing-assistant:session:"
+
+    def __init__(self, url: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "The redis package is required for redis:// session stores. "
+                "Install it with: pip install redis"
+            ) from e
+        self._redis = redis.Redis.from_url(url)
+
+    def _key(self, session_id: str) -> str:
+        return self.KEY_PREFIX + session_id
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        blob = self._redis.getex(self._key(session_id), ex=int(self.idle_ttl_seconds))
+        return decode_session(blob) if blob is not None else None
+
+    def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        self._redis.set(self._key(session_id), self._encode(data), ex=int(self.idle_ttl_seconds))
+
+    def delete(self, session_id: str) -> None:
+        self._redis.delete(self._key(session_id))
+
+    def evict_idle(self) -> int:
+        # Redis expires idle sessions on its own
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        # One round-trip whatever the number of sessions, since /health and
+        # /metrics call this on every request
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.dbsize()
+        pipe.info("memory")
+        count, memory = pipe.execute()
+        return {
+            "backend": "redis",
+            "sessions": count,
+            "bytes": memory["used_memory"],
+            "max_sessions": None,
+        }
+
+
+def create_session_store(url: Optional[str] = None) -> SessionStore:
+    """
+    Create the session store named by a URL (default: SESSION_STORE_URL).
+
+    Limits are read from the SESSION_* environment variables.
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    url = url or os.getenv(SESSION_STORE_URL_ENV, DEFAULT_SESSION_STORE_URL)
+    limits = {
+        "idle_ttl_seconds": float(os.getenv(SESSION_IDLE_TTL_ENV, DEFAULT_IDLE_TTL_SECONDS)),
+        "max_sessions": int(os.getenv(SESSION_MAX_SESSIONS_ENV, DEFAULT_MAX_SESSIONS)),
+        "max_history_bytes": int(os.getenv(SESSION_MAX_HISTORY_BYTES_ENV, DEFAULT_MAX_HISTORY_BYTES)),
+    }
+
+    if url.startswith("memory://"):
+        return InMemorySessionStore(**limits)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):], **limits)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisSessionStore(url, **limits)
+    raise ValueError(f"Unsupported session store URL: {url}")
@@ -0,0 +1,38 @@
+"""Server-Sent Events helpers for the streaming web endpoints."""
+
+import json
+from dataclasses import asdict
+from typing import Any, Dict
+
+# Event names sent on the chat and proposal streams, besides the pipeline's
+# own stage_started / text / stage_completed events
+DELTA_EVENT = "delta"
+DONE_EVENT = "done"
+ERROR_EVENT = "error"
+
+# Headers that stop App Service / reverse proxies from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Encode one Server-Sent Event.
+
+    Args:
+        event: Event name (the browser dispatches on it)
+        data: JSON-serializable payload
+
+    Returns:
+        The event frame, terminated by a blank line
+    """
+    payload = json.dumps(data, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def pipeline_event_payload(event: Any) -> Dict[str, Any]:
+    """Convert a PipelineEvent into an SSE payload, omitting empty fields."""
+    return {key: value for key, value in asdict(event).items() if value not in ("", None)}
+
@@ -0,0 +1,543 @@
+"""Telemetry - Per-stage and per-tool-call spans and metrics for the agent pipeline.
+
+Every pipeline run and chat turn records, per agent stage, the total stage
+time, time to first token, prompt/completion tokens and the agent's tool
+calls, all derived from the pipeline events and the agents' streamed
+updates. Upstream MCP calls and cache lookups are recorded where they happen.
+
+Metrics go to a process-wide in-memory registry (see get_metrics), rendered
+in the Prometheus text format by format_prometheus. Spans go to
+OpenTelemetry when it is installed, and are exported wherever
+agent_framework.observability.setup_observability points the tracer
+provider (e.g. a local OTLP collector).
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from src.mcp_results import is_mcp_error_result, mcp_result_text
+
+T = TypeVar("T")
+
+# Histogram bucket upper bounds in seconds, from a cached lookup to a long proposal
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Instrumentation scope of the spans
+TRACER_NAME = "azure_pricing_assistant"
+
+# Prefix of every exposed metric name
+METRICS_PREFIX = "pricing_assistant_"
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Outcome label values
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_CANCELLED = "cancelled"
+
+# Cache result label values
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+# Token kind label values
+PROMPT_TOKENS = "prompt"
+COMPLETION_TOKENS = "completion"
+
+logger = logging.getLogger(__name__)
+
+
+def _label_values(label_names: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    """Return label values in label_names order, raising ValueError on a mismatch."""
+    if set(labels) != set(label_names):
+        raise ValueError(f"Expected labels {sorted(label_names)}, got {sorted(labels)}")
+    return tuple(str(labels[name]) for name in label_names)
+
+
+class Counter:
+    """Monotonic counter per label combination."""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str]):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add amount to the counter for these labels."""
+        key = _label_values(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        """Return the current value per label combination."""
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge:
+    """Value that goes up and down per label combination."""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge for these labels."""
+        key = _label_values(self.label_names, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add amount (negative to subtract) to the gauge for these labels."""
+        key = _label_values(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Subtract amount from the gauge for these labels."""
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        """Return the current value per label combination."""
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    """Distribution of observed values per label combination, in fixed buckets."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for these labels."""
+        key = _label_values(self.label_names, labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry["counts"][index] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def samples(self) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        """
+        Return per label combination the cumulative count at each bucket bound,
+        the sum and the total count.
+        """
+        with self._lock:
+            samples = {}
+            for key, entry in self._values.items():
+                cumulative, running = [], 0
+                for count in entry["counts"]:
+                    running += count
+                    cumulative.append(running)
+                samples[key] = {"buckets": cumulative, "sum": entry["sum"], "count": entry["count"]}
+            return samples
+
+
+class PipelineMetrics:
+    """Instruments recorded by the pipeline, the agents, the MCP tools and the web app."""
+
+    def __init__(self):
+        self.http_request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Web request duration until the response (including a streamed body) is sent",
+            ("endpoint", "method", "status"),
+        )
+        self.runs_in_flight = Gauge(
+            "runs_in_flight",
+            "Pipeline runs and chat turns currently running",
+            ("run",),
+        )
+        self.stage_duration = Histogram(
+            "stage_duration_seconds",
+            "Time from an agent stage starting to completing",
+            ("stage", "outcome"),
+        )
+        self.time_to_first_token = Histogram(
+            "stage_time_to_first_token_seconds",
+            "Time from an agent stage starting to its first streamed text",
+            ("stage",),
+        )
+        self.tool_call_duration = Histogram(
+            "agent_tool_call_duration_seconds",
+            "Duration of tool calls made by an agent, from call to result",
+            ("stage", "tool", "outcome"),
+        )
+        self.mcp_call_duration = Histogram(
+            "mcp_call_duration_seconds",
+            "Duration of upstream MCP tool calls (cache misses only)",
+            ("tool", "outcome"),
+        )
+        self.tokens = Counter(
+            "agent_tokens_total",
+            "Tokens used by an agent stage",
+            ("stage", "kind"),
+        )
+        self.cache_requests = Counter(
+            "cache_requests_total",
+            "Cache lookups by cache and result",
+            ("cache", "result"),
+        )
+
+    def instruments(self) -> List[Any]:
+        """Return every counter and histogram, e.g. for exposition."""
+        return [
+            self.http_request_duration,
+            self.runs_in_flight,
+            self.stage_duration,
+            self.time_to_first_token,
+            self.tool_call_duration,
+            self.mcp_call_duration,
+            self.tokens,
+            self.cache_requests,
+        ]
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count one lookup in a named cache."""
+        self.cache_requests.inc(cache=cache, result=CACHE_HIT if hit else CACHE_MISS)
+
+
+@lru_cache(maxsize=1)
+def get_metrics() -> PipelineMetrics:
+    """Return the process-wide pipeline metrics."""
+    return PipelineMetrics()
+
+
+def _escape_label_value(value: str) -> str:
+    """Escape backslashes, double quotes and newlines in a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: Sequence[str], values: Sequence[str], extra: Optional[Dict[str, str]] = None) -> str:
+    """Render {name="value",...}, or "" without labels."""
+    pairs = list(zip(label_names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, using Prometheus spellings for infinities and NaN."""
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def format_prometheus(
+    instruments: Sequence[Any],
+    prefix: str = METRICS_PREFIX,
+    const_labels: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Render counters, gauges and histograms in the Prometheus text exposition format.
+
+    Args:
+        instruments: Counter, Gauge and Histogram instances
+        prefix: Prepended to every metric name
+        const_labels: Labels added to every sample, e.g. {"worker": "1234"}
+
+    Returns:
+        Exposition text ending in a newline
+    """
+    lines: List[str] = []
+    for instrument in instruments:
+        name = prefix + instrument.name
+        kind = (
+            "histogram" if isinstance(instrument, Histogram)
+            else "counter" if isinstance(instrument, Counter)
+            else "gauge"
+        )
+        lines.append(f"# HELP {name} {instrument.description}")
+        lines.append(f"# TYPE {name} {kind}")
+
+        for values, sample in sorted(instrument.samples().items()):
+            if kind != "histogram":
+                labels = _format_labels(instrument.label_names, values, const_labels)
+                lines.append(f"{name}{labels} {_format_value(sample)}")
+                continue
+            bounds = list(instrument.buckets) + [float("inf")]
+            counts = sample["buckets"] + [sample["count"]]
+            for bound, count in zip(bounds, counts):
+                labels = _format_labels(
+                    instrument.label_names + ("le",), values + (_format_value(bound),), const_labels
+                )
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = _format_labels(instrument.label_names, values, const_labels)
+            lines.append(f"{name}_sum{labels} {_format_value(sample['sum'])}")
+            lines.append(f"{name}_count{labels} {sample['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryTracer:
+    """Starts and ends OpenTelemetry spans explicitly, without attaching them to the current context."""
+
+    def __init__(self):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(TRACER_NAME)
+
+    def start(self, name: str, parent: Any = None, attributes: Optional[Dict[str, Any]] = None) -> Any:
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        return self._tracer.start_span(name, context=context, attributes=attributes)
+
+    def end(self, span: Any, attributes: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None) -> None:
+        if attributes:
+            span.set_attributes(attributes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+        span.end()
+
+
+@lru_cache(maxsize=1)
+def get_tracer() -> Optional[OpenTelemetryTracer]:
+    """Return the span tracer, or None if OpenTelemetry is not installed."""
+    try:
+        return OpenTelemetryTracer()
+    except ImportError:
+        logger.info("OpenTelemetry not installed; pipeline spans are disabled")
+        return None
+
+
+class RunTelemetry:
+    """
+    Spans and metrics for one pipeline run or chat turn.
+
+    Feed it the run's stage boundaries and each agent's streamed updates. A
+    span is opened for the run, one per stage and one per tool call an agent
+    makes. Spans are started and ended explicitly rather than made current,
+    since the pipeline is an async generator and OpenTelemetry context cannot
+    be attached across its yields.
+
+    Args:
+        name: Span name of the whole run, e.g. "proposal_pipeline"
+        metrics: Metrics to record into (default: get_metrics())
+        tracer: Span tracer (default: get_tracer(), or no spans without OpenTelemetry)
+        clock: Monotonic clock in seconds
+    """
+
+    def __init__(
+        self,
+        name: str,
+        metrics: Optional[PipelineMetrics] = None,
+        tracer: Optional[OpenTelemetryTracer] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self._tracer = tracer if tracer is not None else get_tracer()
+        self._clock = clock
+        self._name = name
+        self.metrics.runs_in_flight.inc(run=name)
+        self._span = self._start_span(name)
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._finished = False
+        # Per-stage results (seconds, first token, tokens, tool calls), e.g. for logs
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def _start_span(self, name: str, parent: Any = None, attributes: Optional[Dict[str, Any]] = None) -> Any:
+        if self._tracer is None:
+            return None
+        return self._tracer.start(name, parent=parent, attributes=attributes)
+
+    def _end_span(self, span: Any, attributes: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None) -> None:
+        if span is not None:
+            self._tracer.end(span, attributes=attributes, error=error)
+
+    def stage_started(self, stage: str) -> None:
+        """Start timing a stage."""
+        self._stages[stage] = {
+            "started": self._clock(),
+            "first_token": None,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "tool_calls": 0,
+            "pending_tools": {},
+            "span": self._start_span(stage, parent=self._span, attributes={"pipeline.stage": stage}),
+        }
+
+    def text(self, stage: str) -> None:
+        """Note that a stage produced text, recording its time to first token the first time."""
+        state = self._stages.get(stage)
+        if state is None or state["first_token"] is not None:
+            return
+        state["first_token"] = self._clock() - state["started"]
+        self.metrics.time_to_first_token.observe(state["first_token"], stage=stage)
+
+    def agent_update(self, stage: str, update: Any) -> None:
+        """
+        Record an agent's streamed update: first text, token usage and tool calls.
+
+        Reads the update's contents by type: "usage" carries token counts,
+        "function_call" starts a tool call and "function_result" ends the
+        call with the same call_id.
+        """
+        state = self._stages.get(stage)
+        if state is None:
+            return
+        if getattr(update, "text", None):
+            self.text(stage)
+
+        for content in getattr(update, "contents", None) or []:
+            content_type = getattr(content, "type", None)
+            if content_type == "usage":
+                details = getattr(content, "details", None)
+                prompt = getattr(details, "input_token_count", None) or 0
+                completion = getattr(details, "output_token_count", None) or 0
+                state["prompt_tokens"] += prompt
+                state["completion_tokens"] += completion
+                if prompt:
+                    self.metrics.tokens.inc(prompt, stage=stage, kind=PROMPT_TOKENS)
+                if completion:
+                    self.metrics.tokens.inc(completion, stage=stage, kind=COMPLETION_TOKENS)
+            elif content_type == "function_call":
+                call_id = getattr(content, "call_id", None)
+                tool = getattr(content, "name", None) or "unknown"
+                if call_id in state["pending_tools"]:
+                    continue  # Streamed arguments of a call already started
+                state["tool_calls"] += 1
+                state["pending_tools"][call_id] = (
+                    tool,
+                    self._clock(),
+                    self._start_span(f"execute_tool {tool}", parent=state["span"], attributes={"tool.name": tool}),
+                )
+            elif content_type == "function_result":
+                pending = state["pending_tools"].pop(getattr(content, "call_id", None), None)
+                if pending is None:
+                    continue
+                tool, started, span = pending
+                error = getattr(content, "exception", None)
+                self.metrics.tool_call_duration.observe(
+                    self._clock() - started,
+                    stage=stage,
+                    tool=tool,
+                    outcome=OUTCOME_ERROR if error else OUTCOME_OK,
+                )
+                self._end_span(span, error=error if isinstance(error, BaseException) else None)
+
+    def stage_completed(self, stage: str, error: Optional[BaseException] = None, outcome: Optional[str] = None) -> None:
+        """Finish timing a stage, recording its duration, outcome and span."""
+        state = self._stages.pop(stage, None)
+        if state is None:
+            return
+        outcome = outcome or (OUTCOME_ERROR if error is not None else OUTCOME_OK)
+        seconds = self._clock() - state["started"]
+        self.metrics.stage_duration.observe(seconds, stage=stage, outcome=outcome)
+
+        # Tool calls still running when the stage ends never got a result
+        for tool, started, span in state["pending_tools"].values():
+            self.metrics.tool_call_duration.observe(
+                self._clock() - started, stage=stage, tool=tool, outcome=OUTCOME_CANCELLED
+            )
+            self._end_span(span)
+
+        self.stages[stage] = {
+            "seconds": seconds,
+            "time_to_first_token": state["first_token"],
+            "prompt_tokens": state["prompt_tokens"],
+            "completion_tokens": state["completion_tokens"],
+            "tool_calls": state["tool_calls"],
+            "outcome": outcome,
+        }
+        attributes = {
+            "pipeline.outcome": outcome,
+            "pipeline.tool_calls": state["tool_calls"],
+            "gen_ai.usage.input_tokens": state["prompt_tokens"],
+            "gen_ai.usage.output_tokens": state["completion_tokens"],
+        }
+        if state["first_token"] is not None:
+            attributes["pipeline.time_to_first_token_s"] = state["first_token"]
+        self._end_span(state["span"], attributes=attributes, error=error)
+
+        first_token = f"{state['first_token']:.2f}s" if state["first_token"] is not None else "n/a"
+        logger.info(
+            f"{stage} {outcome} in {seconds:.2f}s (first token {first_token}, "
+            f"{state['tool_calls']} tool calls, {state['prompt_tokens']}/{state['completion_tokens']} tokens)"
+        )
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """End the run: stages still open failed (or were cancelled, without an error)."""
+        if self._finished:
+            return
+        self._finished = True
+        self.metrics.runs_in_flight.dec(run=self._name)
+        for stage in list(self._stages):
+            self.stage_completed(stage, error=error, outcome=None if error is not None else OUTCOME_CANCELLED)
+        self._end_span(self._span, error=error)
+
+
+class MCPResultError(Exception):
+    """Recorded on the span of an MCP call whose result reports an error."""
+
+
+async def record_mcp_call(
+    tool: str,
+    call: Callable[[], Awaitable[T]],
+    metrics: Optional[PipelineMetrics] = None,
+    tracer: Optional[OpenTelemetryTracer] = None,
+) -> T:
+    """
+    Await an upstream MCP tool call, recording its latency, outcome and span.
+
+    Args:
+        tool: MCP tool name
+        call: Coroutine function making the call
+        metrics: Metrics to record into (default: get_metrics())
+        tracer: Span tracer (default: get_tracer(), or no spans without OpenTelemetry)
+
+    Returns:
+        The call's result; exceptions are recorded and re-raised. A result
+        carrying an error payload is returned but recorded as an error.
+    """
+    metrics = metrics if metrics is not None else get_metrics()
+    tracer = tracer if tracer is not None else get_tracer()
+    span = tracer.start(f"mcp {tool}", attributes={"tool.name": tool}) if tracer is not None else None
+    started = time.perf_counter()
+    error: Optional[BaseException] = None
+    outcome = OUTCOME_OK
+    try:
+        result = await call()
+        # Tools usually report failures in the result rather than by raising
+        if is_mcp_error_result(result):
+            error = MCPResultError(mcp_result_text(result)[:200])
+            outcome = OUTCOME_ERROR
+        return result
+    except asyncio.CancelledError:
+        outcome = OUTCOME_CANCELLED
+        raise
+    except Exception as e:
+        error, outcome = e, OUTCOME_ERROR
+        raise
+    finally:
+        metrics.mcp_call_duration.observe(time.perf_counter() - started, tool=tool, outcome=outcome)
+        if span is not None:
+            tracer.end(span, error=error)
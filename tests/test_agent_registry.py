@@ -0,0 +1,114 @@
+"""Test reuse of prebuilt agents and MCP tools."""
+
+import asyncio
+import pytest
+from src.agents import registry as registry_module
+from src.agents.registry import (
+    BOM_AGENT,
+    QUESTION_AGENT,
+    AgentRegistry,
+)
+
+
+class FakeMCPTool:
+    """MCP tool stand-in counting connections."""
+
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.connects = 0
+        self.is_connected = False
+
+    async def __aenter__(self):
+        if self.fail:
+            raise ConnectionError(f"{self.name} unavailable")
+        self.connects += 1
+        self.is_connected = True
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.is_connected = False
+
+
+@pytest.fixture
+def fake_factories(monkeypatch):
+    """Replace agent and tool factories with counting fakes."""
+    built = []
+    tools = {
+        "docs": FakeMCPTool("Microsoft Learn"),
+        "pricing": FakeMCPTool("Azure Pricing"),
+    }
+
+    def make_agent(name):
+        def factory(client, **kwargs):
+            built.append(name)
+            return {"name": name, "client": client, **kwargs}
+        return factory
+
+    monkeypatch.setattr(registry_module, "create_docs_mcp_tool", lambda client: tools["docs"])
+    monkeypatch.setattr(registry_module, "create_pricing_mcp_tool", lambda: tools["pricing"])
+    monkeypatch.setattr(registry_module, "create_question_agent", make_agent(QUESTION_AGENT))
+    monkeypatch.setattr(registry_module, "create_bom_agent", make_agent(BOM_AGENT))
+    return built, tools
+
+
+class TestAgentRegistry:
+    """Test agents and MCP sessions are built once per client."""
+
+    def test_agents_built_once_and_reused(self, fake_factories):
+        """Test repeated gets return the same agent instance."""
+        built, _ = fake_factories
+        registry = AgentRegistry(client="client")
+
+        async def scenario():
+            first = await registry.get(QUESTION_AGENT)
+            second = await registry.get(QUESTION_AGENT)
+            await registry.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first is second
+        assert built == [QUESTION_AGENT]
+
+    def test_agents_share_connected_tools(self, fake_factories):
+        """Test MCP tools are connected once and shared between agents."""
+        _, tools = fake_factories
+        registry = AgentRegistry(client="client")
+
+        async def scenario():
+            question_agent = await registry.get(QUESTION_AGENT)
+            bom_agent = await registry.get(BOM_AGENT)
+            connected = tools["docs"].is_connected
+            await registry.aclose()
+            return question_agent, bom_agent, connected
+
+        question_agent, bom_agent, connected = asyncio.run(scenario())
+        assert question_agent["docs_tool"] is bom_agent["docs_tool"]
+        assert bom_agent["pricing_tool"] is tools["pricing"]
+        assert connected
+        assert tools["docs"].connects == 1
+        assert not tools["docs"].is_connected
+
+    def test_unavailable_tool_does_not_block_agents(self, fake_factories):
+        """Test an MCP server that is down leaves the other tools connected."""
+        _, tools = fake_factories
+        tools["pricing"].fail = True
+        registry = AgentRegistry(client="client")
+
+        async def scenario():
+            agent = await registry.get(QUESTION_AGENT)
+            await registry.aclose()
+            return agent
+
+        assert asyncio.run(scenario())["name"] == QUESTION_AGENT
+        assert tools["docs"].connects == 1
+
+    def test_unknown_agent_rejected(self, fake_factories):
+        """Test unknown agent names raise KeyError."""
+        registry = AgentRegistry(client="client")
+        with pytest.raises(KeyError, match="Unknown agent"):
+            asyncio.run(registry.get("summary_agent"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,160 @@
+"""Test batch quoting of many requirement documents."""
+
+import asyncio
+import json
+import os
+import pytest
+from src.batch import (
+    BATCH_FAILED,
+    BATCH_SUCCEEDED,
+    RESULTS_FILE,
+    completed_ids,
+    load_batch_inputs,
+    main,
+    proposal_path,
+    run_batch,
+)
+
+
+def fake_quote(calls=None, fail=(), delay=0.0):
+    """Build a quote runner returning canned outputs."""
+    async def run_quote(requirements):
+        if calls is not None:
+            calls.append(requirements)
+        await asyncio.sleep(delay)
+        if requirements in fail:
+            raise RuntimeError(f"BOM failed for {requirements}")
+        return {"bom": "bom", "pricing": "pricing", "proposal": f"# Proposal for {requirements}"}
+
+    return run_quote
+
+
+def read_results(output_dir):
+    """Read results.jsonl as a list of dicts."""
+    with open(os.path.join(output_dir, RESULTS_FILE), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestLoadBatchInputs:
+    """Test reading requirement documents."""
+
+    def test_directory_of_documents(self, tmp_path):
+        """Test .txt and .md files are read in name order, other files ignored."""
+        (tmp_path / "b.md").write_text("Web app in West Europe")
+        (tmp_path / "a.txt").write_text("SQL database in East US")
+        (tmp_path / "notes.json").write_text("{}")
+        inputs = load_batch_inputs(str(tmp_path))
+        assert inputs == [
+            {"id": "a", "requirements": "SQL database in East US"},
+            {"id": "b", "requirements": "Web app in West Europe"},
+        ]
+
+    def test_jsonl_with_default_ids(self, tmp_path):
+        """Test JSONL lines use their id, or the line number when missing."""
+        path = tmp_path / "inputs.jsonl"
+        path.write_text('{"id": "acme", "requirements": "AKS cluster"}\n\n{"requirements": "Blob storage"}\n')
+        inputs = load_batch_inputs(str(path))
+        assert [batch_input["id"] for batch_input in inputs] == ["acme", "line-00003"]
+
+    @pytest.mark.parametrize("content, match", [
+        ("not json\n", "invalid JSON"),
+        ('{"id": "x"}\n', "requirements string"),
+        ('{"id": "x", "requirements": "  "}\n', "empty requirements"),
+        ('{"id": "x", "requirements": "a"}\n{"id": "x", "requirements": "b"}\n', "Duplicate input ID"),
+        ('{"id": "Acme", "requirements": "a"}\n{"id": "acme", "requirements": "b"}\n', "same proposal file"),
+    ])
+    def test_malformed_jsonl_rejected(self, tmp_path, content, match):
+        """Test bad lines fail before any quote is run."""
+        path = tmp_path / "inputs.jsonl"
+        path.write_text(content)
+        with pytest.raises(ValueError, match=match):
+            load_batch_inputs(str(path))
+
+
+class TestProposalPath:
+    """Test proposal file names."""
+
+    def test_safe_ids_kept(self, tmp_path):
+        """Test IDs that are already safe are used as the file name."""
+        assert proposal_path(str(tmp_path), "quote-0.v2") == os.path.join(str(tmp_path), "proposals", "quote-0.v2.md")
+
+    def test_sanitized_ids_do_not_collide(self, tmp_path):
+        """Test IDs differing only in unsafe characters get different files."""
+        paths = {proposal_path(str(tmp_path), input_id) for input_id in ("a/b", "a_b", "a b", "a:b")}
+        assert len(paths) == 4
+        assert os.path.basename(proposal_path(str(tmp_path), "a/b")).startswith("a_b-")
+
+
+class TestRunBatch:
+    """Test concurrent quoting, result writing and resume."""
+
+    INPUTS = [{"id": f"quote-{i}", "requirements": f"req-{i}"} for i in range(6)]
+
+    def test_results_written_per_input(self, tmp_path):
+        """Test every input gets a results line and a proposal file."""
+        summary = asyncio.run(run_batch(self.INPUTS, fake_quote(), str(tmp_path), workers=3))
+        assert summary == {"total": 6, "skipped": 0, BATCH_SUCCEEDED: 6, BATCH_FAILED: 0}
+        results = read_results(tmp_path)
+        assert sorted(result["id"] for result in results) == [f"quote-{i}" for i in range(6)]
+        with open(proposal_path(str(tmp_path), "quote-0"), encoding="utf-8") as f:
+            assert f.read() == "# Proposal for req-0"
+
+    def test_workers_bound_concurrency(self, tmp_path):
+        """Test at most `workers` inputs are quoted at once."""
+        running = []
+        peak = []
+
+        async def run_quote(requirements):
+            running.append(requirements)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(requirements)
+            return {"proposal": "ok"}
+
+        asyncio.run(run_batch(self.INPUTS, run_quote, str(tmp_path), workers=2))
+        assert max(peak) == 2
+
+    def test_failures_recorded_and_batch_continues(self, tmp_path):
+        """Test a failing input is recorded without stopping the others."""
+        summary = asyncio.run(run_batch(self.INPUTS, fake_quote(fail={"req-1"}), str(tmp_path)))
+        assert summary[BATCH_FAILED] == 1
+        failed = [result for result in read_results(tmp_path) if result["status"] == BATCH_FAILED]
+        assert failed[0]["id"] == "quote-1"
+        assert "BOM failed" in failed[0]["error"]
+
+    def test_timeout_fails_input(self, tmp_path):
+        """Test an input exceeding the timeout is recorded as failed."""
+        summary = asyncio.run(run_batch(
+            self.INPUTS[:1], fake_quote(delay=1.0), str(tmp_path), timeout=0.01
+        ))
+        assert summary[BATCH_FAILED] == 1
+        assert "Timed out" in read_results(tmp_path)[0]["error"]
+
+    def test_resume_skips_succeeded_and_retries_failed(self, tmp_path):
+        """Test rerunning only quotes inputs that failed or never finished."""
+        asyncio.run(run_batch(self.INPUTS[:3], fake_quote(fail={"req-1"}), str(tmp_path)))
+        # Simulate an interruption that left a partial line
+        with open(os.path.join(tmp_path, RESULTS_FILE), "a", encoding="utf-8") as f:
+            f.write('{"id": "quote-3", "sta')
+
+        calls = []
+        summary = asyncio.run(run_batch(self.INPUTS, fake_quote(calls), str(tmp_path)))
+        assert sorted(calls) == ["req-1", "req-3", "req-4", "req-5"]
+        assert summary["skipped"] == 2
+        assert completed_ids(str(tmp_path)) == {f"quote-{i}" for i in range(6)}
+
+
+
+class TestMain:
+    """Test the batch command line."""
+
+    @pytest.mark.parametrize("option", [["--currency", "US"], ["--discount-percent", "100"]])
+    def test_invalid_options_are_usage_errors(self, tmp_path, capsys, option):
+        """Test bad pricing options exit with a usage error before inputs are read."""
+        with pytest.raises(SystemExit) as exc:
+            main([str(tmp_path / "missing"), "--output", str(tmp_path), *option])
+        assert exc.value.code == 2
+        assert "error:" in capsys.readouterr().err
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+"""Test benchmark percentiles, summaries and baseline comparison."""
+
+import pytest
+from benchmarks.stats import compare_to_baseline, format_report, percentile, summarize_latency
+
+
+def scenario(p50, p95, p99, throughput=10.0, memory=1024.0, stages=None):
+    """Build a scenario result."""
+    return {
+        "latency": {"count": 20, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99},
+        "throughput_per_second": throughput,
+        "peak_memory_kib": memory,
+        "stages": stages or {},
+        "errors": 0,
+    }
+
+
+class TestPercentiles:
+    """Test latency percentiles and summaries."""
+
+    def test_interpolates_between_ranks(self):
+        """Test percentiles interpolate linearly between sorted samples."""
+        samples = [4.0, 1.0, 3.0, 2.0]
+        assert percentile(samples, 0) == 1.0
+        assert percentile(samples, 50) == 2.5
+        assert percentile(samples, 100) == 4.0
+        assert percentile([7.0], 99) == 7.0
+
+    @pytest.mark.parametrize("samples, pct", [([], 50), ([1.0], 101)])
+    def test_invalid_input_rejected(self, samples, pct):
+        """Test empty samples and out-of-range percentiles raise ValueError."""
+        with pytest.raises(ValueError):
+            percentile(samples, pct)
+
+    def test_summary_in_milliseconds(self):
+        """Test seconds are summarized as milliseconds."""
+        summary = summarize_latency([0.1 * i for i in range(1, 101)])
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == pytest.approx(5050.0)
+        assert summary["p99_ms"] == pytest.approx(9901.0)
+        assert summary["max_ms"] == pytest.approx(10000.0)
+
+    def test_empty_summary(self):
+        """Test a scenario without successful runs only reports its count."""
+        assert summarize_latency([]) == {"count": 0}
+
+
+class TestCompareToBaseline:
+    """Test regression detection against an earlier run."""
+
+    BASELINE = {"scenarios": {
+        "pipeline": scenario(100.0, 150.0, 200.0, stages={"bom_agent": scenario(50.0, 60.0, 70.0)}),
+        "flask_chat": scenario(20.0, 25.0, 30.0),
+    }}
+
+    def test_no_regressions_within_threshold(self):
+        """Test changes up to max_regression pass."""
+        results = {"scenarios": {"pipeline": scenario(105.0, 160.0, 215.0, throughput=9.5)}}
+        assert compare_to_baseline(results, self.BASELINE, 0.10) == []
+
+    def test_slower_stage_and_lower_throughput_flagged(self):
+        """Test latency growth per stage and throughput drops are regressions."""
+        results = {"scenarios": {
+            "pipeline": scenario(100.0, 150.0, 200.0, throughput=5.0,
+                                 stages={"bom_agent": scenario(50.0, 90.0, 70.0)}),
+        }}
+        metrics = {regression["metric"]: regression for regression in compare_to_baseline(results, self.BASELINE)}
+        assert set(metrics) == {"pipeline.throughput_per_second", "pipeline.bom_agent.p95_ms"}
+        assert metrics["pipeline.bom_agent.p95_ms"]["change"] == 0.5
+
+    def test_tiny_absolute_changes_ignored(self):
+        """Test sub-millisecond and small memory changes are noise, whatever the ratio."""
+        baseline = {"scenarios": {"fast": scenario(0.2, 0.3, 0.4, memory=10.0)}}
+        results = {"scenarios": {"fast": scenario(0.9, 1.0, 1.1, memory=40.0)}}
+        assert compare_to_baseline(results, baseline) == []
+
+    def test_new_scenarios_skipped(self):
+        """Test scenarios absent from the baseline are not compared."""
+        results = {"scenarios": {"workflow": scenario(1000.0, 2000.0, 3000.0)}}
+        assert compare_to_baseline(results, self.BASELINE) == []
+
+    def test_report_lists_regressions(self):
+        """Test the report shows scenarios, stages and regressions."""
+        results = {"scenarios": {"pipeline": scenario(100.0, 300.0, 400.0, stages={"bom_agent": scenario(50.0, 60.0, 70.0)})}}
+        report = format_report(results, compare_to_baseline(results, self.BASELINE))
+        assert "pipeline" in report
+        assert "  bom_agent" in report
+        assert "pipeline.p95_ms: 150.0 -> 300.0 (+100.0%)" in report
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
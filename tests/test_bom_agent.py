@@ -3,96 +3,12 @@
 import pytest
 import json
 from src.agents.bom_agent import (
-    extract_json_from_response,
     validate_bom_json,
-    parse_bom_response,
+    parse_structured_bom,
+    render_bom_text,
 )
 
 
-class TestJSONExtraction:
-    """Test JSON extraction from various response formats."""
-    
-    def test_extract_from_markdown_json_block(self):
-        """Test extracting JSON from ```json code block."""
-        response = """Here's the BOM:
-```json
-[
-  {
-    "serviceName": "Azure App Service",
-    "sku": "P1v2",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  }
-]
-```
-"""
-        result = extract_json_from_response(response)
-        assert result.strip().startswith("[")
-        assert "Azure App Service" in result
-    
-    def test_extract_from_generic_code_block(self):
-        """Test extracting JSON from generic ``` code block."""
-        response = """```
-[
-  {
-    "serviceName": "SQL Database",
-    "sku": "S1",
-    "quantity": 1,
-    "region": "West US",
-    "armRegionName": "westus",
-    "hours_per_month": 730
-  }
-]
-```"""
-        result = extract_json_from_response(response)
-        assert result.strip().startswith("[")
-        assert "SQL Database" in result
-    
-    def test_extract_raw_json_array(self):
-        """Test extracting raw JSON array without code blocks."""
-        response = """[
-  {
-    "serviceName": "Virtual Machines",
-    "sku": "Standard_D2s_v3",
-    "quantity": 2,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  }
-]"""
-        result = extract_json_from_response(response)
-        assert result.strip().startswith("[")
-        assert "Virtual Machines" in result
-    
-    def test_extract_json_with_surrounding_text(self):
-        """Test extracting JSON when surrounded by explanatory text."""
-        response = """Based on your requirements, here's the BOM:
-
-[
-  {
-    "serviceName": "Azure App Service",
-    "sku": "P1v2",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  }
-]
-
-This configuration should meet your needs."""
-        result = extract_json_from_response(response)
-        assert result.strip().startswith("[")
-        assert "Azure App Service" in result
-    
-    def test_extract_fails_when_no_json(self):
-        """Test that extraction fails gracefully when no JSON present."""
-        response = "I couldn't create a BOM for this request."
-        with pytest.raises(ValueError, match="Could not extract JSON"):
-            extract_json_from_response(response)
-
-
 class TestBOMValidation:
     """Test BOM JSON validation."""
     
@@ -303,86 +219,42 @@ class TestBOMValidation:
         validate_bom_json(bom)  # Should not raise
 
 
-class TestEndToEndParsing:
-    """Test end-to-end parsing and validation."""
-    
-    def test_parse_valid_response_with_code_block(self):
-        """Test parsing valid response with JSON in code block."""
-        response = """```json
-[
-  {
-    "serviceName": "Azure App Service",
-    "sku": "P1v2",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  }
-]
-```"""
-        result = parse_bom_response(response)
-        assert len(result) == 1
-        assert result[0]["serviceName"] == "Azure App Service"
-        assert result[0]["sku"] == "P1v2"
-        assert result[0]["quantity"] == 1
-    
-    def test_parse_multi_service_bom(self):
-        """Test parsing BOM with multiple services."""
-        response = """[
-  {
-    "serviceName": "Azure App Service",
-    "sku": "P1v2",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  },
-  {
-    "serviceName": "SQL Database",
-    "sku": "S1",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  },
-  {
-    "serviceName": "Azure Blob Storage",
-    "sku": "Standard_LRS",
-    "quantity": 1,
-    "region": "East US",
-    "armRegionName": "eastus",
-    "hours_per_month": 730
-  }
-]"""
-        result = parse_bom_response(response)
-        assert len(result) == 3
-        assert result[0]["serviceName"] == "Azure App Service"
-        assert result[1]["serviceName"] == "SQL Database"
-        assert result[2]["serviceName"] == "Azure Blob Storage"
-    
-    def test_parse_fails_on_invalid_json(self):
-        """Test parsing fails gracefully on invalid JSON."""
-        response = """```json
-[
-  {
-    "serviceName": "Azure App Service",
-    "sku": "P1v2",
-    missing closing brace
-]
-```"""
-        with pytest.raises(ValueError, match="Invalid JSON format"):
-            parse_bom_response(response)
-    
-    def test_parse_fails_on_missing_fields(self):
-        """Test parsing fails on validation error."""
-        response = """[
-  {
-    "serviceName": "Azure App Service",
-    "sku": "P1v2"
-  }
-]"""
-        with pytest.raises(ValueError, match="missing required fields"):
-            parse_bom_response(response)
+class TestStructuredBOM:
+    """Test parsing of schema-constrained BOM responses."""
+
+    ITEM = {
+        "serviceName": "Azure App Service",
+        "sku": "P1v2",
+        "quantity": 1,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": 730
+    }
+
+    def test_parse_structured_response(self):
+        """Test the summary and items are returned separately."""
+        response = json.dumps({"requirements_summary": "- Workload: Web app", "items": [self.ITEM]})
+        summary, items = parse_structured_bom(response)
+        assert summary == "- Workload: Web app"
+        assert items == [self.ITEM]
+
+    def test_structured_response_validated(self):
+        """Test structured items get the same validation as BOMs posted to the API."""
+        response = json.dumps({"requirements_summary": "", "items": [dict(self.ITEM, quantity=0)]})
+        with pytest.raises(ValueError, match="quantity must be positive"):
+            parse_structured_bom(response)
+
+    @pytest.mark.parametrize("response", ["not json", "[]", '{"requirements_summary": "x"}'])
+    def test_malformed_structured_response_rejected(self, response):
+        """Test non-objects and objects without items raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_structured_bom(response)
+
+    def test_render_bom_text(self):
+        """Test rendered BOM text has the requirements and the BOM as a JSON array."""
+        text = render_bom_text("- Region: East US", [self.ITEM])
+        assert text.startswith("=== CUSTOMER REQUIREMENTS ===\n- Region: East US")
+        assert json.loads(text.split("=== BILL OF MATERIALS ===\n", 1)[1]) == [self.ITEM]
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ from dotenv import load_dotenv
 from azure.identity.aio import DefaultAzureCredential
 from agent_framework_azure_ai import AzureAIAgentClient
 
-from src.agents.bom_agent import create_bom_agent, parse_bom_response
+from src.agents.bom_agent import create_bom_agent, parse_structured_bom
 
 
 async def test_bom_agent_simple_web_app():
@@ -55,7 +55,7 @@ We are DONE!"""
         print("\n\n=== Parsing and Validating BOM ===")
         
         try:
-            bom_data = parse_bom_response(response)
+            _, bom_data = parse_structured_bom(response)
             print(f"✅ Successfully parsed BOM with {len(bom_data)} items:")
             
             for item in bom_data:
@@ -130,7 +130,7 @@ We are DONE!"""
         print("\n\n=== Parsing and Validating BOM ===")
         
         try:
-            bom_data = parse_bom_response(response)
+            _, bom_data = parse_structured_bom(response)
             print(f"✅ Successfully parsed BOM with {len(bom_data)} items:")
             
             for item in bom_data:
@@ -206,7 +206,7 @@ We are DONE!"""
         print("\n\n=== Parsing and Validating BOM ===")
         
         try:
-            bom_data = parse_bom_response(response)
+            _, bom_data = parse_structured_bom(response)
             print(f"✅ Successfully parsed BOM with {len(bom_data)} items:")
             
             for item in bom_data:
@@ -0,0 +1,82 @@
+"""Test incremental parsing of streamed BOM Agent responses."""
+
+import json
+import pytest
+from src.bom_stream import BOMStreamParser
+
+ITEMS = [
+    {
+        "serviceName": "Azure App Service",
+        "sku": "P1v2",
+        "quantity": 1,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": 730
+    },
+    {
+        "serviceName": "SQL Database",
+        "sku": "S1",
+        "quantity": 2,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": 730
+    },
+]
+
+RESPONSE = json.dumps({
+    "requirements_summary": 'Web app with "items": [{tricky}] text and a \\ backslash',
+    "items": ITEMS,
+}, indent=2)
+
+
+def reject_zero_quantity(item, idx):
+    """Minimal per-item validator."""
+    if item["quantity"] <= 0:
+        raise ValueError(f"BOM item {idx}: quantity must be positive")
+
+
+class TestBOMStreamParser:
+    """Test items are emitted as soon as their objects close."""
+
+    def test_items_emitted_as_they_complete(self):
+        """Test each item is returned by the chunk that closes it."""
+        parser = BOMStreamParser()
+        first_end = RESPONSE.index("}", RESPONSE.index('"items": [')) + 1
+
+        assert parser.feed(RESPONSE[:first_end - 1]) == []
+        assert parser.feed(RESPONSE[first_end - 1:first_end]) == [ITEMS[0]]
+        assert parser.feed(RESPONSE[first_end:]) == [ITEMS[1]]
+        assert parser.items == ITEMS
+        assert parser.text == RESPONSE
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 17, 1000])
+    def test_any_chunking_yields_same_items(self, chunk_size):
+        """Test token boundaries never change the parsed items."""
+        parser = BOMStreamParser()
+        emitted = []
+        for start in range(0, len(RESPONSE), chunk_size):
+            emitted.extend(parser.feed(RESPONSE[start:start + chunk_size]))
+        assert emitted == ITEMS
+
+    def test_brackets_inside_strings_ignored(self):
+        """Test braces and quotes inside the summary are not mistaken for items."""
+        parser = BOMStreamParser()
+        parser.feed(RESPONSE[:RESPONSE.index('"items": [\n')])
+        assert parser.items == []
+
+    def test_nested_objects_stay_in_their_item(self):
+        """Test objects nested in an item don't end it early."""
+        item = dict(ITEMS[0], tags={"env": "prod"})
+        parser = BOMStreamParser()
+        assert parser.feed(json.dumps({"requirements_summary": "", "items": [item]})) == [item]
+
+    def test_invalid_item_raises_when_it_closes(self):
+        """Test per-item validation fails fast, before the response ends."""
+        bad = json.dumps({"requirements_summary": "", "items": [dict(ITEMS[0], quantity=0), ITEMS[1]]})
+        parser = BOMStreamParser(validate_item=reject_zero_quantity)
+        with pytest.raises(ValueError, match="BOM item 0: quantity must be positive"):
+            parser.feed(bad[:bad.index("}") + 1])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,110 @@
+"""Test the compact hand-off between pipeline stages."""
+
+import json
+import pytest
+from src.handoff import (
+    PRICING_INPUT_HEADER,
+    PROPOSAL_INPUT_HEADER,
+    StageHandoff,
+    proposal_line_items,
+    render_pricing_input,
+    render_proposal_input,
+)
+
+BOM_ITEMS = [
+    {"serviceName": "Virtual Machines", "sku": "Standard_D4s_v5", "quantity": 2,
+     "region": "East US", "armRegionName": "eastus", "hours_per_month": 730},
+    {"serviceName": "SQL Database", "sku": "GP_Gen5_4", "quantity": 1,
+     "region": "East US", "armRegionName": "eastus", "hours_per_month": 730},
+]
+
+PRICING = {
+    "items": [
+        {"service": "Virtual Machines", "sku": "Standard_D4s_v5", "quantity": 2, "hourly_price": 0.192,
+         "monthly_cost": 280.32, "note": "",
+         "savings_options": {"1_year_savings_plan": 224.26, "3_year_savings_plan": 182.21}},
+        {"service": "SQL Database", "sku": "GP_Gen5_4", "quantity": 1, "hourly_price": 0.0,
+         "monthly_cost": 0.0, "note": "No pricing data found for GP_Gen5_4 in eastus",
+         "savings_options": {"1_year_savings_plan": 0.0, "3_year_savings_plan": 0.0}},
+    ],
+    "total_monthly": 280.32,
+    "currency": "USD",
+    "prices_as_of": "2026-10-17",
+    "region_comparison": {
+        "regions": ["eastus", "westeurope"],
+        "matrix": [[280.32, None], [300.0, 310.0]],
+        "ranking": [{"rank": 1, "region": "eastus", "total_monthly": 280.32}],
+        "cheapest_region": "eastus",
+    },
+}
+
+
+def payload(text, header):
+    """Parse the JSON object after a hand-off header."""
+    first_line, body = text.split("\n", 1)
+    assert first_line == header
+    assert "\n" not in body and ": " not in body
+    return json.loads(body)
+
+
+class TestPricingInput:
+    """Test the Pricing Agent's input."""
+
+    def test_priced_lines_without_bom(self):
+        """Test the Pricing Agent gets the summary, priced lines and totals but not the BOM or matrix."""
+        handoff = StageHandoff("Web app in East US", BOM_ITEMS, pricing=PRICING)
+        data = payload(render_pricing_input(handoff), PRICING_INPUT_HEADER)
+        assert data["requirements_summary"] == "Web app in East US"
+        assert data["items"] == PRICING["items"]
+        assert data["total_monthly"] == 280.32
+        assert data["region_comparison"] == {
+            "cheapest_region": "eastus",
+            "ranking": PRICING["region_comparison"]["ranking"],
+        }
+        assert "armRegionName" not in render_pricing_input(handoff)
+
+    def test_requires_pricing(self):
+        """Test rendering before pricing is a ValueError."""
+        with pytest.raises(ValueError):
+            render_pricing_input(StageHandoff("summary", BOM_ITEMS))
+
+
+class TestProposalInput:
+    """Test the Proposal Agent's input."""
+
+    def test_lines_merge_bom_and_pricing(self):
+        """Test each line carries its BOM fields and prices once, with notes only where set."""
+        lines = proposal_line_items(StageHandoff("summary", BOM_ITEMS, pricing=PRICING))
+        assert lines[0] == {
+            "service": "Virtual Machines",
+            "sku": "Standard_D4s_v5",
+            "quantity": 2,
+            "region": "East US",
+            "hours_per_month": 730,
+            "hourly_price": 0.192,
+            "monthly_cost": 280.32,
+            "savings_options": {"1_year_savings_plan": 224.26, "3_year_savings_plan": 182.21},
+        }
+        assert lines[1]["note"] == "No pricing data found for GP_Gen5_4 in eastus"
+
+    def test_includes_narrative_and_totals(self):
+        """Test the proposal input carries the resources, totals and the cost analysis narrative."""
+        handoff = StageHandoff("summary", BOM_ITEMS, pricing=PRICING, pricing_narrative="\nCompute dominates.\n")
+        data = payload(render_proposal_input(handoff), PROPOSAL_INPUT_HEADER)
+        assert data["cost_analysis"] == "Compute dominates."
+        assert data["resources"][1] == {
+            "service": "SQL Database", "sku": "GP_Gen5_4", "quantity": 1, "region": "East US",
+        }
+        assert data["currency"] == "USD"
+        assert data["prices_as_of"] == "2026-10-17"
+        assert "matrix" not in data["region_comparison"]
+
+    def test_mismatched_lines_rejected(self):
+        """Test pricing lines that don't match the BOM are a ValueError."""
+        pricing = dict(PRICING, items=PRICING["items"][:1])
+        with pytest.raises(ValueError):
+            render_proposal_input(StageHandoff("summary", BOM_ITEMS, pricing=pricing))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
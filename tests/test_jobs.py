@@ -0,0 +1,229 @@
+"""Test background job queue and job stores."""
+
+import asyncio
+import threading
+import time
+import pytest
+from src.jobs import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    InMemoryJobStore,
+    JobQueue,
+    JobQueueFull,
+    SQLiteJobStore,
+    create_job_store,
+)
+from src.runtime import BackgroundEventLoop
+
+
+@pytest.fixture
+def runtime():
+    """Running background event loop, stopped after the test."""
+    runtime = BackgroundEventLoop()
+    yield runtime
+    runtime.stop()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each job store backend."""
+    if request.param == "memory":
+        yield InMemoryJobStore()
+    else:
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+        yield store
+        store.close()
+
+
+def wait_for_status(store, job_id, statuses, timeout=2.0):
+    """Poll a job until it reaches one of the given statuses."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} stuck in {store.get(job_id)['status']}")
+
+
+class TestJobQueue:
+    """Test submitting, running and bounding jobs."""
+
+    def test_submit_returns_before_job_runs(self, runtime, store):
+        """Test submit hands back a queued job ID immediately."""
+        release = threading.Event()
+
+        async def runner(report):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            return {"proposal": "done"}
+
+        queue = JobQueue(store, runtime)
+        job = queue.submit(runner, session_id="s1")
+
+        assert job["status"] == JOB_QUEUED
+        assert store.get(job["job_id"])["session_id"] == "s1"
+        release.set()
+        finished = wait_for_status(store, job["job_id"], {JOB_SUCCEEDED})
+        assert finished["result"] == {"proposal": "done"}
+
+    def test_progress_is_persisted(self, runtime, store):
+        """Test reported stage and outputs are visible while the job runs."""
+        release = threading.Event()
+
+        async def runner(report):
+            await report(stage="bom_agent", outputs={"bom": "[...]"})
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            return {}
+
+        queue = JobQueue(store, runtime)
+        job_id = queue.submit(runner)["job_id"]
+
+        deadline = time.time() + 2
+        while store.get(job_id)["stage"] is None and time.time() < deadline:
+            time.sleep(0.01)
+        job = store.get(job_id)
+        assert job["status"] == JOB_RUNNING
+        assert job["outputs"] == {"bom": "[...]"}
+        release.set()
+        wait_for_status(store, job_id, {JOB_SUCCEEDED})
+
+    def test_store_writes_do_not_block_the_event_loop(self, runtime):
+        """Test a slow store write leaves the loop free for other coroutines."""
+        class SlowStore(InMemoryJobStore):
+            def update(self, job_id, **fields):
+                time.sleep(0.2)
+                super().update(job_id, **fields)
+
+        store = SlowStore()
+        ticks = []
+
+        async def ticker():
+            for _ in range(10):
+                ticks.append(time.time())
+                await asyncio.sleep(0.01)
+
+        async def runner(report):
+            await report(stage="bom_agent")
+            return {}
+
+        queue = JobQueue(store, runtime)
+        job_id = queue.submit(runner)["job_id"]
+        runtime.run(ticker(), timeout=2)
+        assert ticks[-1] - ticks[0] < 0.2
+        wait_for_status(store, job_id, {JOB_SUCCEEDED})
+
+    def test_failures_are_recorded(self, runtime, store):
+        """Test an exception in the job marks it failed with the error."""
+        async def runner(report):
+            raise ValueError("BOM parsing failed")
+
+        queue = JobQueue(store, runtime)
+        job = wait_for_status(store, queue.submit(runner)["job_id"], {JOB_FAILED})
+
+        assert job["error"] == "BOM parsing failed"
+        assert queue.stats()["failed"] == 1
+
+    def test_timeout_fails_job(self, runtime, store):
+        """Test jobs running past the timeout fail."""
+        async def runner(report):
+            await asyncio.sleep(60)
+
+        queue = JobQueue(store, runtime, timeout_seconds=0.05)
+        job = wait_for_status(store, queue.submit(runner)["job_id"], {JOB_FAILED})
+
+        assert "did not complete" in job["error"]
+
+    def test_concurrency_is_bounded(self, runtime, store):
+        """Test at most max_concurrency jobs run at once; the rest stay queued."""
+        running = []
+        peak = []
+        release = threading.Event()
+
+        async def runner(report):
+            running.append(1)
+            peak.append(len(running))
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            running.pop()
+            return {}
+
+        queue = JobQueue(store, runtime, max_concurrency=2)
+        job_ids = [queue.submit(runner)["job_id"] for _ in range(5)]
+        time.sleep(0.1)
+
+        assert max(peak) == 2
+        assert sum(store.get(job_id)["status"] == JOB_QUEUED for job_id in job_ids) == 3
+        release.set()
+        for job_id in job_ids:
+            wait_for_status(store, job_id, {JOB_SUCCEEDED})
+
+    def test_full_queue_rejects_submissions(self, runtime, store):
+        """Test submissions beyond max_pending raise JobQueueFull."""
+        release = threading.Event()
+
+        async def runner(report):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            return {}
+
+        queue = JobQueue(store, runtime, max_concurrency=1, max_pending=2)
+        queue.submit(runner)
+        queue.submit(runner)
+        with pytest.raises(JobQueueFull):
+            queue.submit(runner)
+
+        assert queue.stats()["rejected"] == 1
+        release.set()
+
+    def test_fail_active_marks_pending_jobs(self, runtime, store):
+        """Test jobs still pending at shutdown are marked failed for pollers."""
+        async def runner(report):
+            await asyncio.sleep(60)
+
+        queue = JobQueue(store, runtime)
+        job_id = queue.submit(runner)["job_id"]
+
+        assert queue.fail_active() == 1
+        assert store.get(job_id)["status"] == JOB_FAILED
+        assert queue.stats()["pending"] == 0
+
+
+class TestJobStores:
+    """Test job expiry and sharing."""
+
+    def test_finished_jobs_expire(self):
+        """Test jobs are dropped once idle past the result TTL."""
+        now = [1000.0]
+        store = InMemoryJobStore(ttl_seconds=60, clock=lambda: now[0])
+        store.create({"job_id": "j1", "status": JOB_SUCCEEDED})
+
+        now[0] += 61
+        assert store.get("j1") is None
+        assert store.evict_expired() == 1
+
+    def test_jobs_visible_across_workers(self, tmp_path):
+        """Test a job written by one worker can be polled from another."""
+        path = str(tmp_path / "jobs.db")
+        worker_a = SQLiteJobStore(path)
+        worker_b = SQLiteJobStore(path)
+
+        worker_a.create({"job_id": "j1", "status": JOB_QUEUED})
+        worker_a.update("j1", status=JOB_RUNNING, stage="pricing_agent")
+        assert worker_b.get("j1")["stage"] == "pricing_agent"
+
+        worker_a.close()
+        worker_b.close()
+
+    def test_unknown_scheme_rejected(self):
+        """Test unsupported URLs raise ValueError."""
+        assert isinstance(create_job_store("memory://"), InMemoryJobStore)
+        with pytest.raises(ValueError, match="Unsupported job store URL"):
+            create_job_store("redis://localhost:6379/0")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,42 @@
+"""Test Azure Pricing MCP result handling."""
+
+import pytest
+from types import SimpleNamespace
+from src.mcp_results import is_mcp_error_result, mcp_result_text
+
+
+def text_contents(text):
+    """Build an MCP call_tool result holding one text content."""
+    return [SimpleNamespace(text=text)]
+
+
+class TestMCPResults:
+    """Test flattening MCP results and spotting error payloads."""
+
+    def test_result_text(self):
+        """Test strings and lists of text contents flatten to text."""
+        assert mcp_result_text('{"a": 1}') == '{"a": 1}'
+        assert mcp_result_text(text_contents("ab") + text_contents("c")) == "abc"
+
+    @pytest.mark.parametrize("result", [
+        '{"error": "Upstream pricing API unavailable"}',
+        text_contents('{"error": "Rate limited"}'),
+        SimpleNamespace(isError=True, content=[]),
+    ])
+    def test_error_results(self, result):
+        """Test error payloads are recognized, so they are not cached."""
+        assert is_mcp_error_result(result)
+
+    @pytest.mark.parametrize("result", [
+        '{"on_demand_pricing": {"hourly_rate": 0.096}}',
+        text_contents('{"error": null, "items": []}'),
+        text_contents("Found 3 SKUs"),
+        "[]",
+    ])
+    def test_data_results(self, result):
+        """Test prices, empty results and plain text are treated as data."""
+        assert not is_mcp_error_result(result)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+"""Test content-addressed pipeline result cache keys."""
+
+import pytest
+from src.pipeline_cache import (
+    canonicalize_requirements,
+    get_bom_cache,
+    get_pipeline_cache,
+    instructions_version,
+    make_bom_cache_key,
+    make_pipeline_cache_key,
+)
+
+REQUIREMENTS = (
+    "user: I need a web app\n"
+    "assistant: Requirements summary:\n"
+    "- Workload: Web application\n"
+    "- Scale: 10,000 users\n"
+    "- Region: East US\n"
+    "We are DONE!"
+)
+
+
+class TestCanonicalizeRequirements:
+    """Test near-identical requirements share a canonical form."""
+
+    def test_ignores_case_whitespace_and_list_bullets(self):
+        """Test formatting-only differences canonicalize identically."""
+        reworded = REQUIREMENTS.upper().replace("\n", "  \n\t").replace("- ", "* ")
+        assert canonicalize_requirements(reworded) == canonicalize_requirements(REQUIREMENTS)
+
+    def test_ignores_completion_marker(self):
+        """Test the Question Agent's DONE marker does not affect the key."""
+        without_marker = REQUIREMENTS.replace("We are DONE!", "")
+        assert canonicalize_requirements(without_marker) == canonicalize_requirements(REQUIREMENTS)
+
+    def test_keeps_sizing_and_skus(self):
+        """Test numbers, decimals and SKU names survive canonicalization."""
+        canonical = canonicalize_requirements("2x  Standard_D2s_v3, 99.9% SLA,\n$500 budget.")
+        assert canonical == "2x standard_d2s_v3, 99.9% sla, $500 budget."
+
+    @pytest.mark.parametrize("first, second", [
+        ("< 1000 users", "> 1000 users"),
+        ("2-4 vCPU", "24 vCPU"),
+        ("Storage: 1/2 TB", "Storage: 12 TB"),
+        ("Scale: +5 nodes", "Scale: 5 nodes"),
+        ("SLA >= 99.9%", "SLA = 99.9%"),
+    ])
+    def test_symbols_that_change_meaning_change_key(self, first, second):
+        """Test requirements differing only in symbols get different keys."""
+        assert canonicalize_requirements(first) != canonicalize_requirements(second)
+        assert make_pipeline_cache_key(first, "v1", "2025-01-01") != make_pipeline_cache_key(second, "v1", "2025-01-01")
+        assert make_bom_cache_key(first, "v1") != make_bom_cache_key(second, "v1")
+
+
+class TestPipelineCacheKey:
+    """Test what a cached result is keyed on."""
+
+    def test_equivalent_requirements_share_key(self):
+        """Test reformatted requirements hit the same entry."""
+        key = make_pipeline_cache_key(REQUIREMENTS, "v1", "2025-01-01")
+        assert make_pipeline_cache_key(REQUIREMENTS.lower(), "v1", "2025-01-01") == key
+
+    @pytest.mark.parametrize("requirements, agents, prices", [
+        (REQUIREMENTS.replace("10,000", "50,000"), "v1", "2025-01-01"),
+        (REQUIREMENTS, "v2", "2025-01-01"),
+        (REQUIREMENTS, "v1", "2025-02-01"),
+    ])
+    def test_any_input_change_misses(self, requirements, agents, prices):
+        """Test changed requirements, instructions or prices produce a new key."""
+        key = make_pipeline_cache_key(REQUIREMENTS, "v1", "2025-01-01")
+        assert make_pipeline_cache_key(requirements, agents, prices) != key
+
+    def test_pricing_options_change_key(self):
+        """Test a different currency, region or discount is a different result."""
+        key = make_pipeline_cache_key(REQUIREMENTS, "v1", "2025-01-01")
+        usd = {"currency": "USD", "region": None, "discount_percent": 0.0}
+        eur = dict(usd, currency="EUR")
+        assert make_pipeline_cache_key(REQUIREMENTS, "v1", "2025-01-01", usd) != key
+        assert (
+            make_pipeline_cache_key(REQUIREMENTS, "v1", "2025-01-01", eur)
+            != make_pipeline_cache_key(REQUIREMENTS, "v1", "2025-01-01", usd)
+        )
+
+    def test_instructions_version_tracks_every_part(self):
+        """Test editing any instruction string changes the version."""
+        version = instructions_version("bom", "pricing", "proposal")
+        assert instructions_version("bom", "pricing", "proposal") == version
+        assert instructions_version("bom", "pricing", "proposal v2") != version
+        assert instructions_version("bompricing", "", "proposal") != version
+
+    def test_process_wide_cache_from_environment(self, monkeypatch):
+        """Test the shared cache honours PIPELINE_CACHE_* settings."""
+        monkeypatch.setenv("PIPELINE_CACHE_MAX_ENTRIES", "3")
+        monkeypatch.setenv("PIPELINE_CACHE_TTL_SECONDS", "60")
+        get_pipeline_cache.cache_clear()
+        try:
+            cache = get_pipeline_cache()
+            assert cache.max_entries == 3
+            assert cache.ttl_seconds == 60
+            assert get_pipeline_cache() is cache
+        finally:
+            get_pipeline_cache.cache_clear()
+
+
+class TestBOMCacheKey:
+    """Test what a memoized BOM is keyed on."""
+
+    def test_keyed_on_requirements_and_bom_version(self):
+        """Test reformatted requirements share a BOM and a new BOM version misses."""
+        key = make_bom_cache_key(REQUIREMENTS, "bom-v1")
+        assert make_bom_cache_key(REQUIREMENTS.lower(), "bom-v1") == key
+        assert make_bom_cache_key(REQUIREMENTS, "bom-v2") != key
+        assert make_bom_cache_key(REQUIREMENTS.replace("East US", "West US"), "bom-v1") != key
+
+    def test_process_wide_cache_from_environment(self, monkeypatch):
+        """Test the shared BOM cache honours BOM_CACHE_* settings."""
+        monkeypatch.setenv("BOM_CACHE_MAX_ENTRIES", "5")
+        monkeypatch.setenv("BOM_CACHE_TTL_SECONDS", "30")
+        get_bom_cache.cache_clear()
+        try:
+            cache = get_bom_cache()
+            assert cache.max_entries == 5
+            assert cache.ttl_seconds == 30
+            assert cache is not get_pipeline_cache()
+        finally:
+            get_bom_cache.cache_clear()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,224 @@
+"""Test local Azure retail price snapshot."""
+
+import asyncio
+import json
+import pytest
+from src.pricing.catalog import (
+    PriceCatalog,
+    _monthly_from_unit,
+    create_catalog_price_lookup,
+    estimate_quotes,
+    iter_export_items,
+    main,
+)
+from src.pricing.engine import USAGE_BASED_NOTE
+
+EXPORT_ITEMS = [
+    {
+        "currencyCode": "USD",
+        "retailPrice": 0.096,
+        "unitPrice": 0.096,
+        "armRegionName": "eastus",
+        "productName": "Virtual Machines DSv3 Series",
+        "skuName": "D2s v3",
+        "armSkuName": "Standard_D2s_v3",
+        "serviceName": "Virtual Machines",
+        "meterName": "D2s v3",
+        "unitOfMeasure": "1 Hour",
+        "type": "Consumption",
+        "isPrimaryMeterRegion": True,
+        "savingsPlan": [
+            {"unitPrice": 0.0672, "retailPrice": 0.0672, "term": "1 Year"},
+            {"unitPrice": 0.0461, "retailPrice": 0.0461, "term": "3 Years"},
+        ],
+    },
+    {
+        "currencyCode": "USD",
+        "unitPrice": 0.192,
+        "armRegionName": "eastus",
+        "productName": "Virtual Machines DSv3 Series Windows",
+        "skuName": "D2s v3",
+        "armSkuName": "Standard_D2s_v3",
+        "serviceName": "Virtual Machines",
+        "meterName": "D2s v3",
+        "unitOfMeasure": "1 Hour",
+        "type": "Consumption",
+        "isPrimaryMeterRegion": True,
+    },
+    {
+        "currencyCode": "USD",
+        "unitPrice": 0.0192,
+        "armRegionName": "eastus",
+        "productName": "Virtual Machines DSv3 Series",
+        "skuName": "D2s v3 Spot",
+        "armSkuName": "Standard_D2s_v3",
+        "serviceName": "Virtual Machines",
+        "meterName": "D2s v3 Spot",
+        "unitOfMeasure": "1 Hour",
+        "type": "Consumption",
+        "isPrimaryMeterRegion": True,
+    },
+    {
+        "currencyCode": "USD",
+        "unitPrice": 15.0,
+        "armRegionName": "eastus",
+        "productName": "SQL Database Single Standard",
+        "skuName": "S1",
+        "armSkuName": "",
+        "serviceName": "SQL Database",
+        "meterName": "S1 DTUs",
+        "unitOfMeasure": "1/Month",
+        "type": "Consumption",
+        "isPrimaryMeterRegion": True,
+    },
+]
+
+
+def make_item(service="Virtual Machines", sku="Standard_D2s_v3", region="eastus"):
+    """Build a valid BOM item."""
+    return {
+        "serviceName": service,
+        "sku": sku,
+        "quantity": 1,
+        "region": "East US",
+        "armRegionName": region,
+        "hours_per_month": 730,
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Catalog loaded with the sample export."""
+    catalog = PriceCatalog(str(tmp_path / "prices.db"))
+    catalog.ingest(EXPORT_ITEMS, source="test", snapshot_time="2026-10-01T00:00:00Z")
+    yield catalog
+    catalog.close()
+
+
+class TestIngest:
+    """Test bulk loading of Retail Prices API exports."""
+
+    def test_ingest_records_snapshot_metadata(self, catalog):
+        """Test ingest stores rows and freshness metadata."""
+        info = catalog.snapshot_info()
+        assert info["snapshot_time"] == "2026-10-01T00:00:00Z"
+        assert info["source"] == "test"
+        assert info["row_count"] == "6"
+        assert catalog.snapshot_time == "2026-10-01T00:00:00Z"
+
+    def test_ingest_replaces_previous_snapshot(self, catalog):
+        """Test re-ingesting replaces rather than appends."""
+        catalog.ingest(EXPORT_ITEMS[3:], snapshot_time="2026-11-01T00:00:00Z")
+        assert catalog.snapshot_info()["row_count"] == "1"
+        assert catalog.estimate(make_item()) is None
+
+    def test_failed_ingest_keeps_previous_snapshot(self, catalog):
+        """Test an export failing partway leaves the old rows, metadata and indexes in place."""
+        def broken_export():
+            yield EXPORT_ITEMS[3]
+            raise ValueError("truncated export")
+
+        before = catalog.estimate(make_item())
+        with pytest.raises(ValueError, match="truncated export"):
+            catalog.ingest(broken_export(), snapshot_time="2026-11-01T00:00:00Z")
+
+        info = catalog.snapshot_info()
+        assert info["snapshot_time"] == "2026-10-01T00:00:00Z"
+        assert info["row_count"] == "6"
+        assert catalog.estimate(make_item()) == before
+        indexes = catalog._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+        assert {"idx_prices_sku", "idx_prices_arm_sku"} <= {name for (name,) in indexes}
+
+    def test_iter_export_items_formats(self, tmp_path):
+        """Test API pages, arrays and JSON Lines are all accepted."""
+        page = tmp_path / "page.json"
+        page.write_text(json.dumps({"BillingCurrency": "USD", "Items": EXPORT_ITEMS}))
+        lines = tmp_path / "items.jsonl"
+        lines.write_text("\n".join(json.dumps(item) for item in EXPORT_ITEMS))
+
+        assert len(list(iter_export_items(str(page)))) == 4
+        assert len(list(iter_export_items(str(lines)))) == 4
+
+    def test_cli_ingest(self, tmp_path, capsys):
+        """Test the ingest command loads an export file."""
+        export = tmp_path / "export.json"
+        export.write_text(json.dumps(EXPORT_ITEMS))
+        db = tmp_path / "cli.db"
+
+        main(["--db", str(db), "ingest", str(export), "--as-of", "2026-10-01T00:00:00Z"])
+
+        assert "Loaded 6 price rows" in capsys.readouterr().out
+        catalog = PriceCatalog(str(db))
+        assert catalog.snapshot_time == "2026-10-01T00:00:00Z"
+        catalog.close()
+
+
+class TestEstimate:
+    """Test pricing BOM items from the snapshot."""
+
+    def test_hourly_vm_price_prefers_linux_non_spot(self, catalog):
+        """Test VM lookup by ARM SKU name ignores Windows and Spot meters."""
+        quote = catalog.estimate(make_item())
+        assert quote["hourly_price"] == 0.096
+        assert quote["monthly_cost"] == pytest.approx(70.08)
+        assert quote["savings_options"]["1_year_savings_plan"] == pytest.approx(49.056)
+        assert quote["savings_options"]["3_year_savings_plan"] == pytest.approx(33.653)
+
+    def test_monthly_unit_price(self, catalog):
+        """Test monthly meters are not multiplied by hours."""
+        quote = catalog.estimate(make_item(service="sql database", sku="s1"))
+        assert quote["monthly_cost"] == 15.0
+        assert quote["savings_options"]["1_year_savings_plan"] == 0.0
+
+    @pytest.mark.parametrize("unit, hourly, monthly", [
+        ("1 Hour", 1.0, 730.0),
+        ("100 Hours", 0.01, 7.3),
+        ("1/Day", 1.0 / 24, 730.0 / 24),
+        ("10/Month", 0.1 / 730, 0.1),
+    ])
+    def test_unit_quantity_divided_out(self, unit, hourly, monthly):
+        """Test multi-unit meters are priced per single hour, day or month."""
+        quote = _monthly_from_unit(1.0, unit, 730)
+        assert quote["hourly_price"] == pytest.approx(hourly)
+        assert quote["monthly_cost"] == pytest.approx(monthly)
+        assert quote["note"] == ""
+
+    @pytest.mark.parametrize("unit", ["1 GB/Month", "10K", "1M"])
+    def test_usage_based_units_noted(self, unit):
+        """Test usage-based meters carry a note instead of posing as a fixed monthly cost."""
+        quote = _monthly_from_unit(0.02, unit, 730)
+        assert quote["hourly_price"] == 0.0
+        assert quote["monthly_cost"] == 0.02
+        assert quote["note"].startswith(USAGE_BASED_NOTE)
+        assert unit in quote["note"]
+
+    def test_missing_price_returns_none(self, catalog):
+        """Test unknown SKUs, regions and currencies are misses."""
+        assert catalog.estimate(make_item(region="westeurope")) is None
+        assert catalog.estimate(make_item(sku="Standard_E2s_v3")) is None
+        assert catalog.estimate(make_item(), currency="EUR") is None
+
+    def test_catalog_price_lookup(self, catalog):
+        """Test the catalog lookup plugs into the pricing engine."""
+        lookup = create_catalog_price_lookup(catalog)
+        quote = asyncio.run(lookup(make_item(), "USD"))
+        assert quote["hourly_price"] == 0.096
+
+    def test_known_quotes_reused(self, catalog):
+        """Test quotes estimated up front are served without querying the snapshot again."""
+        quotes = estimate_quotes(catalog, [make_item(), make_item(region="westeurope")])
+        assert sorted(quote is None for quote in quotes.values()) == [False, True]
+        lookup = create_catalog_price_lookup(catalog, known_quotes=quotes)
+        catalog.estimate = None
+        assert asyncio.run(lookup(make_item(), "USD"))["hourly_price"] == 0.096
+        assert asyncio.run(lookup(make_item(region="westeurope"), "USD")) is None
+
+    def test_list_skus(self, catalog):
+        """Test SKU listing excludes Spot meters."""
+        skus = catalog.list_skus("Virtual Machines", "eastus")
+        assert [sku["sku"] for sku in skus] == ["D2s v3"]
+        assert skus[0]["unit_price"] == 0.096
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,218 @@
+"""Test TTL + LRU pricing cache."""
+
+import asyncio
+import pytest
+from src.pricing.cache import SingleFlight, TTLCache, make_cache_key
+from src.pricing.fanout import resilient_lookup
+
+
+class FakeClock:
+    """Manually advanced clock for expiry tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCacheKey:
+    """Test normalization of tool arguments into cache keys."""
+
+    def test_equivalent_arguments_share_key(self):
+        """Test case, whitespace, argument order and None values are ignored."""
+        first = make_cache_key("azure_cost_estimate", {
+            "service_name": "Virtual Machines",
+            "sku_name": "Standard_D2s_v3",
+            "region": "eastus",
+            "hours_per_month": 730,
+        })
+        second = make_cache_key("azure_cost_estimate", {
+            "region": " EastUS",
+            "hours_per_month": 730.0,
+            "sku_name": "standard_d2s_v3",
+            "service_name": "virtual machines",
+            "currency_code": None,
+        })
+        assert first == second
+
+    def test_different_tools_or_values_differ(self):
+        """Test tool name and argument values are part of the key."""
+        args = {"service_hint": "web app"}
+        assert make_cache_key("azure_sku_discovery", args) != make_cache_key("azure_price_search", args)
+        assert make_cache_key("azure_sku_discovery", args) != make_cache_key(
+            "azure_sku_discovery", {"service_hint": "database"}
+        )
+
+
+class TestTTLCache:
+    """Test expiry, eviction and counters."""
+
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted."""
+        cache = TTLCache()
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_entries_expire_after_ttl(self):
+        """Test entries are dropped once their TTL elapses."""
+        clock = FakeClock()
+        cache = TTLCache(ttl_seconds=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl_seconds=100)
+
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_clear_resets_counters(self):
+        """Test clear empties the cache and resets statistics."""
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 0
+
+
+class TestSingleFlight:
+    """Test identical in-flight calls share one upstream request."""
+
+    def test_concurrent_identical_calls_coalesced(self):
+        """Test callers arriving while a call is in flight share its result."""
+        group = SingleFlight()
+        upstream = []
+
+        async def call():
+            upstream.append(1)
+            await asyncio.sleep(0.01)
+            return {"hourly_price": 0.1}
+
+        async def scenario():
+            return await asyncio.gather(*(group.do("key", call) for _ in range(5)))
+
+        results = asyncio.run(scenario())
+        assert len(upstream) == 1
+        assert all(result is results[0] for result in results)
+        assert group.stats() == {"in_flight": 0, "calls": 1, "coalesced": 4}
+
+    def test_different_keys_and_later_calls_not_shared(self):
+        """Test only identical, overlapping calls are coalesced."""
+        group = SingleFlight()
+        upstream = []
+
+        async def call():
+            upstream.append(1)
+            await asyncio.sleep(0)
+            return len(upstream)
+
+        async def scenario():
+            await asyncio.gather(group.do("a", call), group.do("b", call))
+            await group.do("a", call)
+
+        asyncio.run(scenario())
+        assert len(upstream) == 3
+
+    def test_exception_shared_by_every_caller(self):
+        """Test a failed upstream call fails every waiting caller and is not kept."""
+        group = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise ConnectionError("MCP unavailable")
+
+        async def scenario():
+            return await asyncio.gather(
+                *(group.do("key", call) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert group.stats()["in_flight"] == 0
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test the shared call survives one waiting caller being cancelled."""
+        group = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.02)
+            return "quote"
+
+        async def scenario():
+            first = asyncio.create_task(group.do("key", call))
+            second = asyncio.create_task(group.do("key", call))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == "quote"
+
+    def test_abandoned_call_cancelled_and_forgotten(self):
+        """Test a call is cancelled once every waiting caller has timed out."""
+        group = SingleFlight()
+        cancelled = []
+
+        async def call():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        async def scenario():
+            results = await asyncio.gather(
+                *(asyncio.wait_for(group.do("key", call), 0.01) for _ in range(2)),
+                return_exceptions=True,
+            )
+            in_flight = group.stats()["in_flight"]
+            await asyncio.sleep(0.01)
+            return results, in_flight, list(cancelled)
+
+        results, in_flight, cancelled_before_exit = asyncio.run(scenario())
+        assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+        assert in_flight == 0
+        assert cancelled_before_exit == [1]
+
+    def test_timed_out_lookup_retried_upstream(self):
+        """Test a retry after a timeout makes a fresh upstream call instead of joining the hung one."""
+        group = SingleFlight()
+        upstream = []
+
+        async def call():
+            upstream.append(1)
+            if len(upstream) == 1:
+                await asyncio.sleep(10)
+            return {"hourly_price": 0.1}
+
+        async def lookup(item, currency):
+            return await group.do(make_cache_key("azure_cost_estimate", item), call)
+
+        wrapped = resilient_lookup(lookup, timeout=0.05, retries=2, backoff=0.0)
+        quote = asyncio.run(wrapped({"sku": "D2s_v3"}, "USD"))
+        assert quote == {"hourly_price": 0.1}
+        assert len(upstream) == 2
+        assert group.stats() == {"in_flight": 0, "calls": 2, "coalesced": 0}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,298 @@
+"""Test deterministic BOM pricing engine."""
+
+import asyncio
+import pytest
+from src.pricing.engine import (
+    PriceLookupPrefetcher,
+    PricingOptions,
+    apply_discount,
+    apply_region_override,
+    first_available_lookup,
+    has_failed_lookups,
+    normalize_cost_estimate,
+    price_bom,
+    format_pricing_data,
+    region_display_name,
+)
+
+
+def make_item(service="Virtual Machines", sku="Standard_D2s_v3", quantity=1, hours=730):
+    """Build a valid BOM item."""
+    return {
+        "serviceName": service,
+        "sku": sku,
+        "quantity": quantity,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": hours,
+    }
+
+
+class TestNormalizeCostEstimate:
+    """Test reduction of azure_cost_estimate payloads to quotes."""
+
+    def test_on_demand_and_savings_plans(self):
+        """Test extracting on-demand and savings plan prices."""
+        estimate = {
+            "on_demand_pricing": {"hourly_rate": 0.096, "monthly_cost": 70.08},
+            "savings_plans": [
+                {"term": "1 Year", "hourly_rate": 0.0672},
+                {"term": "3 Years", "monthly_cost": 33.58},
+            ],
+        }
+        quote = normalize_cost_estimate(estimate, 730)
+        assert quote["hourly_price"] == 0.096
+        assert quote["monthly_cost"] == 70.08
+        assert quote["savings_options"]["1_year_savings_plan"] == pytest.approx(49.056)
+        assert quote["savings_options"]["3_year_savings_plan"] == 33.58
+
+    def test_monthly_derived_from_hourly(self):
+        """Test monthly cost is computed when only hourly rate is given."""
+        quote = normalize_cost_estimate({"hourly_rate": 0.1}, 100)
+        assert quote["monthly_cost"] == pytest.approx(10.0)
+        assert quote["savings_options"]["1_year_savings_plan"] == 0.0
+
+    def test_error_payload_returns_none(self):
+        """Test error responses produce no quote."""
+        assert normalize_cost_estimate({"error": "SKU not found"}, 730) is None
+        assert normalize_cost_estimate({"on_demand_pricing": {}}, 730) is None
+
+
+class TestPriceBOM:
+    """Test concurrent pricing of BOM items."""
+
+    def test_multiplies_by_quantity_and_sums(self):
+        """Test per-item costs are multiplied by quantity and totalled."""
+        async def lookup(item, currency):
+            return {
+                "hourly_price": 0.1,
+                "monthly_cost": 73.0,
+                "savings_options": {"1_year_savings_plan": 50.0, "3_year_savings_plan": 30.0},
+            }
+
+        bom = [make_item(quantity=2), make_item(service="SQL Database", sku="S1")]
+        pricing = asyncio.run(price_bom(bom, lookup))
+
+        assert pricing["currency"] == "USD"
+        assert pricing["items"][0]["monthly_cost"] == 146.0
+        assert pricing["items"][0]["savings_options"]["1_year_savings_plan"] == 100.0
+        assert pricing["items"][1]["service"] == "SQL Database"
+        assert pricing["total_monthly"] == 219.0
+
+    def test_total_is_sum_of_rounded_lines_for_large_bom(self):
+        """Test the vectorized total equals the sum of the line costs shown, over many lines."""
+        async def lookup(item, currency):
+            return {"hourly_price": 0.0137, "monthly_cost": 10.001, "savings_options": {}}
+
+        bom = [make_item(sku=f"sku-{index}", quantity=index % 7 + 1) for index in range(500)]
+        pricing = asyncio.run(price_bom(bom, lookup))
+
+        assert len(pricing["items"]) == 500
+        assert pricing["items"][6]["monthly_cost"] == 70.01
+        assert pricing["total_monthly"] == round(sum(item["monthly_cost"] for item in pricing["items"]), 2)
+
+    def test_failed_lookup_priced_at_zero_with_note(self):
+        """Test lookup errors and missing prices fall back to $0.00 with a note."""
+        async def lookup(item, currency):
+            if item["sku"] == "broken":
+                raise RuntimeError("MCP unavailable")
+            if item["sku"] == "missing":
+                return None
+            return {"hourly_price": 1.0, "monthly_cost": 730.0, "savings_options": {}}
+
+        bom = [make_item(sku="broken"), make_item(sku="missing"), make_item()]
+        pricing = asyncio.run(price_bom(bom, lookup))
+
+        assert pricing["items"][0]["monthly_cost"] == 0.0
+        assert "MCP unavailable" in pricing["items"][0]["note"]
+        assert "No pricing data found" in pricing["items"][1]["note"]
+        assert pricing["total_monthly"] == 730.0
+        assert has_failed_lookups(pricing)
+
+    def test_missing_prices_are_not_failed_lookups(self):
+        """Test SKUs without prices are distinguished from lookups that raised."""
+        async def lookup(item, currency):
+            return None
+
+        pricing = asyncio.run(price_bom([make_item()], lookup))
+        assert not has_failed_lookups(pricing)
+
+    def test_lookups_run_concurrently_within_limit(self):
+        """Test lookups overlap but never exceed max_concurrency."""
+        in_flight = 0
+        peak = 0
+
+        async def lookup(item, currency):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"hourly_price": 1.0, "monthly_cost": 1.0, "savings_options": {}}
+
+        bom = [make_item(sku=f"sku{i}") for i in range(12)]
+        pricing = asyncio.run(price_bom(bom, lookup, max_concurrency=4))
+
+        assert peak == 4
+        assert [item["sku"] for item in pricing["items"]] == [f"sku{i}" for i in range(12)]
+
+    def test_first_available_lookup_falls_back(self):
+        """Test the first lookup returning a quote wins, falling back on misses and errors."""
+        async def snapshot(item, currency):
+            return {"hourly_price": 1.0, "monthly_cost": 730.0} if item["sku"] == "cached" else None
+
+        async def live(item, currency):
+            if item["sku"] == "broken":
+                raise RuntimeError("MCP unavailable")
+            return {"hourly_price": 2.0, "monthly_cost": 1460.0}
+
+        lookup = first_available_lookup([snapshot, live])
+        assert asyncio.run(lookup(make_item(sku="cached"), "USD"))["hourly_price"] == 1.0
+        assert asyncio.run(lookup(make_item(sku="other"), "USD"))["hourly_price"] == 2.0
+        with pytest.raises(RuntimeError):
+            asyncio.run(lookup(make_item(sku="broken"), "USD"))
+
+    def test_format_pricing_data(self):
+        """Test pricing data is formatted with the PRICING DATA header."""
+        text = format_pricing_data({"items": [], "total_monthly": 0.0, "currency": "USD"})
+        assert text.startswith("=== PRICING DATA ===\n{")
+
+
+class TestPriceLookupPrefetcher:
+    """Test lookups started before the whole BOM is known."""
+
+    def test_prefetched_quotes_reused(self):
+        """Test price_bom awaits prefetched quotes instead of looking up again."""
+        calls = []
+
+        async def early(item, currency):
+            calls.append(("early", item["sku"]))
+            return {"hourly_price": 1.0, "monthly_cost": 730.0}
+
+        async def fallback(item, currency):
+            calls.append(("fallback", item["sku"]))
+            return {"hourly_price": 2.0, "monthly_cost": 1460.0}
+
+        async def scenario():
+            prefetcher = PriceLookupPrefetcher(early)
+            prefetcher.prefetch(make_item(sku="first"))
+            prefetcher.prefetch(make_item(sku="first"))
+            items = [make_item(sku="first"), make_item(sku="second")]
+            pricing = await price_bom(items, prefetcher.wrap(fallback))
+            await prefetcher.aclose()
+            return prefetcher, pricing
+
+        prefetcher, pricing = asyncio.run(scenario())
+        assert sorted(calls) == [("early", "first"), ("fallback", "second")]
+        assert pricing["total_monthly"] == 2190.0
+
+    def test_failed_or_missing_prefetch_falls_back(self):
+        """Test a prefetch that raised or found no price is looked up again."""
+        async def early(item, currency):
+            if item["sku"] == "broken":
+                raise RuntimeError("MCP unavailable")
+            return None
+
+        async def fallback(item, currency):
+            return {"hourly_price": 1.0, "monthly_cost": 730.0}
+
+        async def scenario():
+            prefetcher = PriceLookupPrefetcher(early)
+            items = [make_item(sku="broken"), make_item(sku="missing")]
+            for item in items:
+                prefetcher.prefetch(item)
+            pricing = await price_bom(items, prefetcher.wrap(fallback))
+            await prefetcher.aclose()
+            return pricing
+
+        assert not has_failed_lookups(asyncio.run(scenario()))
+
+    def test_aclose_cancels_pending_prefetches(self):
+        """Test prefetches still running when the BOM fails are cancelled."""
+        async def slow(item, currency):
+            await asyncio.sleep(60)
+
+        async def scenario():
+            prefetcher = PriceLookupPrefetcher(slow)
+            prefetcher.prefetch(make_item())
+            await asyncio.sleep(0)
+            await asyncio.wait_for(prefetcher.aclose(), timeout=1)
+            return prefetcher.prefetched
+
+        assert asyncio.run(scenario()) == 0
+
+    def test_no_lookup_disables_prefetching(self):
+        """Test prefetch is a no-op without an early lookup."""
+        async def scenario():
+            prefetcher = PriceLookupPrefetcher(None)
+            prefetcher.prefetch(make_item())
+            return prefetcher.prefetched
+
+        assert asyncio.run(scenario()) == 0
+
+
+class TestPricingOptions:
+    """Test what-if re-quote options applied to an existing BOM."""
+
+    def test_options_normalized(self):
+        """Test currency and region are normalized so equal options compare equal."""
+        options = PricingOptions(currency="eur", region="West Europe", discount_percent="15")
+        assert options == PricingOptions(currency="EUR", region="westeurope", discount_percent=15.0)
+        assert PricingOptions(currency="", region="") == PricingOptions()
+
+    @pytest.mark.parametrize("kwargs", [
+        {"currency": "EURO"},
+        {"currency": "U$D"},
+        {"discount_percent": -5},
+        {"discount_percent": 100},
+        {"discount_percent": {"value": 5}},
+        {"region": ["westeurope"]},
+        {"compare_regions": 5},
+        {"compare_regions": "westeurope"},
+        {"compare_regions": {"westeurope": True}},
+        {"compare_regions": ["westeurope", 5]},
+    ])
+    def test_invalid_options_rejected(self, kwargs):
+        """Test bad currency codes, discounts and region types raise ValueError, not TypeError."""
+        with pytest.raises(ValueError):
+            PricingOptions(**kwargs)
+
+    def test_region_override_copies_items(self):
+        """Test every item moves to the new region without mutating the input."""
+        items = [make_item(), make_item(sku="Standard_D4s_v3")]
+        moved = apply_region_override(items, "westeurope")
+        assert all(item["armRegionName"] == "westeurope" for item in moved)
+        assert all(item["region"] == "West Europe" for item in moved)
+        assert items[0]["armRegionName"] == "eastus"
+        assert apply_region_override(items, None) is items
+
+    def test_region_display_names(self):
+        """Test known codes get their display name and unknown codes fall back."""
+        assert region_display_name("eastus2") == "East US 2"
+        assert region_display_name("usgovvirginia", [dict(make_item(), armRegionName="usgovvirginia",
+                                                          region="US Gov Virginia")]) == "US Gov Virginia"
+        assert region_display_name("newregion") == "newregion"
+
+    def test_discount_scales_prices_and_total(self):
+        """Test a discount reduces item prices, savings plans and the total."""
+        pricing = {
+            "items": [{
+                "serviceName": "Virtual Machines",
+                "hourly_price": 0.1,
+                "monthly_cost": 73.0,
+                "savings_options": {"1_year_savings_plan": 50.0},
+            }],
+            "total_monthly": 73.0,
+            "currency": "USD",
+        }
+        discounted = apply_discount(pricing, 20.0)
+        assert discounted["items"][0]["monthly_cost"] == 58.4
+        assert discounted["items"][0]["savings_options"]["1_year_savings_plan"] == 40.0
+        assert discounted["total_monthly"] == 58.4
+        assert discounted["discount_percent"] == 20.0
+        assert pricing["total_monthly"] == 73.0
+        assert apply_discount(pricing, 0.0) is pricing
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,174 @@
+"""Test rate limiting, timeouts and retries for price lookups."""
+
+import asyncio
+import pytest
+from src.pricing import fanout
+from src.pricing.engine import has_failed_lookups, price_bom
+from src.pricing.fanout import (
+    TokenBucket,
+    create_resilient_lookup,
+    get_max_concurrency,
+    get_pricing_rate_limiter,
+    resilient_lookup,
+)
+
+QUOTE = {"hourly_price": 1.0, "monthly_cost": 730.0}
+
+
+def make_item(sku="Standard_D2s_v3"):
+    """Build a valid BOM item."""
+    return {
+        "serviceName": "Virtual Machines",
+        "sku": sku,
+        "quantity": 1,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": 730,
+    }
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test calls are spread to the configured rate."""
+
+    def test_burst_then_rate(self):
+        """Test a full bucket allows a burst, then one call per 1/rate seconds."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1)
+        assert bucket.reserve() == pytest.approx(0.2)
+
+    def test_refills_over_time(self):
+        """Test tokens come back at the configured rate, up to the burst size."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now = 10.0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() > 0
+
+    def test_zero_rate_disables_limit(self):
+        """Test a rate of 0 never waits."""
+        bucket = TokenBucket(rate=0)
+        assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+class TestResilientLookup:
+    """Test per-call timeouts and retries with jitter."""
+
+    def test_retries_until_success(self, monkeypatch):
+        """Test transient failures are retried after a jittered backoff."""
+        monkeypatch.setattr(fanout.random, "uniform", lambda low, high: 0.0)
+        attempts = []
+
+        async def flaky(item, currency):
+            attempts.append(item["sku"])
+            if len(attempts) < 3:
+                raise ConnectionError("MCP unavailable")
+            return QUOTE
+
+        lookup = resilient_lookup(flaky, retries=2)
+        assert asyncio.run(lookup(make_item(), "USD")) == QUOTE
+        assert len(attempts) == 3
+
+    def test_raises_after_last_retry(self, monkeypatch):
+        """Test the last error surfaces so price_bom reports a failed lookup."""
+        monkeypatch.setattr(fanout.random, "uniform", lambda low, high: 0.0)
+
+        async def broken(item, currency):
+            raise ConnectionError("MCP unavailable")
+
+        lookup = resilient_lookup(broken, retries=1)
+        pricing = asyncio.run(price_bom([make_item()], lookup))
+        assert has_failed_lookups(pricing)
+
+    def test_slow_attempt_times_out_and_retries(self, monkeypatch):
+        """Test a hung call is abandoned after the per-call timeout."""
+        monkeypatch.setattr(fanout.random, "uniform", lambda low, high: 0.0)
+        attempts = []
+
+        async def hangs_once(item, currency):
+            attempts.append(item["sku"])
+            if len(attempts) == 1:
+                await asyncio.sleep(60)
+            return QUOTE
+
+        lookup = resilient_lookup(hangs_once, timeout=0.05, retries=1)
+        assert asyncio.run(lookup(make_item(), "USD")) == QUOTE
+        assert len(attempts) == 2
+
+    def test_missing_price_not_retried(self):
+        """Test a lookup that finds no price is not retried."""
+        attempts = []
+
+        async def missing(item, currency):
+            attempts.append(item["sku"])
+            return None
+
+        assert asyncio.run(resilient_lookup(missing, retries=3)(make_item(), "USD")) is None
+        assert len(attempts) == 1
+
+    def test_backoff_grows_per_attempt(self, monkeypatch):
+        """Test the jitter range doubles with each retry."""
+        ranges = []
+        monkeypatch.setattr(fanout.random, "uniform", lambda low, high: ranges.append(high) or 0.0)
+
+        async def broken(item, currency):
+            raise ConnectionError("MCP unavailable")
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(resilient_lookup(broken, retries=3, backoff=0.5)(make_item(), "USD"))
+        assert ranges == [0.5, 1.0, 2.0]
+
+
+class TestFanoutConfiguration:
+    """Test fan-out settings are read from the environment."""
+
+    def test_max_concurrency_from_environment(self, monkeypatch):
+        """Test PRICING_MAX_CONCURRENCY bounds lookups in flight."""
+        monkeypatch.setenv("PRICING_MAX_CONCURRENCY", "4")
+        assert get_max_concurrency() == 4
+        monkeypatch.setenv("PRICING_MAX_CONCURRENCY", "0")
+        assert get_max_concurrency() == 1
+
+    def test_rate_limiter_shared_and_configured(self, monkeypatch):
+        """Test the process-wide limiter honours PRICING_RATE_LIMIT_* settings."""
+        monkeypatch.setenv("PRICING_RATE_LIMIT_PER_SECOND", "5")
+        monkeypatch.setenv("PRICING_RATE_LIMIT_BURST", "3")
+        get_pricing_rate_limiter.cache_clear()
+        try:
+            limiter = get_pricing_rate_limiter()
+            assert (limiter.rate, limiter.burst) == (5.0, 3)
+            assert get_pricing_rate_limiter() is limiter
+        finally:
+            get_pricing_rate_limiter.cache_clear()
+
+    def test_configured_lookup_retries(self, monkeypatch):
+        """Test PRICING_LOOKUP_RETRIES sets the number of extra attempts."""
+        monkeypatch.setenv("PRICING_LOOKUP_RETRIES", "0")
+        attempts = []
+
+        async def broken(item, currency):
+            attempts.append(item["sku"])
+            raise ConnectionError("MCP unavailable")
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(create_resilient_lookup(broken)(make_item(), "USD"))
+        assert len(attempts) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
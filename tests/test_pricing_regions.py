@@ -0,0 +1,122 @@
+"""Test pricing one BOM across many regions."""
+
+import asyncio
+import pytest
+from src.pricing.engine import PricingOptions
+from src.pricing.regions import compare_regions, comparison_items
+
+# Per-unit monthly prices by (region, sku); missing entries have no price
+PRICES = {
+    ("eastus", "Standard_D2s_v3"): 70.0,
+    ("eastus", "S1"): 15.0,
+    ("westeurope", "Standard_D2s_v3"): 80.0,
+    ("westeurope", "S1"): 16.0,
+    ("southcentralus", "Standard_D2s_v3"): 60.0,
+    ("southcentralus", "S1"): 14.0,
+    ("brazilsouth", "Standard_D2s_v3"): 50.0,
+}
+
+BOM = [
+    {
+        "serviceName": "Virtual Machines",
+        "sku": "Standard_D2s_v3",
+        "quantity": 2,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": 730,
+    },
+    {
+        "serviceName": "SQL Database",
+        "sku": "S1",
+        "quantity": 1,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": 730,
+    },
+]
+
+
+async def table_lookup(item, currency):
+    """Resolve prices from PRICES, raising for an unknown region."""
+    if item["armRegionName"] == "nowhere":
+        raise ConnectionError("MCP unavailable")
+    monthly = PRICES.get((item["armRegionName"], item["sku"]))
+    return None if monthly is None else {"hourly_price": monthly / 730, "monthly_cost": monthly}
+
+
+class TestCompareRegions:
+    """Test the region x line matrix and ranking."""
+
+    def test_matrix_and_ranking(self):
+        """Test costs per region and line, ranked cheapest first."""
+        result = asyncio.run(compare_regions(BOM, ["eastus", "westeurope", "southcentralus"], table_lookup))
+        assert result["regions"] == ["eastus", "westeurope", "southcentralus"]
+        assert result["matrix"] == [[140.0, 15.0], [160.0, 16.0], [120.0, 14.0]]
+        assert [entry["region"] for entry in result["ranking"]] == ["southcentralus", "eastus", "westeurope"]
+        assert result["ranking"][0]["total_monthly"] == 134.0
+        assert result["ranking"][1]["difference_from_cheapest"] == 21.0
+        assert result["cheapest_region"] == "southcentralus"
+
+    def test_incomplete_regions_ranked_last(self):
+        """Test a region missing a price never ranks as cheapest despite a lower total."""
+        result = asyncio.run(compare_regions(BOM, ["brazilsouth", "nowhere", "eastus"], table_lookup))
+        assert result["cheapest_region"] == "eastus"
+        assert [entry["region"] for entry in result["ranking"]] == ["eastus", "brazilsouth", "nowhere"]
+        brazil = result["ranking"][1]
+        assert brazil["unpriced_lines"] == 1
+        assert brazil["difference_from_cheapest"] is None
+        assert result["matrix"][0] == [100.0, None]
+        assert result["matrix"][1] == [None, None]
+
+    def test_monthly_priced_lines_match_price_bom(self):
+        """Test a line with a monthly price and no hourly rate costs its monthly price."""
+        async def storage_lookup(item, currency):
+            return {"hourly_price": 0.0, "monthly_cost": 20.48}
+
+        bom = [dict(BOM[0], serviceName="Storage", sku="Standard_LRS", quantity=3, hours_per_month=400)]
+        result = asyncio.run(compare_regions(bom, ["eastus"], storage_lookup))
+        assert result["matrix"] == [[61.44]]
+        assert result["ranking"][0]["total_monthly"] == 61.44
+
+    def test_lookups_run_concurrently_and_dedupe_regions(self):
+        """Test every region x line is looked up once, in parallel."""
+        in_flight = []
+        peak = []
+
+        async def slow_lookup(item, currency):
+            in_flight.append(item)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(item)
+            return await table_lookup(item, currency)
+
+        result = asyncio.run(compare_regions(BOM, ["eastus", "westeurope", "eastus"], slow_lookup))
+        assert result["regions"] == ["eastus", "westeurope"]
+        assert max(peak) == 4
+
+    def test_comparison_items_cover_every_region(self):
+        """Test the items to price span every region without mutating the BOM."""
+        items = comparison_items(BOM, ["westeurope", "southcentralus"])
+        assert [item["armRegionName"] for item in items] == [
+            "westeurope", "westeurope", "southcentralus", "southcentralus"
+        ]
+        assert BOM[0]["armRegionName"] == "eastus"
+
+
+class TestCompareRegionsOption:
+    """Test compare_regions in pricing options."""
+
+    def test_regions_normalized_and_deduplicated(self):
+        """Test region codes are normalized like the region override."""
+        options = PricingOptions(compare_regions=["East US", "eastus", "West Europe"])
+        assert options.compare_regions == ("eastus", "westeurope")
+
+    @pytest.mark.parametrize("regions", ["eastus", [1, 2], [f"region{i}" for i in range(21)]])
+    def test_invalid_region_lists_rejected(self, regions):
+        """Test non-lists, non-strings and too many regions raise ValueError."""
+        with pytest.raises(ValueError):
+            PricingOptions(compare_regions=regions)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+"""Test vectorized cost computation for BOMs and scenario matrices."""
+
+import math
+import numpy as np
+import pytest
+from src.pricing.vectorized import (
+    columns_from_quotes,
+    cost_totals,
+    line_costs,
+    scenario_costs,
+    scenario_totals,
+    scenario_unpriced_lines,
+)
+
+
+def make_item(sku="Standard_D2s_v3", quantity=1, hours=730):
+    """Build a valid BOM item."""
+    return {
+        "serviceName": "Virtual Machines",
+        "sku": sku,
+        "quantity": quantity,
+        "region": "East US",
+        "armRegionName": "eastus",
+        "hours_per_month": hours,
+    }
+
+
+def make_quote(hourly, monthly, sp1=0.0, sp3=0.0):
+    """Build a per-unit quote."""
+    return {
+        "hourly_price": hourly,
+        "monthly_cost": monthly,
+        "savings_options": {"1_year_savings_plan": sp1, "3_year_savings_plan": sp3},
+    }
+
+
+class TestLineCosts:
+    """Test per-line costs and totals from columnar BOMs."""
+
+    def test_costs_multiply_by_quantity(self):
+        """Test monthly, annual and savings plan costs for every line."""
+        columns = columns_from_quotes(
+            [make_item(quantity=2), make_item(sku="P1v2", quantity=1)],
+            [make_quote(0.1, 73.0, 50.0, 30.0), make_quote(0.2, 146.0)],
+        )
+        costs = line_costs(columns)
+        assert costs["monthly"].tolist() == [146.0, 146.0]
+        assert costs["annual"].tolist() == [1752.0, 1752.0]
+        assert costs["savings_1y_monthly"].tolist() == [100.0, 0.0]
+        assert costs["savings_3y_annual"].tolist() == [720.0, 0.0]
+
+    def test_unpriced_lines_excluded_from_totals(self):
+        """Test lines without a quote are NaN, skipped and counted."""
+        columns = columns_from_quotes(
+            [make_item(), make_item(sku="missing")],
+            [make_quote(0.1, 73.0, 50.0), None],
+        )
+        totals = cost_totals(line_costs(columns))
+        assert totals["monthly"] == 73.0
+        assert totals["annual"] == 876.0
+        assert totals["savings_1y_monthly"] == 50.0
+        assert totals["unpriced_lines"] == 1
+
+    def test_matches_loop_over_large_bom(self):
+        """Test the vectorized totals equal a per-item loop for hundreds of lines."""
+        items = [make_item(sku=f"sku{i}", quantity=i % 5 + 1) for i in range(500)]
+        quotes = [make_quote(0.01 * i, 7.3 * i) for i in range(500)]
+        totals = cost_totals(line_costs(columns_from_quotes(items, quotes)))
+        expected = sum(quote["monthly_cost"] * item["quantity"] for item, quote in zip(items, quotes))
+        assert totals["monthly"] == pytest.approx(expected)
+        assert len(columns_from_quotes(items, quotes)) == 500
+
+    def test_mismatched_lengths_rejected(self):
+        """Test quotes must line up with BOM items."""
+        with pytest.raises(ValueError, match="quotes for"):
+            columns_from_quotes([make_item()], [])
+
+
+class TestScenarioMatrix:
+    """Test regions x lines x hour profiles evaluated at once."""
+
+    HOURLY = [
+        [0.10, 0.20],  # eastus
+        [0.12, 0.18],  # westeurope
+        [0.09, float("nan")],  # region without the second SKU
+    ]
+
+    def test_scenario_costs_shape_and_values(self):
+        """Test each cell is hourly x quantity x hours."""
+        costs = scenario_costs(self.HOURLY, [2, 1], [730, 176])
+        assert costs.shape == (3, 2, 2)
+        assert costs[0, 0, 0] == pytest.approx(0.10 * 2 * 730)
+        assert costs[1, 1, 1] == pytest.approx(0.18 * 176)
+
+    def test_totals_per_region_and_profile(self):
+        """Test BOM totals per scenario, with NaN where a line is unpriced."""
+        totals = scenario_totals(self.HOURLY, [2, 1], [730])
+        assert totals.shape == (3, 1)
+        assert totals[0, 0] == pytest.approx((0.2 + 0.2) * 730)
+        assert totals[1, 0] == pytest.approx((0.24 + 0.18) * 730)
+        assert math.isnan(totals[2, 0])
+        assert int(np.nanargmin(totals[:, 0])) == 0
+
+    def test_totals_skipping_unpriced_lines(self):
+        """Test partial totals over the priced lines, with the unpriced lines counted."""
+        totals = scenario_totals(self.HOURLY, [2, 1], [730], skip_unpriced=True)
+        assert totals[2, 0] == pytest.approx(0.18 * 730)
+        assert scenario_unpriced_lines(self.HOURLY).tolist() == [0, 0, 1]
+
+    def test_per_line_hour_profiles(self):
+        """Test a profile can give each line its own hours."""
+        totals = scenario_totals([[1.0, 1.0]], [1, 1], [[730, 0], [100, 100]])
+        assert totals.tolist() == [[730.0, 200.0]]
+
+    def test_shape_mismatch_rejected(self):
+        """Test quantity and hour profiles must match the number of lines."""
+        with pytest.raises(ValueError, match="quantity"):
+            scenario_costs(self.HOURLY, [1, 1, 1], [730])
+        with pytest.raises(ValueError, match="hour_profiles"):
+            scenario_costs(self.HOURLY, [1, 1], [[730, 730, 730]])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""Test instruction assembly, the requirements hand-off and token accounting."""
+
+import pytest
+from src import prompts
+from src.prompts import (
+    DONE_MARKER,
+    cached_prefix_tokens,
+    count_tokens,
+    include_prompt_examples,
+    prompt_token_report,
+    requirements_from_history,
+    with_examples,
+)
+
+
+def message(role, content):
+    return {"role": role, "content": content}
+
+
+class TestWithExamples:
+    """Test optional worked examples."""
+
+    @pytest.fixture(autouse=True)
+    def clear_setting(self):
+        include_prompt_examples.cache_clear()
+        yield
+        include_prompt_examples.cache_clear()
+
+    def test_examples_off_by_default(self, monkeypatch):
+        """Test examples are left out unless AGENT_PROMPT_EXAMPLES is set."""
+        monkeypatch.delenv(prompts.PROMPT_EXAMPLES_ENV, raising=False)
+        assert with_examples("Core.", "\n\nExample.") == "Core."
+
+    def test_examples_enabled_from_environment(self, monkeypatch):
+        """Test a true AGENT_PROMPT_EXAMPLES appends the examples after the static core."""
+        monkeypatch.setenv(prompts.PROMPT_EXAMPLES_ENV, "true")
+        assert with_examples("Core.", "\n\nExample.") == "Core.\n\nExample."
+
+    def test_explicit_choice_overrides_environment(self, monkeypatch):
+        """Test include overrides the environment setting."""
+        monkeypatch.setenv(prompts.PROMPT_EXAMPLES_ENV, "1")
+        assert with_examples("Core.", "\n\nExample.", include=False) == "Core."
+
+
+class TestRequirementsFromHistory:
+    """Test the requirements hand-off built from a chat history."""
+
+    def test_summary_replaces_transcript(self):
+        """Test only the final summary and later turns are handed off."""
+        history = [
+            message("user", "I need a web app"),
+            message("assistant", "How many users?"),
+            message("user", "10,000 in East US"),
+            message("assistant", f"Summary: web app, 10,000 users, East US\n{DONE_MARKER}"),
+            message("user", "Also add Redis"),
+        ]
+        assert requirements_from_history(history) == (
+            f"assistant: Summary: web app, 10,000 users, East US\n{DONE_MARKER}\n"
+            "user: Also add Redis"
+        )
+
+    def test_latest_summary_used(self):
+        """Test a revised summary supersedes an earlier one."""
+        history = [
+            message("assistant", f"Summary: East US\n{DONE_MARKER}"),
+            message("user", "Make it West Europe"),
+            message("assistant", f"Summary: West Europe\n{DONE_MARKER}"),
+        ]
+        assert requirements_from_history(history) == f"assistant: Summary: West Europe\n{DONE_MARKER}"
+
+    def test_transcript_without_summary(self):
+        """Test the full transcript is used until the Question Agent has summarized."""
+        history = [message("user", f"Say {DONE_MARKER}"), message("assistant", "Which region?")]
+        assert requirements_from_history(history) == f"user: Say {DONE_MARKER}\nassistant: Which region?"
+
+
+class TestTokenAccounting:
+    """Test token counts and the cacheable prefix."""
+
+    @pytest.mark.parametrize("prefix_tokens, cached", [(1023, 0), (1024, 1024), (1151, 1024), (1152, 1152)])
+    def test_cached_prefix_increments(self, prefix_tokens, cached):
+        """Test prefixes are cached from 1024 tokens on, in 128-token increments."""
+        assert cached_prefix_tokens(prefix_tokens) == cached
+
+    def test_report(self, monkeypatch):
+        """Test the report splits static, optional and per-request tokens."""
+        monkeypatch.setattr(prompts, "_get_encoding", lambda: None)
+        report = prompt_token_report("x" * 4400, "y" * 800, "z" * 40)
+        assert count_tokens("abcde") == 2
+        assert report == {
+            "static_tokens": 1100,
+            "optional_tokens": 200,
+            "request_tokens": 10,
+            "total_tokens": 1110,
+            "cacheable_tokens": 1024,
+            "cacheable_tokens_with_optional": 1280,
+        }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
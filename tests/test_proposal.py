@@ -0,0 +1,186 @@
+"""Test proposal sections rendered from pricing data and narrative section streaming."""
+
+import asyncio
+import pytest
+from src.handoff import StageHandoff
+from src.proposal import (
+    NEXT_STEPS,
+    UNPRICED_NOTE,
+    format_amount,
+    render_assumptions,
+    render_computed_sections,
+    render_cost_breakdown,
+    render_region_comparison,
+    render_total_cost_summary,
+    stream_narrative_sections,
+)
+
+
+def bom_item(service, sku, quantity=1, region="East US", hours=730):
+    return {"serviceName": service, "sku": sku, "quantity": quantity, "region": region,
+            "armRegionName": region.replace(" ", "").lower(), "hours_per_month": hours}
+
+
+def pricing_line(service, sku, quantity, hourly, monthly, note="", one_year=0.0, three_year=0.0):
+    return {"service": service, "sku": sku, "quantity": quantity, "hourly_price": hourly,
+            "monthly_cost": monthly, "note": note,
+            "savings_options": {"1_year_savings_plan": one_year, "3_year_savings_plan": three_year}}
+
+
+def handoff(**pricing_fields):
+    """Build a hand-off with one priced VM line and one unpriced SQL line."""
+    pricing = {
+        "items": [
+            pricing_line("Virtual Machines", "Standard_D4s_v5", 2, 0.192, 1280.32, one_year=1024.26, three_year=832.21),
+            pricing_line("SQL Database", "GP_Gen5_4", 1, 0.0, 0.0, note="No pricing data found"),
+        ],
+        "total_monthly": 1280.32,
+        "currency": "USD",
+        "prices_as_of": "2026-10-17",
+        **pricing_fields,
+    }
+    items = [bom_item("Virtual Machines", "Standard_D4s_v5", 2), bom_item("SQL Database", "GP_Gen5_4", hours=400)]
+    return StageHandoff("Web app in East US", items, pricing=pricing)
+
+
+class TestFormatAmount:
+    """Test currency formatting."""
+
+    @pytest.mark.parametrize("amount, currency, decimals, expected", [
+        (1234.5, "USD", 2, "$1,234.50"),
+        (0.192, "EUR", 4, "€0.1920"),
+        (99.0, "SEK", 2, "99.00 SEK"),
+    ])
+    def test_formats(self, amount, currency, decimals, expected):
+        """Test symbols, separators and codes for currencies without a symbol."""
+        assert format_amount(amount, currency, decimals) == expected
+
+
+class TestComputedSections:
+    """Test sections rendered from the pricing data."""
+
+    def test_cost_breakdown(self):
+        """Test one row per line and a note for every unpriced line."""
+        text = render_cost_breakdown(handoff())
+        assert "| Virtual Machines | Standard_D4s_v5 | 2 | East US | $0.1920 | $1,280.32 |" in text
+        assert "| SQL Database | GP_Gen5_4 | 1 | East US | $0.0000 | $0.00 |" in text
+        assert f"- SQL Database (GP_Gen5_4): {UNPRICED_NOTE}" in text
+
+    def test_usage_based_line_noted(self):
+        """Test a priced line with a note shows its own note, not the unpriced one."""
+        note = "Usage-based: priced per 1 GB/Month; monthly cost assumes 1 GB/Month of usage"
+        data = handoff()
+        data.pricing["items"].append(pricing_line("Storage", "Hot LRS", 1, 0.0, 0.02, note=note))
+        data.bom_items.append(bom_item("Storage", "Hot LRS", 1))
+        text = render_cost_breakdown(data)
+        assert f"- Storage (Hot LRS): {note}" in text
+
+    def test_totals_are_exact(self):
+        """Test the annual cost is twelve times the monthly total, and savings plans are summed."""
+        text = render_total_cost_summary(handoff())
+        assert "- **Monthly Cost**: $1,280.32" in text
+        assert "- **Annual Cost (12 months)**: $15,363.84" in text
+        assert "- **Monthly Cost with a 1-year Savings Plan**: $1,024.26" in text
+        assert "pay-as-you-go rates." in text
+
+    def test_savings_plan_counts_lines_without_a_plan_on_demand(self):
+        """Test lines without a plan add their on-demand cost, and no plan at all shows no figure."""
+        data = handoff()
+        data.pricing["items"].append(
+            pricing_line("Storage Accounts", "Standard_LRS", 1, 0.0, 20.0, three_year=18.0)
+        )
+        data.pricing["total_monthly"] = 1300.32
+        data.bom_items.append(bom_item("Storage Accounts", "Standard_LRS"))
+        text = render_total_cost_summary(data)
+        # 1,024.26 for the VMs plus the storage line on demand; the unpriced SQL line adds nothing
+        assert "- **Monthly Cost with a 1-year Savings Plan**: $1,044.26" in text
+        assert "- **Monthly Cost with a 3-year Savings Plan**: $850.21" in text
+
+        for item in data.pricing["items"]:
+            item["savings_options"] = {"1_year_savings_plan": 0.0, "3_year_savings_plan": 0.0}
+        assert "Savings Plan**" not in render_total_cost_summary(data)
+
+    def test_discount_noted(self):
+        """Test a discount is stated in the totals and the assumptions."""
+        data = handoff(discount_percent=12.5)
+        assert "less a 12.5% discount" in render_total_cost_summary(data)
+        assert "- A 12.5% discount off retail rates is applied" in render_assumptions(data)
+
+    def test_region_comparison(self):
+        """Test the ranking table, incomplete regions and the recommendation."""
+        assert render_region_comparison(handoff()) == ""
+        comparison = {
+            "currency": "USD",
+            "cheapest_region": "eastus",
+            "ranking": [
+                {"rank": 1, "region": "eastus", "total_monthly": 1280.32, "unpriced_lines": 0,
+                 "difference_from_cheapest": 0.0},
+                {"rank": 2, "region": "westeurope", "total_monthly": 900.0, "unpriced_lines": 1,
+                 "difference_from_cheapest": None},
+            ],
+        }
+        text = render_region_comparison(handoff(region_comparison=comparison))
+        assert "| 1 | eastus | $1,280.32 | $0.00 |" in text
+        assert "| 2 | westeurope | $900.00 | Not fully priced |" in text
+        assert "**Recommended region**: eastus" in text
+
+    def test_assumptions(self):
+        """Test partial-month lines, regions and the price date are listed."""
+        text = render_assumptions(handoff())
+        assert "  - SQL Database (GP_Gen5_4): 400 hours per month" in text
+        assert "- Region: East US" in text
+        assert "as of 2026-10-17" in text
+
+    def test_sections_in_order(self):
+        """Test the computed sections follow the proposal order."""
+        text = render_computed_sections(handoff())
+        positions = [text.index(heading) for heading in (
+            "## Cost Breakdown", "## Total Cost Summary", NEXT_STEPS, "## Assumptions"
+        )]
+        assert positions == sorted(positions)
+        assert "## Region Comparison" not in text
+
+
+class TestStreamNarrativeSections:
+    """Test narrative sections written concurrently and emitted in order."""
+
+    def test_concurrent_and_ordered(self):
+        """Test later sections start at once but are emitted after earlier ones."""
+        started = []
+
+        async def write_section(section):
+            started.append(section)
+            await asyncio.sleep(0.05 if section == "First" else 0)
+            yield f"{section} body"
+
+        async def collect():
+            return [text async for text in stream_narrative_sections(write_section, ("First", "Second"))]
+
+        texts = asyncio.run(collect())
+        assert texts == ["## First\n\n", "First body", "\n\n", "## Second\n\n", "Second body", "\n\n"]
+        assert started == ["First", "Second"]
+
+    def test_failure_cancels_other_sections(self):
+        """Test a failing section re-raises and cancels the sections still running."""
+        cancelled = []
+
+        async def write_section(section):
+            if section == "First":
+                raise RuntimeError("model unavailable")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(section)
+                raise
+            yield "never"
+
+        async def collect():
+            return [text async for text in stream_narrative_sections(write_section, ("First", "Second"))]
+
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            asyncio.run(collect())
+        assert cancelled == ["Second"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
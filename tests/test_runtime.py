@@ -0,0 +1,156 @@
+"""Test persistent background event loop."""
+
+import asyncio
+import threading
+import time
+import pytest
+from src.runtime import BackgroundEventLoop
+
+
+@pytest.fixture
+def runtime():
+    """Running background event loop, stopped after the test."""
+    runtime = BackgroundEventLoop()
+    yield runtime
+    runtime.stop()
+
+
+class TestBackgroundEventLoop:
+    """Test running coroutines on a shared loop from other threads."""
+
+    def test_run_returns_result(self, runtime):
+        """Test run blocks for and returns the coroutine result."""
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        assert runtime.run(add(1, 2)) == 3
+
+    def test_run_propagates_exceptions(self, runtime):
+        """Test exceptions raised by the coroutine reach the caller."""
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            runtime.run(fail())
+
+    def test_run_timeout_cancels_coroutine(self, runtime):
+        """Test a timed-out coroutine is cancelled rather than left running."""
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(TimeoutError):
+            runtime.run(slow(), timeout=0.05)
+        assert cancelled.wait(1)
+
+    def test_concurrent_requests_overlap(self, runtime):
+        """Test many blocked callers are served concurrently by one loop."""
+        async def wait_on_model():
+            await asyncio.sleep(0.2)
+            return True
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(runtime.run(wait_on_model())))
+            for _ in range(20)
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        assert len(results) == 20
+        assert elapsed < 1.0
+
+    def test_requests_share_one_loop(self, runtime):
+        """Test coroutines from different threads run on the same loop."""
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        loops = []
+        threads = [
+            threading.Thread(target=lambda: loops.append(runtime.run(current_loop())))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(loop is runtime.loop for loop in loops)
+
+    def test_iterate_yields_items_as_produced(self, runtime):
+        """Test items reach the caller before the generator finishes."""
+        release = threading.Event()
+
+        async def produce():
+            yield "first"
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            yield "second"
+
+        stream = runtime.iterate(produce())
+        assert next(stream) == "first"
+        release.set()
+        assert list(stream) == ["second"]
+
+    def test_iterate_propagates_exceptions(self, runtime):
+        """Test exceptions raised mid-stream reach the caller after earlier items."""
+        async def produce():
+            yield 1
+            raise ValueError("boom")
+
+        received = []
+        with pytest.raises(ValueError, match="boom"):
+            for item in runtime.iterate(produce()):
+                received.append(item)
+        assert received == [1]
+
+    def test_iterate_close_cancels_generator(self, runtime):
+        """Test closing the stream early (client disconnect) cancels the producer."""
+        cancelled = threading.Event()
+
+        async def produce():
+            try:
+                yield "first"
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        stream = runtime.iterate(produce())
+        assert next(stream) == "first"
+        stream.close()
+        assert cancelled.wait(1)
+
+    def test_iterate_timeout(self, runtime):
+        """Test a stream exceeding its timeout raises TimeoutError."""
+        async def produce():
+            yield 1
+            await asyncio.sleep(60)
+
+        stream = runtime.iterate(produce(), timeout=0.05)
+        assert next(stream) == 1
+        with pytest.raises(TimeoutError):
+            next(stream)
+
+    def test_stop_cancels_pending_tasks(self):
+        """Test stop cancels outstanding work and ends the thread."""
+        runtime = BackgroundEventLoop()
+        future = runtime.submit(asyncio.sleep(60))
+        runtime.stop(timeout=1)
+
+        assert future.cancelled()
+        assert not runtime.is_running
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,236 @@
+"""Test pluggable chat session stores."""
+
+import pytest
+import time
+from src.sessions import (
+    InMemorySessionStore,
+    RedisSessionStore,
+    SQLiteSessionStore,
+    SessionStore,
+    create_session_store,
+    decode_session,
+    encode_session,
+    trim_history,
+)
+
+SESSION = {
+    "thread": {"service_thread_id": "thread_abc123"},
+    "history": [
+        {"role": "user", "content": "I need a web app"},
+        {"role": "assistant", "content": "How many users do you expect?"},
+    ],
+}
+
+
+class FakeClock:
+    """Manually advanced clock for idle expiry tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    """Factory building each local backend with a shared fake clock."""
+    stores = []
+
+    def make(clock, **limits):
+        if request.param == "memory":
+            store = InMemorySessionStore(idle_ttl_seconds=60, clock=clock, **limits)
+        else:
+            store = SQLiteSessionStore(
+                str(tmp_path / "sessions.db"), idle_ttl_seconds=60, clock=clock, **limits
+            )
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        if hasattr(store, "close"):
+            store.close()
+
+
+class TestSessionStores:
+    """Behaviour shared by every backend."""
+
+    def test_save_get_delete_roundtrip(self, make_store):
+        """Test session data round-trips and can be deleted."""
+        store = make_store(FakeClock())
+        assert store.get("s1") is None
+
+        store.save("s1", SESSION)
+        assert store.get("s1") == SESSION
+        assert len(store) == 1
+
+        store.delete("s1")
+        assert store.get("s1") is None
+        assert len(store) == 0
+
+    def test_idle_sessions_expire(self, make_store):
+        """Test sessions idle past the TTL are gone, while active ones are kept alive."""
+        clock = FakeClock()
+        store = make_store(clock)
+        store.save("idle", SESSION)
+        store.save("active", SESSION)
+
+        clock.now += 45
+        assert store.get("active") == SESSION
+        clock.now += 45
+
+        assert store.get("idle") is None
+        assert store.get("active") == SESSION
+
+    def test_evict_idle(self, make_store):
+        """Test explicit eviction removes only idle sessions."""
+        clock = FakeClock()
+        store = make_store(clock)
+        store.save("old", SESSION)
+        clock.now += 30
+        store.save("new", SESSION)
+        clock.now += 40
+
+        assert store.evict_idle() == 1
+        assert len(store) == 1
+        assert store.get("new") == SESSION
+
+    def test_max_sessions_evicts_least_recently_active(self, make_store):
+        """Test the session cap evicts the least recently active session."""
+        clock = FakeClock()
+        store = make_store(clock, max_sessions=2)
+        store.save("a", SESSION)
+        clock.now += 1
+        store.save("b", SESSION)
+        clock.now += 1
+        store.get("a")
+        clock.now += 1
+        store.save("c", SESSION)
+
+        assert len(store) == 2
+        assert store.get("b") is None
+        assert store.get("a") == SESSION
+
+    def test_history_trimmed_to_byte_limit(self, make_store):
+        """Test oldest history messages are dropped beyond max_history_bytes."""
+        store = make_store(FakeClock(), max_history_bytes=100)
+        history = [{"role": "user", "content": "x" * 40} for _ in range(5)]
+        store.save("s1", {"thread": {}, "history": history})
+
+        assert len(store.get("s1")["history"]) == 1
+
+    def test_stats_report_sessions_and_bytes(self, make_store):
+        """Test stats report resident sessions and stored bytes."""
+        store = make_store(FakeClock())
+        store.save("s1", SESSION)
+        store.save("s2", SESSION)
+
+        stats = store.stats()
+        assert stats["sessions"] == 2
+        assert stats["bytes"] == 2 * len(encode_session(SESSION))
+
+    def test_background_sweeper_evicts_idle(self, make_store):
+        """Test the sweeper thread evicts idle sessions without any requests."""
+        clock = FakeClock()
+        store = make_store(clock)
+        store.save("s1", SESSION)
+        clock.now += 120
+
+        store.start_sweeper(interval_seconds=0.01)
+        deadline = time.time() + 2
+        while len(store) and time.time() < deadline:
+            time.sleep(0.01)
+        store.stop_sweeper()
+
+        assert len(store) == 0
+
+
+class TestTrimHistory:
+    """Test history trimming."""
+
+    def test_keeps_history_within_limit(self):
+        """Test history under the limit is untouched."""
+        assert trim_history(SESSION["history"], 10000) == SESSION["history"]
+
+    def test_always_keeps_latest_message(self):
+        """Test the latest message survives even if it alone exceeds the limit."""
+        history = SESSION["history"]
+        assert trim_history(history, 1) == history[-1:]
+
+
+class TestSQLiteSessionStore:
+    """Test sharing sessions between worker processes."""
+
+    def test_sessions_visible_across_store_instances(self, tmp_path):
+        """Test a session saved by one worker is readable by another."""
+        path = str(tmp_path / "shared.db")
+        worker_a = SQLiteSessionStore(path)
+        worker_b = SQLiteSessionStore(path)
+
+        worker_a.save("s1", SESSION)
+        assert worker_b.get("s1") == SESSION
+
+        worker_a.close()
+        worker_b.close()
+
+
+class FakeRedis:
+    """Redis client recording the commands sent, answering stats queries only."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.commands = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def dbsize(self):
+        self.commands.append("DBSIZE")
+
+    def info(self, section):
+        self.commands.append(f"INFO {section}")
+
+    def execute(self):
+        return [self.keys, {"used_memory": 2048}]
+
+
+class TestRedisSessionStore:
+    """Test the Redis store's stats without a Redis server."""
+
+    def test_stats_cost_one_round_trip(self):
+        """Test stats use DBSIZE and INFO in one pipeline rather than a query per session."""
+        store = RedisSessionStore.__new__(RedisSessionStore)
+        SessionStore.__init__(store)
+        store._redis = FakeRedis(keys=5000)
+
+        stats = store.stats()
+        assert stats["sessions"] == 5000
+        assert stats["bytes"] == 2048
+        assert store._redis.commands == ["DBSIZE", "INFO memory"]
+
+
+class TestCreateSessionStore:
+    """Test backend selection from URLs."""
+
+    def test_encoding_is_compact(self):
+        """Test sessions are stored compressed and decode losslessly."""
+        blob = encode_session(SESSION)
+        assert isinstance(blob, bytes)
+        assert decode_session(blob) == SESSION
+
+    def test_backend_selection(self, tmp_path):
+        """Test memory and sqlite URLs select the matching backend."""
+        assert isinstance(create_session_store("memory://"), InMemorySessionStore)
+        store = create_session_store(f"sqlite:///{tmp_path}/sessions.db")
+        assert isinstance(store, SQLiteSessionStore)
+        store.close()
+
+    def test_unknown_scheme_rejected(self):
+        """Test unsupported URLs raise ValueError."""
+        with pytest.raises(ValueError, match="Unsupported session store URL"):
+            create_session_store("postgres://localhost/sessions")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
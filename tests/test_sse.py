@@ -0,0 +1,62 @@
+"""Test Server-Sent Events framing."""
+
+import json
+import pytest
+from dataclasses import dataclass
+from typing import Any
+from src.sse import format_sse, pipeline_event_payload
+
+
+@dataclass
+class StageEvent:
+    """Same shape as src.pipeline.PipelineEvent."""
+
+    stage: str
+    type: str
+    text: str = ""
+    data: Any = None
+
+
+def parse_frame(frame):
+    """Split an SSE frame into its event name and decoded JSON data."""
+    lines = frame.rstrip("\n").split("\n")
+    assert lines[0].startswith("event: ")
+    assert lines[1].startswith("data: ")
+    return lines[0][len("event: "):], json.loads(lines[1][len("data: "):])
+
+
+class TestFormatSse:
+    """Test event frames."""
+
+    def test_frame_roundtrip(self):
+        """Test a frame carries the event name and JSON payload and ends with a blank line."""
+        frame = format_sse("delta", {"text": "Hello"})
+
+        assert frame.endswith("\n\n")
+        assert parse_frame(frame) == ("delta", {"text": "Hello"})
+
+    def test_newlines_stay_in_one_data_line(self):
+        """Test multi-line text is escaped so the frame is not split."""
+        frame = format_sse("text", {"text": "line 1\n\nline 2"})
+
+        assert frame.count("\n\n") == 1
+        assert parse_frame(frame)[1]["text"] == "line 1\n\nline 2"
+
+
+class TestPipelineEventPayload:
+    """Test pipeline events are converted for the browser."""
+
+    def test_omits_empty_fields(self):
+        """Test stage_started events only carry the stage."""
+        payload = pipeline_event_payload(StageEvent("bom_agent", "stage_started"))
+        assert payload == {"stage": "bom_agent", "type": "stage_started"}
+
+    def test_keeps_stage_data(self):
+        """Test completed stages carry their structured data."""
+        items = [{"serviceName": "Virtual Machines", "quantity": 2}]
+        payload = pipeline_event_payload(StageEvent("bom_agent", "stage_completed", data=items))
+        assert payload["data"] == items
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,267 @@
+"""Test per-stage and per-tool-call telemetry."""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from src.telemetry import (
+    Counter,
+    Gauge,
+    Histogram,
+    PipelineMetrics,
+    RunTelemetry,
+    format_prometheus,
+    record_mcp_call,
+)
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeTracer:
+    """Records started and ended spans."""
+
+    def __init__(self):
+        self.spans = []
+
+    def start(self, name, parent=None, attributes=None):
+        span = {"name": name, "parent": parent, "attributes": dict(attributes or {}), "ended": False, "error": None}
+        self.spans.append(span)
+        return span
+
+    def end(self, span, attributes=None, error=None):
+        span["attributes"].update(attributes or {})
+        span["error"] = error
+        span["ended"] = True
+
+    def named(self, name):
+        return next(span for span in self.spans if span["name"] == name)
+
+
+def update(text="", *contents):
+    """Build an agent update with text and contents."""
+    return SimpleNamespace(text=text, contents=list(contents))
+
+
+def usage(prompt, completion):
+    return SimpleNamespace(type="usage", details=SimpleNamespace(input_token_count=prompt, output_token_count=completion))
+
+
+def function_call(call_id, name):
+    return SimpleNamespace(type="function_call", call_id=call_id, name=name)
+
+
+def function_result(call_id, exception=None):
+    return SimpleNamespace(type="function_result", call_id=call_id, exception=exception)
+
+
+class TestInstruments:
+    """Test counters and histograms."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in the first bucket whose bound is not below them."""
+        histogram = Histogram("latency", "test", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value, stage="bom_agent")
+        sample = histogram.samples()[("bom_agent",)]
+        assert sample["buckets"] == [2, 3]
+        assert sample["count"] == 4
+        assert sample["sum"] == pytest.approx(5.65)
+
+    def test_labels_must_match(self):
+        """Test missing or unknown labels raise ValueError."""
+        counter = Counter("calls", "test", ("cache", "result"))
+        counter.inc(cache="bom", result="hit")
+        counter.inc(2, cache="bom", result="hit")
+        assert counter.samples() == {("bom", "hit"): 3.0}
+        with pytest.raises(ValueError):
+            counter.inc(cache="bom")
+
+
+    def test_gauge_goes_up_and_down(self):
+        """Test gauges can be set, incremented and decremented."""
+        gauge = Gauge("runs", "test", ("run",))
+        gauge.inc(run="chat_turn")
+        gauge.inc(run="chat_turn")
+        gauge.dec(run="chat_turn")
+        gauge.set(4, run="proposal_pipeline")
+        assert gauge.samples() == {("chat_turn",): 1.0, ("proposal_pipeline",): 4.0}
+
+
+class TestFormatPrometheus:
+    """Test the Prometheus text exposition format."""
+
+    def test_histogram_lines(self):
+        """Test histograms render cumulative buckets ending in +Inf, then sum and count."""
+        histogram = Histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="bom_agent")
+        histogram.observe(2.5, stage="bom_agent")
+        lines = format_prometheus([histogram], prefix="app_").splitlines()
+        assert lines == [
+            "# HELP app_latency_seconds Latency",
+            "# TYPE app_latency_seconds histogram",
+            'app_latency_seconds_bucket{stage="bom_agent",le="0.1"} 1',
+            'app_latency_seconds_bucket{stage="bom_agent",le="1"} 1',
+            'app_latency_seconds_bucket{stage="bom_agent",le="+Inf"} 2',
+            'app_latency_seconds_sum{stage="bom_agent"} 2.55',
+            'app_latency_seconds_count{stage="bom_agent"} 2',
+        ]
+
+    def test_counters_gauges_and_const_labels(self):
+        """Test samples carry constant labels and label values are escaped."""
+        counter = Counter("cache_requests_total", "Cache lookups", ("cache",))
+        counter.inc(cache='say "hi"\\n')
+        gauge = Gauge("sessions", "Sessions")
+        gauge.set(3)
+        text = format_prometheus([counter, gauge], prefix="", const_labels={"worker": "42"})
+        assert "# TYPE cache_requests_total counter" in text
+        assert 'cache_requests_total{cache="say \\"hi\\"\\\\n",worker="42"} 1' in text
+        assert "# TYPE sessions gauge" in text
+        assert 'sessions{worker="42"} 3' in text
+        assert text.endswith("\n")
+
+    def test_instruments_without_samples(self):
+        """Test instruments not yet observed still describe themselves."""
+        text = format_prometheus(PipelineMetrics().instruments())
+        assert "# TYPE pricing_assistant_http_request_duration_seconds histogram" in text
+        assert "pricing_assistant_http_request_duration_seconds_count" not in text
+
+
+class TestRunTelemetry:
+    """Test stage timing, tokens and tool calls derived from agent updates."""
+
+    def test_stage_timing_tokens_and_spans(self):
+        """Test time to first token, stage duration, tokens and span attributes."""
+        clock, tracer, metrics = FakeClock(), FakeTracer(), PipelineMetrics()
+        telemetry = RunTelemetry("proposal_pipeline", metrics=metrics, tracer=tracer, clock=clock)
+
+        telemetry.stage_started("proposal_agent")
+        clock.advance(0.4)
+        telemetry.agent_update("proposal_agent", update())
+        clock.advance(0.1)
+        telemetry.agent_update("proposal_agent", update("# Proposal"))
+        clock.advance(1.5)
+        telemetry.agent_update("proposal_agent", update("", usage(1200, 800)))
+        telemetry.stage_completed("proposal_agent")
+        telemetry.finish()
+
+        assert telemetry.stages["proposal_agent"]["time_to_first_token"] == pytest.approx(0.5)
+        assert telemetry.stages["proposal_agent"]["seconds"] == pytest.approx(2.0)
+        assert metrics.tokens.samples() == {("proposal_agent", "prompt"): 1200, ("proposal_agent", "completion"): 800}
+        assert metrics.stage_duration.samples()[("proposal_agent", "ok")]["count"] == 1
+
+        stage_span = tracer.named("proposal_agent")
+        assert stage_span["parent"] is tracer.named("proposal_pipeline")
+        assert stage_span["attributes"]["gen_ai.usage.output_tokens"] == 800
+        assert all(span["ended"] for span in tracer.spans)
+
+    def test_tool_calls_timed_from_call_to_result(self):
+        """Test each tool call is counted once and timed by call_id, even with streamed arguments."""
+        clock, tracer, metrics = FakeClock(), FakeTracer(), PipelineMetrics()
+        telemetry = RunTelemetry("proposal_pipeline", metrics=metrics, tracer=tracer, clock=clock)
+
+        telemetry.stage_started("bom_agent")
+        telemetry.agent_update("bom_agent", update("", function_call("c1", "azure_sku_discovery")))
+        telemetry.agent_update("bom_agent", update("", function_call("c1", "azure_sku_discovery")))
+        telemetry.agent_update("bom_agent", update("", function_call("c2", "microsoft_docs_search")))
+        clock.advance(0.3)
+        telemetry.agent_update("bom_agent", update("", function_result("c1")))
+        telemetry.agent_update("bom_agent", update("", function_result("c2", exception=RuntimeError("down"))))
+        telemetry.stage_completed("bom_agent")
+
+        assert telemetry.stages["bom_agent"]["tool_calls"] == 2
+        samples = metrics.tool_call_duration.samples()
+        assert samples[("bom_agent", "azure_sku_discovery", "ok")]["sum"] == pytest.approx(0.3)
+        assert samples[("bom_agent", "microsoft_docs_search", "error")]["count"] == 1
+        tool_span = tracer.named("execute_tool azure_sku_discovery")
+        assert tool_span["parent"] is tracer.named("bom_agent")
+
+    def test_unfinished_stage_fails_with_run(self):
+        """Test finish ends an open stage with the run's error and its pending tool calls as cancelled."""
+        clock, tracer, metrics = FakeClock(), FakeTracer(), PipelineMetrics()
+        telemetry = RunTelemetry("proposal_pipeline", metrics=metrics, tracer=tracer, clock=clock)
+
+        telemetry.stage_started("pricing_agent")
+        telemetry.agent_update("pricing_agent", update("", function_call("c1", "azure_cost_estimate")))
+        error = TimeoutError("stalled")
+        telemetry.finish(error)
+        telemetry.finish(error)
+
+        assert telemetry.stages["pricing_agent"]["outcome"] == "error"
+        assert ("pricing_agent", "azure_cost_estimate", "cancelled") in metrics.tool_call_duration.samples()
+        assert tracer.named("proposal_pipeline")["error"] is error
+        assert sum(span["name"] == "pricing_agent" for span in tracer.spans) == 1
+
+    def test_runs_in_flight(self):
+        """Test a run counts as in flight from creation until it finishes once."""
+        metrics = PipelineMetrics()
+        telemetry = RunTelemetry("proposal_pipeline", metrics=metrics, tracer=FakeTracer(), clock=FakeClock())
+        assert metrics.runs_in_flight.samples() == {("proposal_pipeline",): 1.0}
+        telemetry.finish()
+        telemetry.finish()
+        assert metrics.runs_in_flight.samples() == {("proposal_pipeline",): 0.0}
+
+    def test_updates_for_unstarted_stages_ignored(self):
+        """Test updates outside a started stage record nothing."""
+        metrics = PipelineMetrics()
+        telemetry = RunTelemetry("chat_turn", metrics=metrics, tracer=FakeTracer(), clock=FakeClock())
+        telemetry.agent_update("question_agent", update("hello", usage(10, 5)))
+        assert metrics.tokens.samples() == {}
+
+
+class TestRecordMCPCall:
+    """Test upstream MCP call timing."""
+
+    def test_outcomes_recorded(self):
+        """Test successful, failed and cancelled calls are recorded by outcome."""
+        metrics, tracer = PipelineMetrics(), FakeTracer()
+
+        async def ok():
+            return "result"
+
+        async def fail():
+            raise ConnectionError("MCP unavailable")
+
+        async def run():
+            assert await record_mcp_call("azure_cost_estimate", ok, metrics=metrics, tracer=tracer) == "result"
+            with pytest.raises(ConnectionError):
+                await record_mcp_call("azure_cost_estimate", fail, metrics=metrics, tracer=tracer)
+            task = asyncio.ensure_future(
+                record_mcp_call("azure_cost_estimate", lambda: asyncio.sleep(10), metrics=metrics, tracer=tracer)
+            )
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        outcomes = {key[1]: sample["count"] for key, sample in metrics.mcp_call_duration.samples().items()}
+        assert outcomes == {"ok": 1, "error": 1, "cancelled": 1}
+        assert isinstance(tracer.spans[1]["error"], ConnectionError)
+        assert all(span["ended"] for span in tracer.spans)
+
+    def test_error_payloads_recorded_as_errors(self):
+        """Test results carrying an error payload are returned but counted as errors."""
+        metrics, tracer = PipelineMetrics(), FakeTracer()
+
+        async def error_payload():
+            return '{"error": "Rate limited by the Retail Prices API"}'
+
+        result = asyncio.run(record_mcp_call("azure_cost_estimate", error_payload, metrics=metrics, tracer=tracer))
+        assert result == '{"error": "Rate limited by the Retail Prices API"}'
+        outcomes = {key[1]: sample["count"] for key, sample in metrics.mcp_call_duration.samples().items()}
+        assert outcomes == {"error": 1}
+        assert "Rate limited" in str(tracer.spans[0]["error"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])